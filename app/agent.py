@@ -1,20 +1,26 @@
 import os
+import re
+import threading
+from typing import Any, Callable, Dict, Optional
 from dotenv import load_dotenv
-from langchain.agents import Tool, initialize_agent, AgentType
-from langchain_groq import ChatGroq
-from langchain.prompts import MessagesPlaceholder
-from langchain_core.prompts.chat import ChatPromptTemplate
 from app.calendarUtils import (
     check_availability, 
     book_event, 
     book_event_from_text,
+    check_availability_from_text,
+    find_free_slots_from_text,
     get_upcoming_events,
     cancel_event,
-    get_calendar_info
+    get_calendar_info,
+    calendar_state_version
 )
-from langchain_core.tools import StructuredTool
-from pydantic import BaseModel, Field
+from app.responseCache import ResponseCache
+from app.conversationMemory import compact_history
+from app.intentRouter import try_fast_path
+from app.metrics import AGENT_ITERATIONS, AGENT_RUN_SECONDS, LLM_ERRORS, LLM_REQUEST_SECONDS
+from app.outboundScheduler import scheduler as outbound_scheduler
 from datetime import datetime, timedelta
+from time import perf_counter
 from pytz import timezone
 import logging
 
@@ -24,65 +30,87 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-# Initialize LLM
-try:
-    llm = ChatGroq(
-        groq_api_key=os.getenv("GROQ_API_KEY"),
-        model_name="meta-llama/llama-4-scout-17b-16e-instruct"
-    )
-    logger.info("✅ LLM initialized successfully")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize LLM: {e}")
-    llm = None
-
-# Enhanced tools with better descriptions and error handling
-tools = [
-    Tool(
-        name="BookEvent",
-        func=book_event_from_text,
-        description=(
-            "Use this tool to book a Google Calendar meeting. "
-            "The user must provide ALL of the following in their message: "
-            "event name/title, date (YYYY-MM-DD, tomorrow, next monday), time (HH:MM or 3 PM), "
-            "and optionally duration (in minutes/hours) and participant emails. "
-            "Example: 'Book a meeting about project review tomorrow at 3 PM for 1 hour with john@example.com'"
-        )
-    ),
-    Tool(
-        name="CheckAvailability",
-        func=lambda x: "Use this to check if a specific time slot is available before booking",
-        description=(
-            "Check if a specific time slot is available in the calendar. "
-            "Use this before booking to avoid conflicts. "
-            "Provide date and time in the format: 'Check availability for 2025-01-15 14:00 to 15:00'"
-        )
-    ),
-    Tool(
-        name="GetUpcomingEvents",
-        func=lambda x: get_upcoming_events(5),
-        description=(
-            "Get a list of upcoming events from the calendar. "
-            "Useful for showing users their scheduled meetings. "
-            "No input required - just call this tool to get recent events."
-        )
-    ),
-    Tool(
-        name="CancelEvent",
-        func=lambda x: "Use this to cancel an existing meeting. Provide the event ID or meeting details.",
-        description=(
-            "Cancel an existing meeting or event. "
-            "You'll need the event ID or specific meeting details to cancel. "
-            "Use this when users want to cancel a previously booked meeting."
+MODEL_NAME = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+# LangChain and the Groq client are heavy to import and build, so they are
+# created on first use (or by the API's background warm-up), not at import time
+llm = None
+tools = []
+agent_executor = None
+_init_lock = threading.Lock()
+_llm_initialized = False
+_agent_initialized = False
+
+# Agent replies for repeated questions; keys include the calendar state version
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300")),
+    history_messages=int(os.getenv("RESPONSE_CACHE_HISTORY_MESSAGES", "4"))
+)
+
+def _build_tools() -> list:
+    """Enhanced tools with better descriptions and error handling"""
+    from langchain.agents import Tool
+    
+    return [
+        Tool(
+            name="BookEvent",
+            func=book_event_from_text,
+            description=(
+                "Use this tool to book a Google Calendar meeting. "
+                "The user must provide ALL of the following in their message: "
+                "event name/title, date (YYYY-MM-DD, tomorrow, next monday), time (HH:MM or 3 PM), "
+                "and optionally duration (in minutes/hours) and participant emails. "
+                "Example: 'Book a meeting about project review tomorrow at 3 PM for 1 hour with john@example.com'"
+            )
+        ),
+        Tool(
+            name="CheckAvailability",
+            func=check_availability_from_text,
+            description=(
+                "Check if a specific time slot is available in the calendar. "
+                "Use this before booking to avoid conflicts. Include participant emails to check "
+                "everyone's calendar at once. "
+                "Provide date and time in the format: 'Check availability for 2025-01-15 14:00 to 15:00 with john@example.com'"
+            )
+        ),
+        Tool(
+            name="FindFreeSlots",
+            func=find_free_slots_from_text,
+            description=(
+                "Find the nearest free time slots within working hours. "
+                "Use this when a requested time is busy or the user asks when they are free, "
+                "instead of guessing other times one by one. "
+                "Provide the day, an optional preferred time, the duration and any participant emails: "
+                "'Find free 60 minute slots tomorrow around 3 PM with john@example.com'"
+            )
+        ),
+        Tool(
+            name="GetUpcomingEvents",
+            func=lambda x: get_upcoming_events(5),
+            description=(
+                "Get a list of upcoming events from the calendar. "
+                "Useful for showing users their scheduled meetings. "
+                "No input required - just call this tool to get recent events."
+            )
+        ),
+        Tool(
+            name="CancelEvent",
+            func=lambda x: "Use this to cancel an existing meeting. Provide the event ID or meeting details.",
+            description=(
+                "Cancel an existing meeting or event. "
+                "You'll need the event ID or specific meeting details to cancel. "
+                "Use this when users want to cancel a previously booked meeting."
+            )
         )
-    )
-]
+    ]
 
 # Enhanced system prompt for better conversation flow
 system_prompt = """You are TailorTalk, an intelligent AI assistant that helps users book and manage meetings on Google Calendar.
 
 Your capabilities:
 1. **Book Meetings**: You can book meetings with natural language input
-2. **Check Availability**: You can check if time slots are available
+2. **Check Availability**: You can check if time slots are available and find free slots
 3. **View Events**: You can show upcoming meetings
 4. **Cancel Events**: You can cancel existing meetings
 5. **General Help**: You can answer questions about calendar management
@@ -94,6 +122,7 @@ Key Guidelines:
 - Provide clear, formatted responses with emojis for better readability
 - If a user wants to book a meeting, extract all necessary details and use the BookEvent tool
 - If a user asks about their schedule, use the GetUpcomingEvents tool
+- If a requested time is busy, offer the free slots that BookEvent or FindFreeSlots suggest instead of guessing
 - If a user wants to cancel a meeting, help them identify and cancel it
 
 Example interactions:
@@ -105,84 +134,264 @@ Example interactions:
 
 Remember to be friendly, professional, and always confirm important details before taking actions."""
 
-# Create the agent with enhanced configuration
-try:
-    agent_executor = initialize_agent(
-        tools=tools,
-        llm=llm,
-        agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-        verbose=True,
-        handle_parsing_errors=True,
-        max_iterations=5,
-        early_stopping_method="generate"
-    )
-    logger.info("✅ Agent initialized successfully")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize agent: {e}")
-    agent_executor = None
+def _scheduled_chat_model():
+    """
+    ChatGroq whose completions go through the outbound scheduler (Groq rate
+    limits, priority lanes, backoff on 429/5xx). A retry restarts the whole
+    completion; rate-limit errors arrive before any token is streamed.
+    """
+    from langchain_groq import ChatGroq
+    
+    class ScheduledChatGroq(ChatGroq):
+        def _generate(self, messages, stop=None, run_manager=None, stream=None, **kwargs):
+            return outbound_scheduler.call("groq", "chat", super()._generate, messages, stop, run_manager, stream, **kwargs)
+    
+    return ScheduledChatGroq
 
-def process_user_input(user_input: str, chat_history: list = None) -> str:
+def get_llm():
     """
-    Process user input with enhanced error handling and fallback responses
+    Get the Groq chat model, initializing it on first use
     """
-    if not agent_executor:
-        return "I'm having trouble connecting to my AI services right now. Please try again later."
+    global llm, _llm_initialized
+    with _init_lock:
+        if not _llm_initialized:
+            try:
+                llm = _scheduled_chat_model()(
+                    groq_api_key=os.getenv("GROQ_API_KEY"),
+                    model_name=MODEL_NAME,
+                    streaming=True,  # Emit tokens to callbacks as they arrive
+                    max_retries=0  # The outbound scheduler retries, with backoff shared across requests
+                )
+                logger.info("✅ LLM initialized successfully")
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize LLM: {e}")
+                llm = None
+            _llm_initialized = True
+    return llm
+
+def get_agent_executor():
+    """
+    Get the LangChain agent, initializing it (and the LLM) on first use
+    """
+    global agent_executor, tools, _agent_initialized
+    model = get_llm()
+    with _init_lock:
+        if not _agent_initialized:
+            # Create the agent with enhanced configuration
+            try:
+                from langchain.agents import initialize_agent, AgentType
+                tools = _build_tools()
+                agent_executor = initialize_agent(
+                    tools=tools,
+                    llm=model,
+                    agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
+                    verbose=True,
+                    handle_parsing_errors=True,
+                    max_iterations=5,
+                    early_stopping_method="generate"
+                )
+                logger.info("✅ Agent initialized successfully")
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize agent: {e}")
+                agent_executor = None
+            _agent_initialized = True
+    return agent_executor
+
+def _metrics_handler():
+    """
+    Callback that times each LLM call and counts the agent's tool-using iterations
+    One instance per run
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
     
-    try:
-        # Check for common patterns that don't need the full agent
-        user_lower = user_input.lower()
+    class RecordMetrics(BaseCallbackHandler):
+        def __init__(self):
+            self.iterations = 0
+            self._llm_started: Dict[Any, float] = {}
         
-        # Greeting patterns
-        if any(word in user_lower for word in ['hello', 'hi', 'hey', 'good morning', 'good afternoon']):
-            return "👋 Hello! I'm TailorTalk, your AI calendar assistant. I can help you book meetings, check your schedule, and manage your calendar. What would you like to do today?"
+        def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: Any, **kwargs):
+            self._llm_started[run_id] = perf_counter()
         
-        # Help patterns
-        if any(word in user_lower for word in ['help', 'what can you do', 'capabilities']):
-            return """🤖 **I can help you with:**
+        def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: Any, **kwargs):
+            self._llm_started[run_id] = perf_counter()
+        
+        def on_llm_end(self, response: Any, *, run_id: Any, **kwargs):
+            started = self._llm_started.pop(run_id, None)
+            if started is not None:
+                LLM_REQUEST_SECONDS.observe(perf_counter() - started)
+        
+        def on_llm_error(self, error: BaseException, *, run_id: Any, **kwargs):
+            LLM_ERRORS.inc()
+            self.on_llm_end(None, run_id=run_id)
+        
+        def on_agent_action(self, action: Any, **kwargs):
+            self.iterations += 1
+    
+    return RecordMetrics()
 
-📅 **Meeting Management**
-• Book new meetings with natural language
-• Check calendar availability
-• View upcoming events
-• Cancel existing meetings
+def invoke_agent(user_input: str, chat_history: list, callbacks: Optional[list] = None) -> str:
+    """
+    Run the agent through the response cache and return the reply text
+    The history is compacted to the memory budget first. The cache key is taken
+    before the run, so a booking made during the run changes the calendar version
+    and the same request will run again next time
+    """
+    chat_history = compact_history(chat_history)
+    key = response_cache.make_key(user_input, chat_history, calendar_state_version())
+    cached = response_cache.get(key)
+    if cached is not None:
+        logger.info("⚡ Agent reply served from response cache")
+        return cached
+    
+    agent_executor = get_agent_executor()
+    if not agent_executor:
+        raise RuntimeError("Agent not available")
+    
+    metrics = _metrics_handler()
+    with AGENT_RUN_SECONDS.time():
+        result = agent_executor.invoke(
+            {"input": user_input, "chat_history": chat_history},
+            config={"callbacks": [metrics] + (callbacks or [])}
+        )
+    AGENT_ITERATIONS.observe(metrics.iterations)
+    
+    # Extract response from result
+    if isinstance(result, dict):
+        reply = result.get("output") or result.get("response") or str(result)
+    else:
+        reply = str(result)
+    
+    reply = reply.strip()
+    if reply:
+        response_cache.put(key, reply)
+    return reply
+
+_JSON_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_ACTION = re.compile(r'"action"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_ACTION_INPUT = re.compile(r'"action_input"\s*:\s*"')
 
-💬 **Natural Conversation**
-• Just tell me what you need in plain English
-• I'll ask for any missing details
-• I'll confirm everything before booking
+class FinalAnswerFilter:
+    """
+    Picks the reply text out of one streamed LLM call. The agent answers with a
+    JSON blob ({"action": ..., "action_input": ...}); feed() takes each raw
+    token and returns only newly decoded text of the action_input string, and
+    only once the action is known to be "Final Answer". Tool-calling steps
+    yield nothing
+    """
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        """Start on a new LLM call"""
+        self._raw = ""
+        self._action: Optional[str] = None
+        self._pos: Optional[int] = None  # Next undecoded character of the action_input string
+        self._closed = False
+        self._decoded = ""
+        self._sent = 0
+    
+    def feed(self, token: str) -> str:
+        self._raw += token
+        if self._action is None:
+            match = _ACTION.search(self._raw)
+            if match:
+                self._action = match.group(1)
+        if self._pos is None:
+            match = _ACTION_INPUT.search(self._raw)
+            if match:
+                self._pos = match.end()
+        if self._pos is not None and not self._closed:
+            self._decode()
+        if self._action != "Final Answer":
+            return ""
+        text = self._decoded[self._sent:]
+        self._sent = len(self._decoded)
+        return text
+    
+    def _decode(self):
+        """Decode the action_input string as far as complete characters allow"""
+        raw, pos, out = self._raw, self._pos, []
+        while pos < len(raw):
+            char = raw[pos]
+            if char == '"':
+                self._closed = True
+                break
+            if char != '\\':
+                out.append(char)
+                pos += 1
+                continue
+            if pos + 1 >= len(raw):
+                break
+            escape = raw[pos + 1]
+            if escape == 'u':
+                if pos + 6 > len(raw):
+                    break
+                try:
+                    out.append(chr(int(raw[pos + 2:pos + 6], 16)))
+                except ValueError:
+                    pass
+                pos += 6
+            else:
+                out.append(_JSON_ESCAPES.get(escape, escape))
+                pos += 2
+        self._pos = pos
+        self._decoded += "".join(out)
 
-**Examples:**
-• "Book a meeting tomorrow at 3 PM about project review"
-• "Show me my upcoming meetings"
-• "I need to cancel my meeting with John"
+def run_agent_streaming(user_input: str, chat_history: list, on_event: Callable[[str, Dict[str, Any]], None]) -> str:
+    """
+    Run the agent while reporting progress through on_event(kind, data) as it happens:
+    'token' for each piece of the final answer's text, 'tool_start'/'tool_end'
+    around each tool call. The JSON of tool-calling steps is not forwarded
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+    
+    class ForwardEvents(BaseCallbackHandler):
+        def __init__(self):
+            self.answer = FinalAnswerFilter()
+        
+        def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, **kwargs):
+            self.answer.reset()
+        
+        def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, **kwargs):
+            self.answer.reset()
+        
+        def on_llm_new_token(self, token: str, **kwargs):
+            text = self.answer.feed(token)
+            if text:
+                on_event("token", {"text": text})
+        
+        def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs):
+            on_event("tool_start", {"tool": serialized.get("name"), "input": input_str})
+        
+        def on_tool_end(self, output: Any, **kwargs):
+            on_event("tool_end", {"output": str(output)[:500]})
+    
+    return invoke_agent(user_input, chat_history, callbacks=[ForwardEvents()])
 
-What would you like to do?"""
+def process_user_input(user_input: str, chat_history: list = None) -> str:
+    """
+    Process user input with enhanced error handling and fallback responses
+    """
+    try:
+        # Fully specified requests, greetings and help don't need the full agent
+        fast_reply = try_fast_path(user_input)
+        if fast_reply is not None:
+            return fast_reply
+        
+        if not get_agent_executor():
+            return "I'm having trouble connecting to my AI services right now. Please try again later."
         
         # Use the agent for more complex requests
-        if chat_history:
-            # Convert chat history to the format expected by the agent
-            formatted_history = []
-            for role, content in chat_history:
-                if role == "user":
-                    formatted_history.append(("human", content))
-                else:
-                    formatted_history.append(("assistant", content))
-            
-            result = agent_executor.invoke({
-                "input": user_input,
-                "chat_history": formatted_history
-            })
-        else:
-            result = agent_executor.invoke({
-                "input": user_input,
-                "chat_history": []
-            })
-        
-        # Extract response from result
-        if isinstance(result, dict):
-            response = result.get("output") or result.get("response") or str(result)
-        else:
-            response = str(result)
+        # Convert chat history to the format expected by the agent
+        formatted_history = []
+        for role, content in chat_history or []:
+            if role == "user":
+                formatted_history.append(("human", content))
+            else:
+                formatted_history.append(("assistant", content))
+        
+        response = invoke_agent(user_input, formatted_history)
         
         # Clean up the response
         response = response.strip()
@@ -203,5 +412,6 @@ def get_agent_status() -> dict:
         "llm_available": llm is not None,
         "agent_available": agent_executor is not None,
         "tools_count": len(tools),
-        "model_name": "meta-llama/llama-4-scout-17b-16e-instruct" if llm else None
+        "model_name": MODEL_NAME if llm else None,
+        "response_cache": response_cache.stats()
     }
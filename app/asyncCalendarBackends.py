@@ -0,0 +1,244 @@
+# Asyncio-native calendar backends: the calendar operations of calendarBackends, awaitable
+import abc
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from app.busyIndex import to_rfc3339
+from app.calendarBackends import (
+    CalendarAPIError, EventNotFound, FreeBusyResult, InMemoryCalendarBackend, SyncTokenExpired,
+    freebusy_body, parse_freebusy
+)
+from app.metrics import CALENDAR_ERRORS, CALENDAR_REQUEST_SECONDS
+from app.outboundScheduler import OutboundScheduler
+
+CALENDAR_API_URL = "https://www.googleapis.com/calendar/v3/"
+
+
+class AsyncCalendarBackend(abc.ABC):
+    """
+    Awaitable counterpart of CalendarBackend for the calls the async API
+    endpoints make. Bulk operations stay on the thread-based backends, which
+    use Calendar batch requests. As with CalendarBackend, the calendar
+    operations are abstract.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def freebusy(self, time_min: datetime, time_max: datetime, calendar_ids: List[str]) -> FreeBusyResult:
+        """Busy intervals (UTC) per calendar between time_min and time_max"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def insert_event(self, calendar_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an event and return it as stored (with 'id' and 'htmlLink')"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def delete_event(self, calendar_id: str, event_id: str):
+        """Delete an event; raises EventNotFound when it doesn't exist"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def list_events(self, calendar_id: str, sync_token: Optional[str], time_min: datetime) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Same contract as CalendarBackend.list_events"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_calendar(self, calendar_id: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def aclose(self):
+        """Release connections; the backend can't be used afterwards"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+def _api_error(response) -> CalendarAPIError:
+    """CalendarAPIError from an error response of the Calendar API"""
+    try:
+        error = response.json().get("error", {})
+    except ValueError:
+        error = {}
+    reasons = error.get("errors") or [{}]
+    try:
+        retry_after = float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        retry_after = None
+    return CalendarAPIError(
+        response.status_code,
+        reasons[0].get("reason", "unknown"),
+        error.get("message") or response.reason_phrase,
+        retry_after
+    )
+
+
+class AsyncGoogleCalendarBackend(AsyncCalendarBackend):
+    """
+    Google Calendar API over one pooled httpx.AsyncClient. Concurrent calls
+    share up to max_connections keep-alive connections on the event loop
+    instead of holding a thread each. The access token of the service account
+    credentials is refreshed in a worker thread when it expires, once for all
+    waiting calls. With a scheduler, requests are rate limited and transient
+    failures retried, sharing the buckets of the thread-based backend.
+    """
+
+    name = "google"
+
+    def __init__(self, credentials, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 timeout_seconds: float = 30.0, scheduler: Optional[OutboundScheduler] = None):
+        import httpx
+
+        self.credentials = credentials
+        self.scheduler = scheduler
+        self.max_connections = max_connections
+        self._client = httpx.AsyncClient(
+            base_url=CALENDAR_API_URL,
+            timeout=timeout_seconds,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        )
+        # Created on first use so it belongs to the serving event loop
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._requests = 0
+        self._in_flight = 0
+        self._token_refreshes = 0
+
+    async def _access_token(self) -> str:
+        if not self.credentials.valid:
+            if self._token_lock is None:
+                self._token_lock = asyncio.Lock()
+            async with self._token_lock:
+                if not self.credentials.valid:
+                    from google.auth.transport.requests import Request
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, self.credentials.refresh, Request())
+                    self._token_refreshes += 1
+        return self.credentials.token
+
+    async def _request(self, operation: str, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """Send one API request through the scheduler when there is one"""
+        if self.scheduler is None:
+            return await self._send(operation, method, path, **kwargs)
+        return await self.scheduler.acall("calendar", operation, self._send, operation, method, path, **kwargs)
+
+    async def _send(self, operation: str, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """Send one API request, recording its latency and any failure under operation"""
+        headers = {"Authorization": f"Bearer {await self._access_token()}"}
+        self._requests += 1
+        self._in_flight += 1
+        try:
+            with CALENDAR_REQUEST_SECONDS.time(operation=operation):
+                response = await self._client.request(method, path, headers=headers, **kwargs)
+        except Exception:
+            CALENDAR_ERRORS.inc(operation=operation)
+            raise
+        finally:
+            self._in_flight -= 1
+
+        if response.status_code >= 400:
+            CALENDAR_ERRORS.inc(operation=operation)
+            raise _api_error(response)
+        return response.json() if response.content else {}
+
+    async def freebusy(self, time_min: datetime, time_max: datetime, calendar_ids: List[str]) -> FreeBusyResult:
+        result = await self._request("freebusy", "POST", "freeBusy", json=freebusy_body(time_min, time_max, calendar_ids))
+        return parse_freebusy(result, calendar_ids)
+
+    async def insert_event(self, calendar_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._request(
+            "insert", "POST", f"calendars/{quote(calendar_id, safe='')}/events",
+            params={"sendUpdates": "all"},  # Send email notifications to attendees
+            json=body
+        )
+
+    async def delete_event(self, calendar_id: str, event_id: str):
+        try:
+            await self._request("delete", "DELETE", f"calendars/{quote(calendar_id, safe='')}/events/{quote(event_id, safe='')}")
+        except CalendarAPIError as e:
+            if e.status in (404, 410):
+                raise EventNotFound(f"Event {event_id} not found") from e
+            raise
+
+    async def list_events(self, calendar_id: str, sync_token: Optional[str], time_min: datetime) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        params: Dict[str, Any] = {"singleEvents": "true", "maxResults": 2500}
+        if sync_token:
+            params["syncToken"] = sync_token
+        else:
+            params["timeMin"] = to_rfc3339(time_min)
+
+        items: List[Dict[str, Any]] = []
+        while True:
+            try:
+                result = await self._request("list", "GET", f"calendars/{quote(calendar_id, safe='')}/events", params=params)
+            except CalendarAPIError as e:
+                if sync_token and e.status == 410:
+                    raise SyncTokenExpired(str(e)) from e
+                raise
+            items.extend(result.get('items', []))
+            if not result.get('nextPageToken'):
+                return items, result.get('nextSyncToken')
+            params["pageToken"] = result['nextPageToken']
+
+    async def get_calendar(self, calendar_id: str) -> Dict[str, Any]:
+        return await self._request("get", "GET", f"calendars/{quote(calendar_id, safe='')}")
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "requests": self._requests,
+            "in_flight": self._in_flight,
+            "max_connections": self.max_connections,
+            "token_refreshes": self._token_refreshes,
+        }
+
+
+class AsyncInMemoryCalendarBackend(AsyncCalendarBackend):
+    """
+    Async view of an InMemoryCalendarBackend: same events and sync tokens, but
+    the injected latency is awaited (asyncio.sleep) instead of slept, so load
+    tests of the async endpoints behave like network I/O.
+    """
+
+    name = "memory"
+
+    def __init__(self, backend: InMemoryCalendarBackend):
+        self.backend = backend
+
+    async def _round_trip(self, operation: str):
+        delay = self.backend.next_delay()
+        with CALENDAR_REQUEST_SECONDS.time(operation=operation):
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def freebusy(self, time_min: datetime, time_max: datetime, calendar_ids: List[str]) -> FreeBusyResult:
+        await self._round_trip("freebusy")
+        return self.backend.read_freebusy(time_min, time_max, calendar_ids)
+
+    async def insert_event(self, calendar_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        await self._round_trip("insert")
+        return self.backend.store(calendar_id, body)
+
+    async def delete_event(self, calendar_id: str, event_id: str):
+        await self._round_trip("delete")
+        try:
+            self.backend.remove(calendar_id, event_id)
+        except EventNotFound:
+            CALENDAR_ERRORS.inc(operation="delete")
+            raise
+
+    async def list_events(self, calendar_id: str, sync_token: Optional[str], time_min: datetime) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        await self._round_trip("list")
+        return self.backend.read_events(calendar_id, sync_token, time_min)
+
+    async def get_calendar(self, calendar_id: str) -> Dict[str, Any]:
+        await self._round_trip("get")
+        return self.backend.read_calendar(calendar_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.backend.stats()
@@ -0,0 +1,251 @@
+# Async versions of the calendarUtils calendar functions, for the async API endpoints.
+# They share the busy index, event mirror and reply formats with calendarUtils; only
+# the calendar I/O differs, so hundreds of checks can wait on one event loop.
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.asyncCalendarBackends import AsyncCalendarBackend, AsyncGoogleCalendarBackend, AsyncInMemoryCalendarBackend
+from app.busyIndex import FillToken, Interval, to_utc
+from app.calendarBackends import CalendarAPIError, SyncTokenExpired
+from app.outboundScheduler import scheduler as outbound_scheduler
+from app.calendarUtils import (
+    CALENDAR_BACKEND, CALENDAR_HTTP_TIMEOUT_SECONDS, CALENDAR_ID, EVENT_SYNC_INTERVAL_SECONDS,
+    EVENT_SYNC_LOOKBACK_DAYS, FREE_SLOT_SUGGESTIONS, apply_freebusy, apply_sync, attendee_result,
+    availability_results, booking_result, bump_state_version, busy_index, busy_unreadable, calendar_info,
+    calendar_reads, event_body, event_store, free_slots_result, freebusy_error, freebusy_key,
+    get_calendar_backend, load_credentials, meeting_calendars, nearest_free, plan_busy, record_booking,
+    record_cancel, sync_lock
+)
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_ASYNC_MAX_CONNECTIONS = int(os.getenv("CALENDAR_ASYNC_MAX_CONNECTIONS", "100"))
+CALENDAR_ASYNC_MAX_KEEPALIVE = int(os.getenv("CALENDAR_ASYNC_MAX_KEEPALIVE", "20"))
+
+async_backend: Optional[AsyncCalendarBackend] = None
+_backend_lock = threading.Lock()
+_backend_initialized = False
+
+# Serializes async syncs; created on first use so it belongs to the serving event loop
+_async_sync_lock: Optional[asyncio.Lock] = None
+
+def get_async_calendar_backend() -> Optional[AsyncCalendarBackend]:
+    """
+    Get the async counterpart of the configured calendar backend, initializing it on first use
+    """
+    global async_backend, _backend_initialized
+    with _backend_lock:
+        if _backend_initialized:
+            return async_backend
+        if CALENDAR_BACKEND == "memory":
+            # Same calendar as the thread-based functions
+            backend = get_calendar_backend()
+            async_backend = AsyncInMemoryCalendarBackend(backend) if backend else None
+        elif CALENDAR_BACKEND == "google":
+            try:
+                async_backend = AsyncGoogleCalendarBackend(
+                    load_credentials(),
+                    max_connections=CALENDAR_ASYNC_MAX_CONNECTIONS,
+                    max_keepalive_connections=CALENDAR_ASYNC_MAX_KEEPALIVE,
+                    timeout_seconds=CALENDAR_HTTP_TIMEOUT_SECONDS,
+                    scheduler=outbound_scheduler
+                )
+                logger.info("✅ Async Google Calendar client initialized")
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize the async Google Calendar client: {e}")
+                async_backend = None
+        else:
+            logger.error(f"❌ Unknown CALENDAR_BACKEND '{CALENDAR_BACKEND}' (expected 'google' or 'memory')")
+            async_backend = None
+        _backend_initialized = True
+        return async_backend
+
+async def close_async_calendar_backend():
+    """Close the async client's connections (on shutdown); the next call opens a new one"""
+    global async_backend, _backend_initialized
+    with _backend_lock:
+        backend, async_backend, _backend_initialized = async_backend, None, False
+    if backend:
+        await backend.aclose()
+
+def _error_prefix(e: Exception) -> str:
+    return "HTTP error" if isinstance(e, CalendarAPIError) else "Error"
+
+async def _fetch_with_token(fetch, *query) -> Tuple[FillToken, Dict[str, Any]]:
+    """Async calendarUtils._fetch_freebusy: the busy-index token is taken inside the coalesced call"""
+    since = busy_index.begin_fill()
+    return since, await fetch(*query)
+
+async def _fetch_freebusy(backend: Optional[AsyncCalendarBackend], query: Tuple[datetime, datetime, List[str]]):
+    """(result, None, token) or (None, error message, None) for one planned freebusy query"""
+    try:
+        if not backend:
+            raise RuntimeError("Calendar service not available")
+        since, result = await calendar_reads.do_async("freebusy", freebusy_key(query), _fetch_with_token, backend.freebusy, *query)
+        return result, None, since
+    except Exception as e:
+        return None, freebusy_error(e), None
+
+async def _collect_busy(ranges: List[Interval], calendars: List[str]) -> Tuple[List[Dict[str, List[Interval]]], List[Dict[str, str]]]:
+    """Like calendarUtils._collect_busy, with the planned freebusy queries sent concurrently"""
+    plan = plan_busy(ranges, calendars)
+    queries = plan[3]
+    if queries:
+        backend = get_async_calendar_backend()
+        answers = await asyncio.gather(*(_fetch_freebusy(backend, query) for query in queries))
+        for query, (result, error_msg, since) in zip(queries, answers):
+            apply_freebusy(plan, ranges, query, result, error_msg, since)
+    return plan[0], plan[1]
+
+async def check_availability_many(ranges: List[Tuple[datetime, datetime]], calendars: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Async calendarUtils.check_availability_many"""
+    calendars = calendars or [CALENDAR_ID]
+    ranges = [(to_utc(start), to_utc(end)) for start, end in ranges]
+    busy, errors = await _collect_busy(ranges, calendars)
+    return availability_results(ranges, calendars, busy, errors)
+
+async def check_attendee_availability(start_time: datetime, end_time: datetime, attendees: Optional[List[str]] = None,
+                                      min_free_minutes: int = 0) -> Dict[str, Any]:
+    """Async calendarUtils.check_attendee_availability"""
+    calendars = meeting_calendars(attendees)
+    start, end = to_utc(start_time), to_utc(end_time)
+    busy, errors = await _collect_busy([(start, end)], calendars)
+    return attendee_result(calendars, start, end, busy[0], errors[0], min_free_minutes)
+
+async def check_availability(start_time: datetime, end_time: datetime, attendees: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Async calendarUtils.check_availability"""
+    if not get_async_calendar_backend():
+        logger.error("Calendar service not available")
+        return []
+    
+    try:
+        result = await check_attendee_availability(start_time, end_time, attendees)
+        if busy_unreadable(result.get("errors", {}), result["calendars"]):
+            return []
+        return result["busy"]
+    except Exception as e:
+        logger.error(f"Error checking availability: {e}")
+        return []
+
+async def find_free_slots(window_start: datetime, window_end: datetime, duration_minutes: int = 30,
+                          working_hours: Optional[Tuple[time, time]] = None, limit: int = FREE_SLOT_SUGGESTIONS,
+                          preferred: Optional[datetime] = None, calendars: Optional[List[str]] = None,
+                          include_weekends: bool = False) -> Dict[str, Any]:
+    """Async calendarUtils.find_free_slots"""
+    calendars = calendars or [CALENDAR_ID]
+    window_start, window_end = to_utc(window_start), to_utc(window_end)
+    busy, errors = await _collect_busy([(window_start, window_end)], calendars)
+    slots, errors = nearest_free(
+        busy[0], errors[0], calendars, window_start, window_end, timedelta(minutes=duration_minutes),
+        working_hours, limit, preferred, include_weekends
+    )
+    return free_slots_result(slots, errors)
+
+async def book_event(summary: str, start_time: datetime, end_time: datetime, description: str = None, attendees: List[str] = None) -> Dict[str, Any]:
+    """Async calendarUtils.book_event"""
+    backend = get_async_calendar_backend()
+    if not backend:
+        return {"error": "Calendar service not available", "success": False}
+    
+    try:
+        logger.info(f"📝 Booking event: {summary} from {start_time} to {end_time}")
+        created_event = await backend.insert_event(CALENDAR_ID, event_body(summary, start_time, end_time, description, attendees))
+        logger.info(f"✅ Event created successfully: {created_event.get('htmlLink')}")
+        record_booking(created_event, start_time, end_time)
+        bump_state_version()
+        return booking_result(created_event)
+    except Exception as e:
+        error_msg = f"{_error_prefix(e)} booking event: {e}"
+        logger.error(error_msg)
+        return {"error": error_msg, "success": False}
+
+async def cancel_event(event_id: str) -> Dict[str, Any]:
+    """Async calendarUtils.cancel_event"""
+    backend = get_async_calendar_backend()
+    if not backend:
+        return {"error": "Calendar service not available", "success": False}
+    
+    try:
+        logger.info(f"🗑️ Cancelling event: {event_id}")
+        await backend.delete_event(CALENDAR_ID, event_id)
+        logger.info("✅ Event cancelled successfully")
+        record_cancel(event_id)
+        bump_state_version()
+        return {"success": True, "message": "Event cancelled successfully"}
+    except Exception as e:
+        error_msg = f"{_error_prefix(e)} cancelling event: {e}"
+        logger.error(error_msg)
+        return {"error": error_msg, "success": False}
+
+def _store_sync(items: List[Dict[str, Any]], next_token: Optional[str], sync_token: Optional[str]):
+    # Under the thread-side lock so a concurrent calendarUtils.sync_events can't interleave
+    with sync_lock:
+        apply_sync(items, next_token, sync_token)
+
+async def sync_events(force: bool = False) -> bool:
+    """Async calendarUtils.sync_events; the mirror writes run in a worker thread"""
+    if not force and not event_store.is_stale(EVENT_SYNC_INTERVAL_SECONDS):
+        return True
+    
+    backend = get_async_calendar_backend()
+    if not backend:
+        return False
+    if force:
+        return await _sync_now(backend, force=True)
+    # Callers that find the mirror stale at the same moment share one sync
+    return await calendar_reads.do_async("sync", CALENDAR_ID, _sync_now, backend, False)
+
+async def _sync_now(backend: AsyncCalendarBackend, force: bool) -> bool:
+    global _async_sync_lock
+    if _async_sync_lock is None:
+        _async_sync_lock = asyncio.Lock()
+    async with _async_sync_lock:
+        if not force and not event_store.is_stale(EVENT_SYNC_INTERVAL_SECONDS):
+            return True
+        
+        sync_token = event_store.sync_token
+        lookback = datetime.now(timezone.utc) - timedelta(days=EVENT_SYNC_LOOKBACK_DAYS)
+        try:
+            try:
+                items, next_token = await backend.list_events(CALENDAR_ID, sync_token, lookback)
+            except SyncTokenExpired:
+                logger.info("🔄 Sync token expired, running a full sync")
+                sync_token = None
+                items, next_token = await backend.list_events(CALENDAR_ID, None, lookback)
+            
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, _store_sync, items, next_token, sync_token)
+            return True
+        except Exception as e:
+            logger.error(f"{_error_prefix(e)} syncing events: {e}")
+            return False
+
+async def get_upcoming_events(max_results: int = 10) -> List[Dict[str, Any]]:
+    """Async calendarUtils.get_upcoming_events"""
+    if not await sync_events():
+        return []
+    return event_store.upcoming(datetime.now(timezone.utc), max_results)
+
+async def get_calendar_info() -> Dict[str, Any]:
+    """Async calendarUtils.get_calendar_info"""
+    backend = get_async_calendar_backend()
+    if not backend:
+        return {"error": "Calendar service not available"}
+    
+    try:
+        return calendar_info(await calendar_reads.do_async("get_calendar", CALENDAR_ID, backend.get_calendar, CALENDAR_ID))
+    except Exception as e:
+        logger.error(f"Error getting calendar info: {e}")
+        return {"error": str(e)}
+
+def get_async_calendar_backend_stats() -> Dict[str, Any]:
+    """
+    Get request counts of the async calendar backend
+    """
+    if not async_backend:
+        return {"error": "Calendar service not available"}
+    return async_backend.stats()
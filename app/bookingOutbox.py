@@ -0,0 +1,234 @@
+# Durable booking outbox: bookings are saved locally first and written to the calendar by background workers
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+# (job id, request, attempt number) as handed to a worker
+Job = Tuple[str, Dict[str, Any], int]
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp is not None else None
+
+
+class BookingOutbox:
+    """
+    SQLite-backed queue of booking jobs. Use a file path so queued bookings
+    survive restarts and several API workers can share the queue (the file
+    is opened in WAL mode); ':memory:' keeps it per process.
+
+    A claimed job is leased for lease_seconds: if its worker dies the job is
+    picked up again once the lease runs out, so every job is attempted at
+    least once. Failed attempts are retried with full-jitter exponential
+    backoff between retry_base and retry_max seconds.
+    """
+
+    def __init__(self, path: str = ':memory:', lease_seconds: float = 300.0,
+                 retry_base: float = 5.0, retry_max: float = 300.0):
+        self.lease_seconds = lease_seconds
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                request TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                run_after REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, run_after);
+        """)
+        self._conn.commit()
+
+    def enqueue(self, request: Dict[str, Any]) -> str:
+        """Save a job and return its id; request must be JSON-serializable"""
+        # Hex uuids are valid Calendar event ids, so the job id doubles as the event id
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, request, created_at, updated_at, run_after) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request), now, now, now)
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim(self, limit: int) -> List[Job]:
+        """Lease up to limit due jobs, oldest first (including running jobs whose lease ran out)"""
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two processes can't claim the same rows
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, request, attempts FROM jobs WHERE status IN (?, ?, ?) AND run_after <= ? "
+                    "ORDER BY created_at LIMIT ?",
+                    (QUEUED, RETRYING, RUNNING, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ?, run_after = ? WHERE id = ?",
+                    [(RUNNING, now, now + self.lease_seconds, job_id) for job_id, _, _ in rows]
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return [(job_id, json.loads(request), attempts + 1) for job_id, request, attempts in rows]
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str], run_after: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                # Only a claimed job can finish; a late duplicate can't overwrite the outcome
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?, run_after = ? WHERE id = ? AND status = ?",
+                (status, json.dumps(result) if result is not None else None, error, now, run_after, job_id, RUNNING)
+            )
+            self._conn.commit()
+            self._finished.notify_all()
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        self._finish(job_id, SUCCEEDED, result, None, time.time())
+
+    def fail(self, job_id: str, error: str):
+        self._finish(job_id, FAILED, None, error, time.time())
+
+    def retry(self, job_id: str, attempts: int, error: str) -> float:
+        """Put a job back for another attempt after a backoff delay; returns the delay"""
+        delay = random.uniform(0, min(self.retry_max, self.retry_base * 2 ** (attempts - 1)))
+        self._finish(job_id, RETRYING, None, error, time.time() + delay)
+        return delay
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job's status, attempts, result or last error; None if there is no such job"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, request, result, error, attempts, created_at, updated_at, run_after FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, request, result, error, attempts, created_at, updated_at, run_after = row
+        return {
+            "job_id": job_id,
+            "status": status,
+            "attempts": attempts,
+            "request": json.loads(request),
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "created_at": _iso(created_at),
+            "updated_at": _iso(updated_at),
+            "next_attempt_at": _iso(run_after) if status == RETRYING else None,
+        }
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """get() once the job has finished or timeout seconds have passed, whichever is first"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                return job
+            with self._finished:
+                # Short waits also catch jobs finished by another process sharing the file
+                self._finished.wait(min(remaining, 0.5))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM jobs WHERE status IN (?, ?, ?)", (QUEUED, RETRYING, RUNNING)
+            ).fetchone()[0]
+        return {
+            "jobs": {status: counts.get(status, 0) for status in (QUEUED, RUNNING, RETRYING, SUCCEEDED, FAILED)},
+            "oldest_pending_seconds": time.time() - oldest if oldest is not None else 0.0,
+        }
+
+
+class OutboxWorkers:
+    """
+    Background threads that drain an outbox: each claims up to batch_size due
+    jobs and hands them to process(jobs), which must complete, retry or fail
+    every job. notify() wakes an idle worker at once; otherwise they look for
+    due retries every poll_seconds.
+    """
+
+    def __init__(self, outbox: BookingOutbox, process: Callable[[List[Job]], None], workers: int = 2,
+                 batch_size: int = 50, poll_seconds: float = 1.0, name: str = "outbox"):
+        self.outbox = outbox
+        self.process = process
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.name = name
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads (once)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+        logger.info(f"📮 Started {self.workers} {self.name} worker(s)")
+
+    def notify(self):
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0):
+        """Ask the workers to stop and wait for the current batches; unfinished jobs are retried after their lease"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._stop.set()
+        self._wake.set()
+        for thread in threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                jobs = self.outbox.claim(self.batch_size)
+            except Exception as e:
+                logger.error(f"Error claiming {self.name} jobs: {e}")
+                jobs = []
+            if not jobs:
+                self._wake.wait(self.poll_seconds)
+                continue
+            try:
+                self.process(jobs)
+            except Exception as e:
+                logger.error(f"Error processing {self.name} jobs: {e}")
+                for job_id, _, attempts in jobs:
+                    self.outbox.retry(job_id, attempts, str(e))
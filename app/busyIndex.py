@@ -0,0 +1,250 @@
+# In-process index of busy intervals, one per calendar
+import bisect
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+Interval = Tuple[datetime, datetime]
+# (generation, monotonic time) taken before a fetch; see BusyIntervalIndex.begin_fill
+FillToken = Tuple[int, float]
+
+ONE_DAY = timedelta(days=1)
+
+
+def to_utc(dt: datetime) -> datetime:
+    """Normalize a datetime to aware UTC; naive values are taken to be UTC already"""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def to_rfc3339(dt: datetime) -> str:
+    """Format a datetime the way the Calendar API expects (UTC, 'Z' suffix)"""
+    return to_utc(dt).isoformat().replace('+00:00', 'Z')
+
+
+def day_window(start: datetime, end: datetime) -> Interval:
+    """Widen [start, end) to whole UTC days, the unit the index is filled in"""
+    window_start = to_utc(start).replace(hour=0, minute=0, second=0, microsecond=0)
+    window_end = to_utc(end).replace(hour=0, minute=0, second=0, microsecond=0)
+    if window_end < to_utc(end) or window_end == window_start:
+        window_end += ONE_DAY
+    return window_start, window_end
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _days_between(start: datetime, end: datetime) -> List[date]:
+    """UTC days touched by [start, end)"""
+    day = start.date()
+    last = (end - timedelta(microseconds=1)).date() if end > start else day
+    days = []
+    while day <= last:
+        days.append(day)
+        day += ONE_DAY
+    return days
+
+
+class _DayBucket:
+    """Busy intervals for one UTC day, kept sorted and non-overlapping"""
+    __slots__ = ('fetched_at', 'starts', 'ends')
+
+    def __init__(self, fetched_at: float):
+        self.fetched_at = fetched_at
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+
+    def add(self, start: datetime, end: datetime):
+        # Merge with every interval that overlaps or touches [start, end)
+        i = bisect.bisect_left(self.ends, start)
+        j = bisect.bisect_right(self.starts, end)
+        if i < j:
+            start = min(start, self.starts[i])
+            end = max(end, self.ends[j - 1])
+        self.starts[i:j] = [start]
+        self.ends[i:j] = [end]
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Interval]:
+        i = bisect.bisect_right(self.ends, start)
+        j = bisect.bisect_left(self.starts, end)
+        return list(zip(self.starts[i:j], self.ends[i:j]))
+
+
+class BusyIntervalIndex:
+    """
+    Per-calendar busy intervals filled by whole UTC days.
+    Lookups are answered locally while every day they touch is cached and
+    younger than the TTL; otherwise they report a miss so the caller can fetch.
+
+    Every add() and discard_event() bumps a generation counter and is logged
+    against the days it touches (for one TTL). A fill() given the token that
+    begin_fill() returned before the fetch started merges in the intervals
+    added since, and leaves out days where an event was discarded since, so
+    a freebusy answer that raced a booking or cancellation can't hide it.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._days: Dict[str, Dict[date, _DayBucket]] = {}
+        self._events: Dict[str, Dict[str, Tuple[datetime, datetime, float]]] = {}
+        self._generation = 0
+        # Per calendar and day: (generation, when, added interval or None for a discard)
+        self._changes: Dict[str, Dict[date, List[Tuple[int, float, Optional[Interval]]]]] = {}
+        # Generation of the last change that dropped a whole calendar, or all of them
+        self._cleared: Dict[str, int] = {}
+        self._cleared_all = 0
+
+    def _is_fresh(self, bucket: Optional[_DayBucket], now: float) -> bool:
+        return bucket is not None and now - bucket.fetched_at < self.ttl_seconds
+
+    def lookup(self, calendar_id: str, start: datetime, end: datetime) -> Optional[List[Interval]]:
+        """Busy intervals overlapping [start, end), clipped to it, or None on a cache miss"""
+        start, end = to_utc(start), to_utc(end)
+        now = time.monotonic()
+        with self._lock:
+            days = self._days.get(calendar_id, {})
+            buckets = [days.get(day) for day in _days_between(start, end)]
+            if not all(self._is_fresh(bucket, now) for bucket in buckets):
+                self.misses += 1
+                return None
+            self.hits += 1
+            busy: List[Interval] = []
+            for bucket in buckets:
+                for slot_start, slot_end in bucket.overlapping(start, end):
+                    slot_start, slot_end = max(slot_start, start), min(slot_end, end)
+                    # Join pieces that were split at a day boundary
+                    if busy and busy[-1][1] >= slot_start:
+                        busy[-1] = (busy[-1][0], max(busy[-1][1], slot_end))
+                    else:
+                        busy.append((slot_start, slot_end))
+            return busy
+
+    def begin_fill(self) -> FillToken:
+        """Token to take just before fetching freebusy results, for fill()"""
+        with self._lock:
+            return self._generation, time.monotonic()
+
+    def fill(self, calendar_id: str, window_start: datetime, window_end: datetime, busy: List[Interval],
+             since: Optional[FillToken] = None):
+        """
+        Replace the cached days inside a day-aligned window with fresh freebusy results.
+        since is the begin_fill() token taken before the fetch; without it the
+        results are taken to be current.
+        """
+        window_start, window_end = to_utc(window_start), to_utc(window_end)
+        now = time.monotonic()
+        with self._lock:
+            generation, fetched_at = since if since is not None else (self._generation, now)
+            days = self._days.setdefault(calendar_id, {})
+            # Drop expired days so the index stays bounded by the active windows
+            expired = [d for d, bucket in days.items() if not self._is_fresh(bucket, now)]
+            for day in expired:
+                del days[day]
+            self._prune_changes(calendar_id, now)
+            if expired:
+                self._prune_events(calendar_id, now)
+            if now - fetched_at >= self.ttl_seconds:
+                return
+            if max(self._cleared.get(calendar_id, 0), self._cleared_all) > generation:
+                return
+
+            changes = self._changes.get(calendar_id, {})
+            fresh: Dict[date, _DayBucket] = {}
+            added: List[Interval] = []
+            for day in _days_between(window_start, window_end):
+                later = [interval for changed, _, interval in changes.get(day, []) if changed > generation]
+                if None in later:
+                    # An event was cancelled after the fetch started and may still be in the results
+                    continue
+                fresh[day] = _DayBucket(fetched_at)
+                added.extend(later)
+            for slot_start, slot_end in busy:
+                self._add_to(fresh, to_utc(slot_start), to_utc(slot_end))
+            for slot_start, slot_end in added:
+                self._add_to(fresh, slot_start, slot_end)
+            days.update(fresh)
+
+    def add(self, calendar_id: str, start: datetime, end: datetime, event_id: Optional[str] = None):
+        """Record a newly booked interval in every cached day it touches"""
+        start, end = to_utc(start), to_utc(end)
+        now = time.monotonic()
+        with self._lock:
+            self._add_to(self._days.get(calendar_id, {}), start, end)
+            self._log_change(calendar_id, start, end, (start, end), now)
+            if event_id:
+                self._events.setdefault(calendar_id, {})[event_id] = (start, end, now)
+
+    def discard_event(self, calendar_id: str, event_id: str):
+        """
+        Forget a cancelled event. Intervals are merged, so the affected days are
+        dropped and refetched on the next lookup; if the event is unknown, the
+        whole calendar is dropped.
+        """
+        now = time.monotonic()
+        with self._lock:
+            event = self._events.get(calendar_id, {}).pop(event_id, None)
+            days = self._days.get(calendar_id, {})
+            if event is None:
+                days.clear()
+                self._generation += 1
+                self._cleared[calendar_id] = self._generation
+                self._events.pop(calendar_id, None)
+                return
+            start, end, _ = event
+            for day in _days_between(start, end):
+                days.pop(day, None)
+            self._log_change(calendar_id, start, end, None, now)
+            self._prune_events(calendar_id, now)
+
+    def invalidate(self, calendar_id: Optional[str] = None):
+        """Drop cached days for one calendar, or for all calendars"""
+        with self._lock:
+            self._generation += 1
+            if calendar_id is None:
+                self._days.clear()
+                self._events.clear()
+                self._cleared_all = self._generation
+            else:
+                self._days.pop(calendar_id, None)
+                self._events.pop(calendar_id, None)
+                self._cleared[calendar_id] = self._generation
+
+    def _log_change(self, calendar_id: str, start: datetime, end: datetime, interval: Optional[Interval], now: float):
+        self._generation += 1
+        changes = self._changes.setdefault(calendar_id, {})
+        for day in _days_between(start, end):
+            changes.setdefault(day, []).append((self._generation, now, interval))
+
+    def _prune_changes(self, calendar_id: str, now: float):
+        """Forget changes older than the TTL; no fill can still need them"""
+        changes = self._changes.get(calendar_id, {})
+        for day in list(changes):
+            kept = [change for change in changes[day] if now - change[1] < self.ttl_seconds]
+            if kept:
+                changes[day] = kept
+            else:
+                del changes[day]
+
+    def _prune_events(self, calendar_id: str, now: float):
+        """Forget events none of whose days are cached, unless a fill in flight may still cache them"""
+        events = self._events.get(calendar_id)
+        if not events:
+            return
+        days = self._days.get(calendar_id, {})
+        for event_id, (start, end, added_at) in list(events.items()):
+            if now - added_at >= self.ttl_seconds and not any(day in days for day in _days_between(start, end)):
+                del events[event_id]
+
+    @staticmethod
+    def _add_to(buckets: Dict[date, _DayBucket], start: datetime, end: datetime):
+        for day in _days_between(start, end):
+            bucket = buckets.get(day)
+            if bucket is not None:
+                day_start = _day_start(day)
+                bucket.add(max(start, day_start), min(end, day_start + ONE_DAY))
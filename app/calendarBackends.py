@@ -0,0 +1,566 @@
+# Calendar backends: the raw calendar operations behind calendarUtils
+import abc
+import bisect
+import itertools
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pytz
+from dateutil import parser as date_parser
+
+from app.busyIndex import Interval, to_rfc3339, to_utc
+from app.clientPool import CalendarClientPool
+from app.metrics import CALENDAR_ERRORS, CALENDAR_REQUEST_SECONDS, observe_calendar
+from app.outboundScheduler import OutboundScheduler, classify_error
+
+logger = logging.getLogger(__name__)
+
+# Per calendar: {"busy": [(start, end), ...]} or {"error": "reason"}
+FreeBusyResult = Dict[str, Dict[str, Any]]
+
+
+class SyncTokenExpired(Exception):
+    """The backend no longer accepts a sync token; the caller should run a full sync"""
+
+
+class EventNotFound(Exception):
+    """The event does not exist (or was already deleted)"""
+
+
+class CalendarAPIError(Exception):
+    """A Calendar API request answered with an HTTP error status"""
+
+    def __init__(self, status: int, reason: str, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"<HTTP {status} {reason}: {message}>")
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after  # Seconds, from a Retry-After header
+
+
+def event_fields_mask(fields: Sequence[str]) -> str:
+    """Partial-response mask for an events list that returns only these event fields"""
+    return f"nextPageToken,items({','.join(fields)})"
+
+
+def project_event(event: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """The given top-level fields of an event resource, as a field mask would return them"""
+    return {name: event[name] for name in fields if name in event}
+
+
+def freebusy_body(time_min: datetime, time_max: datetime, calendar_ids: List[str]) -> Dict[str, Any]:
+    """Request body of a Calendar API freebusy query"""
+    return {
+        "timeMin": to_rfc3339(time_min),
+        "timeMax": to_rfc3339(time_max),
+        "items": [{"id": calendar_id} for calendar_id in calendar_ids]
+    }
+
+
+def parse_freebusy(result: Dict[str, Any], calendar_ids: List[str]) -> FreeBusyResult:
+    """Busy intervals (or the error reason) per calendar from a Calendar API freebusy response"""
+    calendars = {}
+    for calendar_id in calendar_ids:
+        entry = result.get('calendars', {}).get(calendar_id, {})
+        if entry.get('errors'):
+            calendars[calendar_id] = {"error": entry['errors'][0].get('reason', 'unknown')}
+        else:
+            calendars[calendar_id] = {"busy": [
+                (date_parser.isoparse(slot['start']), date_parser.isoparse(slot['end']))
+                for slot in entry.get('busy', [])
+            ]}
+    return calendars
+
+
+class CalendarBackend(abc.ABC):
+    """
+    Calendar operations that talk to the calendar itself. calendarUtils keeps
+    the busy index, the event mirror and reply formatting on top of these, so
+    every backend gets them for free. Event bodies use the Google Calendar
+    event resource format. A backend that misses one of the abstract methods
+    fails when it is created; the batch methods default to one call per item.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def freebusy(self, time_min: datetime, time_max: datetime, calendar_ids: List[str]) -> FreeBusyResult:
+        """Busy intervals (UTC) per calendar between time_min and time_max"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def insert_event(self, calendar_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an event and return it as stored (with 'id' and 'htmlLink')"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete_event(self, calendar_id: str, event_id: str):
+        raise NotImplementedError
+
+    def insert_events(self, calendar_id: str, bodies: List[Dict[str, Any]]) -> List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]:
+        """Create many events; returns (event, exception) per body, in order"""
+        results = []
+        for body in bodies:
+            try:
+                results.append((self.insert_event(calendar_id, body), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+
+    def delete_events(self, calendar_id: str, event_ids: List[str]) -> List[Optional[Exception]]:
+        """Delete many events; returns the exception (or None) per id, in order"""
+        results = []
+        for event_id in event_ids:
+            try:
+                self.delete_event(calendar_id, event_id)
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+        return results
+
+    @abc.abstractmethod
+    def list_events(self, calendar_id: str, sync_token: Optional[str], time_min: datetime) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Full listing of events ending after time_min (no token), or the changes
+        since sync_token (deleted events have status 'cancelled')
+        Returns (events, next_sync_token); raises SyncTokenExpired when the token is too old
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_events(self, calendar_id: str, time_min: datetime, time_max: datetime, fields: Sequence[str],
+                    page_size: int = 250) -> Iterator[Dict[str, Any]]:
+        """
+        Events overlapping [time_min, time_max), soonest first, with only the given
+        fields. Pages are fetched as the caller iterates, so memory stays at one page
+        and stopping early saves the remaining requests.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_calendar(self, calendar_id: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class GoogleCalendarBackend(CalendarBackend):
+    """
+    Google Calendar API through a pool of thread-safe clients. With a
+    scheduler, every request (and every item of a batch) is rate limited and
+    transient failures are retried with backoff.
+    """
+
+    name = "google"
+
+    def __init__(self, pool: CalendarClientPool, batch_size: int = 50, scheduler: Optional[OutboundScheduler] = None):
+        self.pool = pool
+        self.batch_size = batch_size  # Calendar API limit on requests per batch
+        self.scheduler = scheduler
+
+    def _schedule(self, operation: str, fn, cost: int = 1):
+        """Run fn() through the scheduler when there is one"""
+        if self.scheduler is None:
+            return fn()
+        return self.scheduler.call("calendar", operation, fn, cost=cost)
+
+    def _execute(self, operation: str, build):
+        """Execute the request build(service) builds, on a client checked out once the call may go"""
+        def attempt():
+            with self.pool.client() as service:
+                return observe_calendar(operation, build(service))
+        return self._schedule(operation, attempt)
+
+    def freebusy(self, time_min: datetime, time_max: datetime, calendar_ids: List[str]) -> FreeBusyResult:
+        body = freebusy_body(time_min, time_max, calendar_ids)
+        result = self._execute("freebusy", lambda service: service.freebusy().query(body=body))
+        return parse_freebusy(result, calendar_ids)
+
+    def insert_event(self, calendar_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._execute("insert", lambda service: service.events().insert(
+            calendarId=calendar_id,
+            body=body,
+            sendUpdates='all'  # Send email notifications to attendees
+        ))
+
+    def delete_event(self, calendar_id: str, event_id: str):
+        self._execute("delete", lambda service: service.events().delete(calendarId=calendar_id, eventId=event_id))
+
+    def _execute_batch(self, service, requests: List[Any], operation: str, item_operation: str) -> List[Tuple[Any, Optional[Exception]]]:
+        """
+        Run requests as Calendar batch HTTP requests of batch_size
+        The requests must have been built from the same checked-out service. Each
+        item counts against the rate limits of item_operation (Google's quota counts
+        the requests inside a batch, not the batch); items rejected with a transient error
+        inside a batch go again in a later batch, after a backoff
+        Returns the (response, exception) pair delivered for each request, in order
+        """
+        responses: Dict[str, Tuple[Any, Optional[Exception]]] = {}
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                CALENDAR_ERRORS.inc(operation=operation)
+            responses[request_id] = (response, exception)
+
+        def send(batch):
+            with CALENDAR_REQUEST_SECONDS.time(operation=operation):
+                batch.execute()
+
+        pending = list(range(len(requests)))
+        attempt = 0
+        while True:
+            for i in range(0, len(pending), self.batch_size):
+                chunk = pending[i:i + self.batch_size]
+                batch = service.new_batch_http_request(callback=callback)
+                for index in chunk:
+                    batch.add(requests[index], request_id=str(index))
+                try:
+                    self._schedule(item_operation, lambda: send(batch), cost=len(chunk))
+                except Exception as e:
+                    CALENDAR_ERRORS.inc(operation=operation)
+                    # The whole batch failed to send; fail every item that got no answer
+                    logger.error(f"Batch request failed: {e}")
+                    for index in chunk:
+                        responses.setdefault(str(index), (None, e))
+
+            if self.scheduler is None or attempt >= self.scheduler.max_retries:
+                break
+            retry = [
+                index for index in pending
+                if str(index) in responses and responses[str(index)][1] is not None
+                and classify_error(responses[str(index)][1]) is not None
+            ]
+            if not retry:
+                break
+            delay = self.scheduler.backoff_delay(attempt)
+            logger.warning(f"⏳ {len(retry)} {operation} item(s) hit transient errors; retrying in {delay:.2f}s")
+            time.sleep(delay)
+            for index in retry:
+                del responses[str(index)]
+            pending = retry
+            attempt += 1
+
+        return [responses.get(str(index), (None, RuntimeError("No response in batch"))) for index in range(len(requests))]
+
+    def insert_events(self, calendar_id: str, bodies: List[Dict[str, Any]]) -> List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]:
+        with self.pool.client() as service:
+            requests = [
+                service.events().insert(calendarId=calendar_id, body=body, sendUpdates='all')
+                for body in bodies
+            ]
+            return self._execute_batch(service, requests, "batch_insert", "insert")
+
+    def delete_events(self, calendar_id: str, event_ids: List[str]) -> List[Optional[Exception]]:
+        with self.pool.client() as service:
+            requests = [service.events().delete(calendarId=calendar_id, eventId=event_id) for event_id in event_ids]
+            return [exception for _, exception in self._execute_batch(service, requests, "batch_delete", "delete")]
+
+    def list_events(self, calendar_id: str, sync_token: Optional[str], time_min: datetime) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        from googleapiclient.errors import HttpError
+
+        params = {"calendarId": calendar_id, "singleEvents": True, "maxResults": 2500}
+        if sync_token:
+            params["syncToken"] = sync_token
+        else:
+            params["timeMin"] = to_rfc3339(time_min)
+
+        items: List[Dict[str, Any]] = []
+        try:
+            for result in self._list_pages(params):
+                items.extend(result.get('items', []))
+        except HttpError as e:
+            if sync_token and getattr(e.resp, 'status', None) == 410:
+                raise SyncTokenExpired(str(e)) from e
+            raise
+        return items, result.get('nextSyncToken')
+
+    def _list_pages(self, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """events().list responses, one page at a time, following nextPageToken"""
+        page_token = None
+        while True:
+            result = self._execute("list", lambda service: service.events().list(pageToken=page_token, **params))
+            yield result
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return
+
+    def iter_events(self, calendar_id: str, time_min: datetime, time_max: datetime, fields: Sequence[str],
+                    page_size: int = 250) -> Iterator[Dict[str, Any]]:
+        params = {
+            "calendarId": calendar_id,
+            "singleEvents": True,
+            "orderBy": "startTime",
+            "timeMin": to_rfc3339(time_min),
+            "timeMax": to_rfc3339(time_max),
+            "maxResults": page_size,
+            "fields": event_fields_mask(fields),
+        }
+        for result in self._list_pages(params):
+            yield from result.get('items', [])
+
+    def get_calendar(self, calendar_id: str) -> Dict[str, Any]:
+        return self._execute("get", lambda service: service.calendars().get(calendarId=calendar_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "pool": self.pool.stats()}
+
+
+class _MemoryCalendar:
+    """Events of one in-memory calendar, indexed by start time"""
+    __slots__ = ('events', 'spans', 'starts', 'max_duration')
+
+    def __init__(self):
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.spans: Dict[str, Interval] = {}
+        # Sorted (start, event_id); with max_duration this bounds the scan for overlaps
+        self.starts: List[Tuple[datetime, str]] = []
+        self.max_duration = timedelta(0)
+
+    def add(self, event_id: str, event: Dict[str, Any], start: datetime, end: datetime):
+        self.events[event_id] = event
+        self.spans[event_id] = (start, end)
+        bisect.insort(self.starts, (start, event_id))
+        self.max_duration = max(self.max_duration, end - start)
+
+    def remove(self, event_id: str):
+        start, _ = self.spans.pop(event_id)
+        del self.events[event_id]
+        del self.starts[bisect.bisect_left(self.starts, (start, event_id))]
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Tuple[Interval, str]]:
+        lo = bisect.bisect_left(self.starts, (start - self.max_duration,))
+        hi = bisect.bisect_left(self.starts, (end,))
+        found = []
+        for _, event_id in self.starts[lo:hi]:
+            span = self.spans[event_id]
+            if span[1] > start:
+                found.append((span, event_id))
+        return found
+
+
+class InMemoryCalendarBackend(CalendarBackend):
+    """
+    Calendar kept in process memory, for load tests and capacity planning
+    without Google. Every call sleeps for latency_seconds plus up to
+    jitter_seconds to stand in for the network round trip (once per batch of
+    batch_size for bulk calls, like Google batches). Sync tokens are positions
+    in a change log of the last change_log_size changes.
+    """
+
+    name = "memory"
+
+    def __init__(self, latency_seconds: float = 0.0, jitter_seconds: float = 0.0, batch_size: int = 50,
+                 change_log_size: int = 10000, timezone: str = "Asia/Kolkata"):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.batch_size = batch_size
+        self.change_log_size = change_log_size
+        self.timezone = timezone
+        self._lock = threading.Lock()
+        self._calendars: Dict[str, _MemoryCalendar] = {}
+        # (sequence, calendar_id, event_id) for every insert and delete
+        self._changes: List[Tuple[int, str, str]] = []
+        self._sequence = itertools.count(1)
+        self._last_sequence = 0
+        self._calls = 0
+
+    def next_delay(self) -> float:
+        """Count a call and return the latency to inject for it"""
+        with self._lock:
+            self._calls += 1
+        return self.latency_seconds + (random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0.0)
+
+    def _round_trip(self, operation: str):
+        """Record the call and sleep for the injected latency"""
+        delay = self.next_delay()
+        with CALENDAR_REQUEST_SECONDS.time(operation=operation):
+            if delay > 0:
+                time.sleep(delay)
+
+    def _calendar(self, calendar_id: str) -> _MemoryCalendar:
+        calendar = self._calendars.get(calendar_id)
+        if calendar is None:
+            calendar = self._calendars[calendar_id] = _MemoryCalendar()
+        return calendar
+
+    def _record_change(self, calendar_id: str, event_id: str):
+        self._last_sequence = next(self._sequence)
+        self._changes.append((self._last_sequence, calendar_id, event_id))
+        if len(self._changes) > self.change_log_size * 2:
+            del self._changes[:-self.change_log_size]
+
+    def _parse_time(self, when: Dict[str, str]) -> datetime:
+        if 'dateTime' in when:
+            value = date_parser.isoparse(when['dateTime'])
+            if value.tzinfo is None:
+                value = pytz.timezone(when.get('timeZone', self.timezone)).localize(value)
+        else:
+            value = pytz.timezone(self.timezone).localize(datetime.fromisoformat(when['date']))
+        return to_utc(value)
+
+    def store(self, calendar_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        start, end = self._parse_time(body['start']), self._parse_time(body.get('end', body['start']))
+        if end <= start:
+            raise ValueError("The event must end after it starts")
+        # Callers may choose the id, as with Google, to make retried inserts idempotent
+        event_id = body.get('id') or uuid.uuid4().hex
+        event = dict(body, id=event_id, status='confirmed', htmlLink=f"memory://{calendar_id}/{event_id}")
+        # Like Google, return times with their UTC offset
+        local_tz = pytz.timezone(body['start'].get('timeZone', self.timezone))
+        event['start'] = dict(body['start'], dateTime=start.astimezone(local_tz).isoformat())
+        event['end'] = dict(body.get('end', body['start']), dateTime=end.astimezone(local_tz).isoformat())
+        with self._lock:
+            if event_id in self._calendar(calendar_id).events:
+                raise CalendarAPIError(409, "duplicate", "The requested identifier already exists.")
+            self._calendar(calendar_id).add(event_id, event, start, end)
+            self._record_change(calendar_id, event_id)
+        return event
+
+    def remove(self, calendar_id: str, event_id: str):
+        with self._lock:
+            calendar = self._calendars.get(calendar_id)
+            if calendar is None or event_id not in calendar.events:
+                raise EventNotFound(f"Event {event_id} not found")
+            calendar.remove(event_id)
+            self._record_change(calendar_id, event_id)
+
+    def freebusy(self, time_min: datetime, time_max: datetime, calendar_ids: List[str]) -> FreeBusyResult:
+        self._round_trip("freebusy")
+        return self.read_freebusy(time_min, time_max, calendar_ids)
+
+    # The read_* methods answer without the injected latency (see AsyncInMemoryCalendarBackend)
+    def read_freebusy(self, time_min: datetime, time_max: datetime, calendar_ids: List[str]) -> FreeBusyResult:
+        time_min, time_max = to_utc(time_min), to_utc(time_max)
+        result: FreeBusyResult = {}
+        with self._lock:
+            for calendar_id in calendar_ids:
+                busy: List[Interval] = []
+                spans = sorted(span for span, _ in self._calendar(calendar_id).overlapping(time_min, time_max))
+                for start, end in spans:
+                    start, end = max(start, time_min), min(end, time_max)
+                    if busy and busy[-1][1] >= start:
+                        busy[-1] = (busy[-1][0], max(busy[-1][1], end))
+                    else:
+                        busy.append((start, end))
+                result[calendar_id] = {"busy": busy}
+        return result
+
+    def insert_event(self, calendar_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._round_trip("insert")
+        return self.store(calendar_id, body)
+
+    def delete_event(self, calendar_id: str, event_id: str):
+        self._round_trip("delete")
+        try:
+            self.remove(calendar_id, event_id)
+        except EventNotFound:
+            CALENDAR_ERRORS.inc(operation="delete")
+            raise
+
+    def insert_events(self, calendar_id: str, bodies: List[Dict[str, Any]]) -> List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]:
+        results = []
+        for i in range(0, len(bodies), self.batch_size):
+            self._round_trip("batch_insert")
+            for body in bodies[i:i + self.batch_size]:
+                try:
+                    results.append((self.store(calendar_id, body), None))
+                except Exception as e:
+                    CALENDAR_ERRORS.inc(operation="batch_insert")
+                    results.append((None, e))
+        return results
+
+    def delete_events(self, calendar_id: str, event_ids: List[str]) -> List[Optional[Exception]]:
+        results: List[Optional[Exception]] = []
+        for i in range(0, len(event_ids), self.batch_size):
+            self._round_trip("batch_delete")
+            for event_id in event_ids[i:i + self.batch_size]:
+                try:
+                    self.remove(calendar_id, event_id)
+                    results.append(None)
+                except EventNotFound as e:
+                    CALENDAR_ERRORS.inc(operation="batch_delete")
+                    results.append(e)
+        return results
+
+    def list_events(self, calendar_id: str, sync_token: Optional[str], time_min: datetime) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        self._round_trip("list")
+        return self.read_events(calendar_id, sync_token, time_min)
+
+    def read_events(self, calendar_id: str, sync_token: Optional[str], time_min: datetime) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        with self._lock:
+            calendar = self._calendar(calendar_id)
+            next_token = str(self._last_sequence)
+            if not sync_token:
+                time_min = to_utc(time_min)
+                items = [
+                    calendar.events[event_id]
+                    for _, event_id in calendar.starts
+                    if calendar.spans[event_id][1] > time_min
+                ]
+                return items, next_token
+
+            since = int(sync_token)
+            oldest = self._changes[0][0] if self._changes else self._last_sequence + 1
+            if since < oldest - 1:
+                raise SyncTokenExpired(f"Sync token {sync_token} is older than the change log")
+            position = bisect.bisect_left(self._changes, (since + 1,))
+            changed = dict.fromkeys(
+                event_id for _, changed_calendar, event_id in self._changes[position:] if changed_calendar == calendar_id
+            )
+            items = [calendar.events.get(event_id) or {"id": event_id, "status": "cancelled"} for event_id in changed]
+            return items, next_token
+
+    def iter_events(self, calendar_id: str, time_min: datetime, time_max: datetime, fields: Sequence[str],
+                    page_size: int = 250) -> Iterator[Dict[str, Any]]:
+        position = 0
+        while True:
+            self._round_trip("list")
+            page, position = self.read_events_page(calendar_id, time_min, time_max, fields, position, page_size)
+            yield from page
+            if position is None:
+                return
+
+    def read_events_page(self, calendar_id: str, time_min: datetime, time_max: datetime, fields: Sequence[str],
+                         position: int, page_size: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        One page of iter_events starting at a position in the start order
+        Returns (events, next position or None after the last page).
+        """
+        time_min, time_max = to_utc(time_min), to_utc(time_max)
+        page: List[Dict[str, Any]] = []
+        with self._lock:
+            calendar = self._calendar(calendar_id)
+            position = max(position, bisect.bisect_left(calendar.starts, (time_min - calendar.max_duration,)))
+            while position < len(calendar.starts):
+                start, event_id = calendar.starts[position]
+                if start >= time_max:
+                    return page, None
+                if len(page) == page_size:
+                    return page, position
+                position += 1
+                if calendar.spans[event_id][1] > time_min:
+                    page.append(project_event(calendar.events[event_id], fields))
+        return page, None
+
+    def get_calendar(self, calendar_id: str) -> Dict[str, Any]:
+        self._round_trip("get")
+        return self.read_calendar(calendar_id)
+
+    def read_calendar(self, calendar_id: str) -> Dict[str, Any]:
+        return {"id": calendar_id, "summary": "In-memory calendar", "description": None, "timeZone": self.timezone}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "calls": self._calls,
+                "calendars": len(self._calendars),
+                "events": sum(len(calendar.events) for calendar in self._calendars.values()),
+                "latency_seconds": self.latency_seconds,
+                "jitter_seconds": self.jitter_seconds,
+            }
@@ -1,12 +1,22 @@
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta, timezone
 from dateutil import parser as date_parser
 import pytz 
-import re
+import itertools
+import os
+import threading
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+from app.meetingParser import parse_meeting
+from app.meetingImport import BusyTimeline, ImportRow
+from app.bookingOutbox import FAILED, SUCCEEDED, BookingOutbox, Job, OutboxWorkers
+from app.busyIndex import BusyIntervalIndex, FillToken, Interval, day_window, to_rfc3339, to_utc
+from app.clientPool import CalendarClientPool
+from app.eventStore import EventStore
+from app.freeSlots import free_slots, free_windows, merge_busy, nearest_slots, working_windows
+from app.calendarBackends import CalendarAPIError, CalendarBackend, GoogleCalendarBackend, InMemoryCalendarBackend, SyncTokenExpired
+from app.outboundScheduler import BULK, classify_error, outbound_lane, scheduler as outbound_scheduler
+from app.singleFlight import SingleFlight
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,97 +25,509 @@ logger = logging.getLogger(__name__)
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 SERVICE_ACCOUNT_FILE = 'assignments-464701-418734497e1c.json'
 CALENDAR_ID = 'assignment@assignments-464701.iam.gserviceaccount.com'  # Replace with your real/test calendar ID
+BUSY_INDEX_TTL_SECONDS = float(os.getenv("BUSY_INDEX_TTL_SECONDS", "60"))
+FREEBUSY_MAX_ITEMS = 50  # Calendar API limit on calendars per freebusy query
+FREEBUSY_MAX_SPAN_DAYS = int(os.getenv("FREEBUSY_MAX_SPAN_DAYS", "31"))
+CALENDAR_BATCH_SIZE = 50  # Calendar API limit on requests per batch
+CALENDAR_POOL_SIZE = int(os.getenv("CALENDAR_POOL_SIZE", "10"))
+CALENDAR_POOL_TIMEOUT_SECONDS = float(os.getenv("CALENDAR_POOL_TIMEOUT_SECONDS", "30"))
+CALENDAR_HTTP_TIMEOUT_SECONDS = float(os.getenv("CALENDAR_HTTP_TIMEOUT_SECONDS", "30"))
+EVENT_STORE_PATH = os.getenv("EVENT_STORE_PATH", ":memory:")
+EVENT_SYNC_INTERVAL_SECONDS = float(os.getenv("EVENT_SYNC_INTERVAL_SECONDS", "30"))
+EVENT_SYNC_LOOKBACK_DAYS = int(os.getenv("EVENT_SYNC_LOOKBACK_DAYS", "30"))
+WORKING_HOURS = os.getenv("WORKING_HOURS", "09:00-18:00")  # Local time range searched for free slots
+FREE_SLOT_STEP_MINUTES = int(os.getenv("FREE_SLOT_STEP_MINUTES", "15"))
+FREE_SLOT_SUGGESTIONS = int(os.getenv("FREE_SLOT_SUGGESTIONS", "3"))
+FREE_SLOT_SEARCH_DAYS = int(os.getenv("FREE_SLOT_SEARCH_DAYS", "2"))
+CALENDAR_BACKEND = os.getenv("CALENDAR_BACKEND", "google").lower()  # 'google' or 'memory' (offline load tests)
+MEMORY_CALENDAR_LATENCY_MS = float(os.getenv("MEMORY_CALENDAR_LATENCY_MS", "0"))
+MEMORY_CALENDAR_JITTER_MS = float(os.getenv("MEMORY_CALENDAR_JITTER_MS", "0"))
+BOOKING_OUTBOX_PATH = os.getenv("BOOKING_OUTBOX_PATH", "booking_outbox.db")  # ':memory:' keeps queued bookings per process
+BOOKING_OUTBOX_WORKERS = int(os.getenv("BOOKING_OUTBOX_WORKERS", "2"))
+BOOKING_OUTBOX_MAX_ATTEMPTS = int(os.getenv("BOOKING_OUTBOX_MAX_ATTEMPTS", "8"))
+BOOKING_OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("BOOKING_OUTBOX_RETRY_MAX_SECONDS", "300"))
+EVENT_PAGE_SIZE = int(os.getenv("EVENT_PAGE_SIZE", "250"))  # Events per events().list page when streaming
+IMPORT_WRITE_BATCH_SIZE = int(os.getenv("IMPORT_WRITE_BATCH_SIZE", "200"))  # Imported rows booked per book_events call
+BOOKING_CONFIRM_WAIT_SECONDS = float(os.getenv("BOOKING_CONFIRM_WAIT_SECONDS", "3"))  # How long chat waits for a booking to land
 
-# Initialize Google Calendar service
-try:
-    credentials = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE, scopes=SCOPES
-    )
-    service = build('calendar', 'v3', credentials=credentials)
-    logger.info("✅ Google Calendar service initialized successfully")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize Google Calendar service: {e}")
-    service = None
+# Busy slots cached per calendar so conflict checks are usually memory lookups
+busy_index = BusyIntervalIndex(ttl_seconds=BUSY_INDEX_TTL_SECONDS)
+
+# Identical reads in flight at the same time (a herd of users opening the app) share one upstream call
+calendar_reads = SingleFlight("calendar")
+
+# Local event mirror kept current with incremental sync tokens; event reads come from here
+event_store = EventStore(EVENT_STORE_PATH)
+sync_lock = threading.Lock()
+
+# Bumped on every local write and every sync that brings in changes, so caches
+# of anything derived from calendar contents can tell when they are stale
+_state_version = 0
+_state_lock = threading.Lock()
+
+def bump_state_version():
+    global _state_version
+    with _state_lock:
+        _state_version += 1
+
+# The Google client libraries and credentials are loaded on first use (or by the
+# API's background warm-up) so importing this module stays cheap
+calendar_pool: Optional[CalendarClientPool] = None
+_pool_lock = threading.Lock()
+_pool_initialized = False
+
+def load_credentials():
+    """Service account credentials for the Calendar API"""
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
+
+def get_calendar_pool() -> Optional[CalendarClientPool]:
+    """
+    Get the pool of Google Calendar clients, initializing it on first use
+    """
+    global calendar_pool, _pool_initialized
+    with _pool_lock:
+        if _pool_initialized:
+            return calendar_pool
+        try:
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.discovery import build
+            import httplib2
+            
+            credentials = load_credentials()
+            
+            def build_client():
+                # Each client gets its own keep-alive HTTP transport
+                http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=CALENDAR_HTTP_TIMEOUT_SECONDS))
+                return build('calendar', 'v3', http=http, cache_discovery=False)
+            
+            pool = CalendarClientPool(build_client, size=CALENDAR_POOL_SIZE, checkout_timeout=CALENDAR_POOL_TIMEOUT_SECONDS)
+            with pool.client():
+                pass  # Build the first client now so configuration errors surface early
+            calendar_pool = pool
+            logger.info("✅ Google Calendar service initialized successfully")
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize Google Calendar service: {e}")
+            calendar_pool = None
+        _pool_initialized = True
+        return calendar_pool
+
+# Which calendar the functions below talk to, chosen by CALENDAR_BACKEND on first use
+calendar_backend: Optional[CalendarBackend] = None
+_backend_lock = threading.Lock()
+_backend_initialized = False
+
+def get_calendar_backend() -> Optional[CalendarBackend]:
+    """
+    Get the configured calendar backend, initializing it on first use
+    """
+    global calendar_backend, _backend_initialized
+    with _backend_lock:
+        if _backend_initialized:
+            return calendar_backend
+        if CALENDAR_BACKEND == "memory":
+            calendar_backend = InMemoryCalendarBackend(
+                latency_seconds=MEMORY_CALENDAR_LATENCY_MS / 1000,
+                jitter_seconds=MEMORY_CALENDAR_JITTER_MS / 1000,
+                batch_size=CALENDAR_BATCH_SIZE
+            )
+            logger.info(f"✅ In-memory calendar backend initialized ({MEMORY_CALENDAR_LATENCY_MS:g} ms latency)")
+        elif CALENDAR_BACKEND == "google":
+            pool = get_calendar_pool()
+            calendar_backend = GoogleCalendarBackend(pool, batch_size=CALENDAR_BATCH_SIZE, scheduler=outbound_scheduler) if pool else None
+        else:
+            logger.error(f"❌ Unknown CALENDAR_BACKEND '{CALENDAR_BACKEND}' (expected 'google' or 'memory')")
+            calendar_backend = None
+        _backend_initialized = True
+        return calendar_backend
+
+def _busy_slot(interval: Interval) -> Dict[str, str]:
+    """Format an interval like a freebusy 'busy' entry"""
+    return {"start": to_rfc3339(interval[0]), "end": to_rfc3339(interval[1])}
+
+def _clip(intervals: List[Interval], start: datetime, end: datetime) -> List[Interval]:
+    """Intervals overlapping [start, end), clipped to it"""
+    return [
+        (max(slot_start, start), min(slot_end, end))
+        for slot_start, slot_end in intervals
+        if slot_start < end and slot_end > start
+    ]
+
+def _plan_freebusy_queries(missing: Dict[str, List[Tuple[int, Interval]]]) -> List[Tuple[datetime, datetime, List[str]]]:
+    """
+    Group uncached (calendar, day window) pairs into as few freebusy queries as possible.
+    Windows are merged into spans of at most FREEBUSY_MAX_SPAN_DAYS, and every calendar
+    with a window in a span shares that span's query (up to FREEBUSY_MAX_ITEMS per query).
+    """
+    windows = sorted(window for pending in missing.values() for _, window in pending)
+    max_span = timedelta(days=FREEBUSY_MAX_SPAN_DAYS)
+    spans: List[List[datetime]] = []
+    for window_start, window_end in windows:
+        if spans and max(spans[-1][1], window_end) - spans[-1][0] <= max_span:
+            spans[-1][1] = max(spans[-1][1], window_end)
+        else:
+            spans.append([window_start, window_end])
+    
+    queries = []
+    for span_start, span_end in spans:
+        calendars = [
+            calendar_id for calendar_id, pending in missing.items()
+            if any(span_start <= window[0] and window[1] <= span_end for _, window in pending)
+        ]
+        for i in range(0, len(calendars), FREEBUSY_MAX_ITEMS):
+            queries.append((span_start, span_end, calendars[i:i + FREEBUSY_MAX_ITEMS]))
+    return queries
+
+BusyPlan = Tuple[List[Dict[str, List[Interval]]], List[Dict[str, str]], Dict[str, List[Tuple[int, Interval]]], List[Tuple[datetime, datetime, List[str]]]]
+
+def plan_busy(ranges: List[Interval], calendars: List[str]) -> BusyPlan:
+    """
+    Answer what the busy index can for each (UTC) range and plan freebusy queries for the rest
+    Returns (busy, errors, missing, queries); busy and errors hold one dict per range
+    """
+    busy: List[Dict[str, List[Interval]]] = [{} for _ in ranges]
+    errors: List[Dict[str, str]] = [{} for _ in ranges]
+    
+    # Remember what the index can't answer by day window
+    missing: Dict[str, List[Tuple[int, Interval]]] = {}
+    for index, (start, end) in enumerate(ranges):
+        for calendar_id in calendars:
+            cached = busy_index.lookup(calendar_id, start, end)
+            if cached is None:
+                missing.setdefault(calendar_id, []).append((index, day_window(start, end)))
+            else:
+                busy[index][calendar_id] = cached
+    
+    queries = _plan_freebusy_queries(missing) if missing else []
+    logger.info(f"📅 Checking {len(ranges)} range(s) on {len(calendars)} calendar(s) with {len(queries)} freebusy query(ies)")
+    return busy, errors, missing, queries
+
+def freebusy_error(e: Exception) -> str:
+    if isinstance(e, (HttpError, CalendarAPIError)):
+        return f"HTTP error checking availability: {e}"
+    return f"Error checking availability: {e}"
+
+def freebusy_key(query: Tuple[datetime, datetime, List[str]]) -> Tuple[datetime, datetime, Tuple[str, ...]]:
+    span_start, span_end, span_calendars = query
+    return span_start, span_end, tuple(span_calendars)
+
+def _fetch_freebusy(fetch: Callable[..., Dict[str, Any]], *query) -> Tuple[FillToken, Dict[str, Any]]:
+    """
+    Run one freebusy query, with the busy-index token taken just before it
+    This runs inside the coalesced call, so every caller sharing the answer
+    fills the index with the token of the fetch that produced it
+    """
+    since = busy_index.begin_fill()
+    return since, fetch(*query)
+
+def apply_freebusy(plan: BusyPlan, ranges: List[Interval], query: Tuple[datetime, datetime, List[str]],
+                    result: Optional[Dict[str, Any]], error_msg: Optional[str] = None, since: Optional[FillToken] = None):
+    """
+    Fill the busy index and the plan's busy/errors from one freebusy answer (result None when it failed)
+    since is the busy-index token taken before the query was sent
+    """
+    busy, errors, missing, _ = plan
+    span_start, span_end, span_calendars = query
+    in_span = lambda window: span_start <= window[0] and window[1] <= span_end
+    
+    for calendar_id in span_calendars:
+        entry = result.get(calendar_id, {}) if result else {}
+        if result and 'error' in entry:
+            error_msg = f"Calendar error: {entry['error']}"
+        if not result or 'error' in entry:
+            logger.error(f"{error_msg} ({calendar_id})")
+            for index, window in missing[calendar_id]:
+                if in_span(window):
+                    errors[index][calendar_id] = error_msg
+            continue
+        
+        intervals = entry.get('busy', [])
+        busy_index.fill(calendar_id, span_start, span_end, intervals, since)
+        for index, window in missing[calendar_id]:
+            if in_span(window):
+                busy[index][calendar_id] = _clip(intervals, *ranges[index])
+
+def _collect_busy(ranges: List[Interval], calendars: List[str]) -> Tuple[List[Dict[str, List[Interval]]], List[Dict[str, str]]]:
+    """
+    Busy intervals per calendar for each (UTC) range, from the busy index or as few
+    freebusy queries as possible. Returns (busy, errors), one dict of each per range
+    """
+    plan = plan_busy(ranges, calendars)
+    for query in plan[3]:
+        try:
+            backend = get_calendar_backend()
+            if not backend:
+                raise RuntimeError("Calendar service not available")
+            since, result = calendar_reads.do("freebusy", freebusy_key(query), _fetch_freebusy, backend.freebusy, *query)
+            apply_freebusy(plan, ranges, query, result, since=since)
+        except Exception as e:
+            apply_freebusy(plan, ranges, query, None, freebusy_error(e))
+    return plan[0], plan[1]
+
+def check_availability_many(ranges: List[Tuple[datetime, datetime]], calendars: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Check several time ranges on several calendars in as few freebusy queries as possible
+    Returns one entry per range with the busy slots per calendar and a combined 'free' flag
+    """
+    calendars = calendars or [CALENDAR_ID]
+    ranges = [(to_utc(start), to_utc(end)) for start, end in ranges]
+    busy, errors = _collect_busy(ranges, calendars)
+    return availability_results(ranges, calendars, busy, errors)
+
+def availability_results(ranges: List[Interval], calendars: List[str], busy: List[Dict[str, List[Interval]]],
+                          errors: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    results = []
+    for index, (start, end) in enumerate(ranges):
+        entry = {
+            "start": to_rfc3339(start),
+            "end": to_rfc3339(end),
+            "busy": {
+                calendar_id: [_busy_slot(interval) for interval in busy[index].get(calendar_id, [])]
+                for calendar_id in calendars
+            },
+            "free": not errors[index] and not any(busy[index].values())
+        }
+        if errors[index]:
+            entry["errors"] = errors[index]
+        results.append(entry)
+    return results
+
+def meeting_calendars(attendees: Optional[List[str]] = None) -> List[str]:
+    """Our calendar plus each attendee's (a Google calendar id is its owner's email), without duplicates"""
+    calendars = [CALENDAR_ID]
+    seen = {CALENDAR_ID.lower()}
+    for email in attendees or []:
+        if email.lower() not in seen:
+            seen.add(email.lower())
+            calendars.append(email)
+    return calendars
+
+def busy_unreadable(errors: Dict[str, str], calendars: List[str]) -> bool:
+    """True when busy data can't be trusted: the first (organiser's) calendar or every calendar failed"""
+    return calendars[0] in errors or len(errors) == len(calendars)
+
+def check_attendee_availability(start_time: datetime, end_time: datetime, attendees: Optional[List[str]] = None,
+                                min_free_minutes: int = 0) -> Dict[str, Any]:
+    """
+    Check our calendar and every attendee's in a single freebusy query
+    The sorted busy lists are k-way merged into one timeline; free_windows are the gaps all
+    readable calendars share (at least min_free_minutes long). Attendee calendars that aren't
+    shared with us can't be read: they are listed under 'errors' and left out of the timeline
+    """
+    calendars = meeting_calendars(attendees)
+    start, end = to_utc(start_time), to_utc(end_time)
+    busy, errors = _collect_busy([(start, end)], calendars)
+    return attendee_result(calendars, start, end, busy[0], errors[0], min_free_minutes)
+
+def attendee_result(calendars: List[str], start: datetime, end: datetime, busy: Dict[str, List[Interval]],
+                     errors: Dict[str, str], min_free_minutes: int) -> Dict[str, Any]:
+    timeline = merge_busy(busy[calendar_id] for calendar_id in calendars if calendar_id in busy)
+    unreadable = busy_unreadable(errors, calendars)
+    min_free = timedelta(minutes=min_free_minutes)
+    windows = [] if unreadable else [
+        window for window in free_windows(timeline, start, end) if window[1] - window[0] >= min_free
+    ]
+    result = {
+        "start": to_rfc3339(start),
+        "end": to_rfc3339(end),
+        "calendars": calendars,
+        "busy": [_busy_slot(interval) for interval in timeline],
+        "busy_calendars": [calendar_id for calendar_id in calendars if busy.get(calendar_id)],
+        "free_windows": [_busy_slot(window) for window in windows],
+        "free": not timeline and not unreadable
+    }
+    if errors:
+        result["errors"] = errors
+    return result
 
-def check_availability(start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+def check_availability(start_time: datetime, end_time: datetime, attendees: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """
     Check calendar availability between two datetime ranges
-    Returns list of busy time slots
+    Returns the busy time slots of our calendar merged with any attendees' calendars,
+    served from the busy index when it is fresh
     """
-    if not service:
+    if not get_calendar_backend():
         logger.error("Calendar service not available")
         return []
     
     try:
-        logger.info(f"📅 Checking availability from {start_time} to {end_time}")
+        result = check_attendee_availability(start_time, end_time, attendees)
+        if busy_unreadable(result.get("errors", {}), result["calendars"]):
+            return []
         
-        body = {
-            "timeMin": start_time.isoformat() + "Z",
-            "timeMax": end_time.isoformat() + "Z",
-            "items": [{"id": CALENDAR_ID}]
-        }
-        
-        result = service.freebusy().query(body=body).execute()
-        busy_slots = result['calendars'][CALENDAR_ID]['busy']
-        
-        logger.info(f"Found {len(busy_slots)} busy time slots")
+        busy_slots = result["busy"]
+        logger.info(f"Found {len(busy_slots)} busy time slots on {len(result['calendars'])} calendar(s)")
         return busy_slots
         
-    except HttpError as e:
-        logger.error(f"HTTP error checking availability: {e}")
-        return []
     except Exception as e:
         logger.error(f"Error checking availability: {e}")
         return []
 
+def parse_working_hours(value: str) -> Tuple[time, time]:
+    """Parse 'HH:MM-HH:MM' into (opens, closes)"""
+    opens, closes = (datetime.strptime(part.strip(), '%H:%M').time() for part in value.split('-'))
+    if closes <= opens:
+        raise ValueError("Working hours must end after they start")
+    return opens, closes
+
+def _find_free_intervals(window_start: datetime, window_end: datetime, duration: timedelta,
+                         working_hours: Optional[Tuple[time, time]] = None, limit: int = FREE_SLOT_SUGGESTIONS,
+                         preferred: Optional[datetime] = None, calendars: Optional[List[str]] = None,
+                         include_weekends: bool = False) -> Tuple[List[Interval], Dict[str, str]]:
+    """
+    Nearest free slots as UTC intervals, plus any per-calendar errors
+    Calendars after the first that can't be read are skipped (and reported in the errors)
+    """
+    calendars = calendars or [CALENDAR_ID]
+    window_start, window_end = to_utc(window_start), to_utc(window_end)
+    busy, errors = _collect_busy([(window_start, window_end)], calendars)
+    return nearest_free(busy[0], errors[0], calendars, window_start, window_end, duration,
+                         working_hours, limit, preferred, include_weekends)
+
+def nearest_free(busy: Dict[str, List[Interval]], errors: Dict[str, str], calendars: List[str],
+                  window_start: datetime, window_end: datetime, duration: timedelta,
+                  working_hours: Optional[Tuple[time, time]], limit: int, preferred: Optional[datetime],
+                  include_weekends: bool) -> Tuple[List[Interval], Dict[str, str]]:
+    if busy_unreadable(errors, calendars):
+        return [], errors
+    
+    windows = working_windows(
+        window_start, window_end, working_hours or parse_working_hours(WORKING_HOURS),
+        pytz.timezone("Asia/Kolkata"), days=range(7) if include_weekends else (0, 1, 2, 3, 4)
+    )
+    merged = merge_busy(busy.values())
+    slots = free_slots(merged, windows, duration, timedelta(minutes=FREE_SLOT_STEP_MINUTES))
+    return nearest_slots(slots, limit, to_utc(preferred) if preferred else None), errors
+
+def find_free_slots(window_start: datetime, window_end: datetime, duration_minutes: int = 30,
+                    working_hours: Optional[Tuple[time, time]] = None, limit: int = FREE_SLOT_SUGGESTIONS,
+                    preferred: Optional[datetime] = None, calendars: Optional[List[str]] = None,
+                    include_weekends: bool = False) -> Dict[str, Any]:
+    """
+    Find up to `limit` free slots of duration_minutes within working hours
+    Busy intervals of all calendars are fetched once for the whole window and merged,
+    so every readable calendar is free in the returned slots; calendars that couldn't be
+    read are listed under 'errors'. Slots closest to `preferred` come first
+    """
+    slots, errors = _find_free_intervals(
+        window_start, window_end, timedelta(minutes=duration_minutes), working_hours,
+        limit, preferred, calendars, include_weekends
+    )
+    return free_slots_result(slots, errors)
+
+def free_slots_result(slots: List[Interval], errors: Dict[str, str]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"slots": [_busy_slot(slot) for slot in slots]}
+    if errors:
+        result["errors"] = errors
+    return result
+
+def as_local(value: datetime) -> datetime:
+    """
+    Read a datetime without an offset as Asia/Kolkata time, as every API endpoint does
+    Aware values are returned unchanged
+    """
+    if value.tzinfo is None:
+        return pytz.timezone("Asia/Kolkata").localize(value)
+    return value
+
+def format_free_slots(slots: List[Interval]) -> str:
+    """
+    Format free slots as a markdown list in local time
+    """
+    local_tz = pytz.timezone("Asia/Kolkata")
+    return "\n".join(
+        f"• {start.astimezone(local_tz).strftime('%a, %b %d at %I:%M %p')} - {end.astimezone(local_tz).strftime('%I:%M %p')}"
+        for start, end in slots
+    )
+
+def _skipped_note(errors: Dict[str, str]) -> str:
+    """Footnote naming calendars that couldn't be checked ('' when all were)"""
+    if not errors:
+        return ""
+    return f"\n\nℹ️ Couldn't see the calendars of: {', '.join(errors)}"
+
+def _busy_names(busy_calendars: List[str]) -> str:
+    return ", ".join("you" if calendar_id == CALENDAR_ID else calendar_id for calendar_id in busy_calendars)
+
+def _alternatives_for(start_time: datetime, end_time: datetime, calendars: Optional[List[str]] = None) -> str:
+    """Suggestion text with the free slots nearest to a busy one ('' when there are none)"""
+    local_tz = pytz.timezone("Asia/Kolkata")
+    local_day = local_tz.localize(datetime.combine(start_time.astimezone(local_tz).date(), time.min))
+    window_start = max(local_day, datetime.now(timezone.utc))
+    slots, _ = _find_free_intervals(
+        window_start, local_day + timedelta(days=FREE_SLOT_SEARCH_DAYS), end_time - start_time,
+        preferred=start_time, calendars=calendars
+    )
+    if not slots:
+        return ""
+    return f"\n\n🕐 **Nearest free slots:**\n{format_free_slots(slots)}\n\nTell me which one works and I'll book it."
+
+def event_body(summary: str, start_time: datetime, end_time: datetime, description: str = None, attendees: List[str] = None) -> Dict[str, Any]:
+    """Build an events().insert request body"""
+    event = {
+        'summary': summary,
+        'start': {
+            'dateTime': start_time.isoformat(), 
+            'timeZone': 'Asia/Kolkata'
+        },
+        'end': {
+            'dateTime': end_time.isoformat(), 
+            'timeZone': 'Asia/Kolkata'
+        }
+    }
+    
+    # Add description if provided
+    if description:
+        event['description'] = description
+    
+    # Add attendees if provided
+    if attendees:
+        event['attendees'] = [{'email': email} for email in attendees]
+    
+    return event
+
+def booking_result(created_event: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize a created event the way book_event reports it"""
+    return {
+        "success": True,
+        "event_id": created_event.get('id'),
+        "html_link": created_event.get('htmlLink'),
+        "summary": created_event.get('summary'),
+        "start_time": created_event.get('start'),
+        "end_time": created_event.get('end')
+    }
+
+def record_booking(created_event: Dict[str, Any], start_time: datetime, end_time: datetime):
+    """Reflect a created event in the busy index and the event mirror"""
+    busy_index.add(CALENDAR_ID, start_time, end_time, created_event.get('id'))
+    event_store.upsert(created_event)
+
+def record_cancel(event_id: str):
+    """Drop a deleted event from the busy index and the event mirror"""
+    busy_index.discard_event(CALENDAR_ID, event_id)
+    event_store.delete(event_id)
+
 def book_event(summary: str, start_time: datetime, end_time: datetime, description: str = None, attendees: List[str] = None) -> Dict[str, Any]:
     """
-    Book an event on Google Calendar with enhanced error handling
+    Book an event on the calendar with enhanced error handling
     """
-    if not service:
+    backend = get_calendar_backend()
+    if not backend:
         return {"error": "Calendar service not available", "success": False}
     
     try:
         logger.info(f"📝 Booking event: {summary} from {start_time} to {end_time}")
         
-        # Prepare event details
-        event = {
-            'summary': summary,
-            'start': {
-                'dateTime': start_time.isoformat(), 
-                'timeZone': 'Asia/Kolkata'
-            },
-            'end': {
-                'dateTime': end_time.isoformat(), 
-                'timeZone': 'Asia/Kolkata'
-            }
-        }
-        
-        # Add description if provided
-        if description:
-            event['description'] = description
-        
-        # Add attendees if provided
-        if attendees:
-            event['attendees'] = [{'email': email} for email in attendees]
+        event = event_body(summary, start_time, end_time, description, attendees)
         
         # Insert the event
-        created_event = service.events().insert(
-            calendarId=CALENDAR_ID, 
-            body=event,
-            sendUpdates='all'  # Send email notifications to attendees
-        ).execute()
+        created_event = backend.insert_event(CALENDAR_ID, event)
         
         logger.info(f"✅ Event created successfully: {created_event.get('htmlLink')}")
+        record_booking(created_event, start_time, end_time)
+        bump_state_version()
         
-        return {
-            "success": True,
-            "event_id": created_event.get('id'),
-            "html_link": created_event.get('htmlLink'),
-            "summary": created_event.get('summary'),
-            "start_time": created_event.get('start'),
-            "end_time": created_event.get('end')
-        }
+        return booking_result(created_event)
         
     except HttpError as e:
         error_msg = f"HTTP error booking event: {e}"
@@ -120,18 +542,18 @@ def cancel_event(event_id: str) -> Dict[str, Any]:
     """
     Cancel an existing event
     """
-    if not service:
+    backend = get_calendar_backend()
+    if not backend:
         return {"error": "Calendar service not available", "success": False}
     
     try:
         logger.info(f"🗑️ Cancelling event: {event_id}")
         
-        service.events().delete(
-            calendarId=CALENDAR_ID,
-            eventId=event_id
-        ).execute()
+        backend.delete_event(CALENDAR_ID, event_id)
         
         logger.info("✅ Event cancelled successfully")
+        record_cancel(event_id)
+        bump_state_version()
         return {"success": True, "message": "Event cancelled successfully"}
         
     except HttpError as e:
@@ -143,35 +565,380 @@ def cancel_event(event_id: str) -> Dict[str, Any]:
         logger.error(error_msg)
         return {"error": error_msg, "success": False}
 
-def get_upcoming_events(max_results: int = 10) -> List[Dict[str, Any]]:
+def book_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Get upcoming events from the calendar
+    Book many events through Calendar batch requests
+    Each item takes book_event's keyword arguments; returns one result per item, in order
     """
-    if not service:
-        return []
+    backend = get_calendar_backend()
+    if not backend:
+        return [{"error": "Calendar service not available", "success": False} for _ in events]
+    
+    logger.info(f"📝 Bulk booking {len(events)} event(s)")
+    results: List[Optional[Dict[str, Any]]] = [None] * len(events)
+    positions, bodies = [], []
+    for index, event in enumerate(events):
+        try:
+            bodies.append(event_body(**event))
+            positions.append(index)
+        except Exception as e:
+            results[index] = {"error": f"Error booking event: {e}", "success": False}
+    
+    # Bulk work yields rate-limit tokens to interactive calls
+    with outbound_lane(BULK):
+        responses = backend.insert_events(CALENDAR_ID, bodies) if bodies else []
+    for index, (created_event, exception) in zip(positions, responses):
+        if exception is not None:
+            error_msg = f"HTTP error booking event: {exception}" if isinstance(exception, HttpError) else f"Error booking event: {exception}"
+            logger.error(error_msg)
+            results[index] = {"error": error_msg, "success": False}
+            continue
+        record_booking(created_event, events[index]['start_time'], events[index]['end_time'])
+        results[index] = booking_result(created_event)
+    
+    if any(result['success'] for result in results):
+        bump_state_version()
+    logger.info(f"✅ Bulk booking finished: {sum(1 for r in results if r['success'])}/{len(events)} succeeded")
+    return results
+
+def cancel_events(event_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Cancel many events through Calendar batch requests
+    Returns one result per event id, in order
+    """
+    backend = get_calendar_backend()
+    if not backend:
+        return [{"error": "Calendar service not available", "success": False} for _ in event_ids]
+    
+    logger.info(f"🗑️ Bulk cancelling {len(event_ids)} event(s)")
+    with outbound_lane(BULK):
+        exceptions = backend.delete_events(CALENDAR_ID, event_ids) if event_ids else []
+    results = []
+    for event_id, exception in zip(event_ids, exceptions):
+        if exception is not None:
+            error_msg = f"HTTP error cancelling event: {exception}" if isinstance(exception, HttpError) else f"Error cancelling event: {exception}"
+            logger.error(error_msg)
+            results.append({"event_id": event_id, "error": error_msg, "success": False})
+            continue
+        record_cancel(event_id)
+        results.append({"event_id": event_id, "success": True, "message": "Event cancelled successfully"})
+    
+    if any(result['success'] for result in results):
+        bump_state_version()
+    logger.info(f"✅ Bulk cancel finished: {sum(1 for r in results if r['success'])}/{len(event_ids)} succeeded")
+    return results
+
+def _import_entry(row: ImportRow, status: str, **details) -> Dict[str, Any]:
+    entry = {"row": row.row, "line": row.line, "status": status, "summary": row.summary}
+    if row.start_time is not None:
+        entry["start_time"] = row.start_time.isoformat()
+    entry.update(details)
+    return entry
+
+def import_meetings(read_rows: Callable[[], Iterable[ImportRow]], dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Book the meetings of an import file (see meetingImport)
+    read_rows is called twice: the first pass finds the import window, whose busy
+    time is fetched once; the second checks every row against that timeline (and
+    the rows accepted before it) and books the free ones in batches. With dry_run
+    nothing is booked. Returns one entry per row plus counts by status.
+    """
+    now = datetime.now(timezone.utc)
+    window_start = window_end = None
+    for row in read_rows():
+        if row.error is None and row.start_time >= now:
+            window_start = min(window_start or row.start_time, row.start_time)
+            window_end = max(window_end or row.end_time, row.end_time)
     
+    busy: List[Interval] = []
+    if window_start is not None:
+        # One range per FREEBUSY_MAX_SPAN_DAYS so long imports still fit freebusy's limits
+        ranges, cursor = [], to_utc(window_start)
+        while cursor < to_utc(window_end):
+            ranges.append((cursor, min(cursor + timedelta(days=FREEBUSY_MAX_SPAN_DAYS), to_utc(window_end))))
+            cursor = ranges[-1][1]
+        found, errors = _collect_busy(ranges, [CALENDAR_ID])
+        failed = next((error[CALENDAR_ID] for error in errors if CALENDAR_ID in error), None)
+        if failed:
+            return {"success": False, "error": failed}
+        busy = merge_busy(range_busy.get(CALENDAR_ID, []) for range_busy in found)
+    timeline = BusyTimeline(busy)
+    logger.info(f"📥 Importing meetings between {window_start} and {window_end} against {len(busy)} busy interval(s)")
+    
+    report: List[Dict[str, Any]] = []
+    pending: List[Tuple[int, ImportRow]] = []
+    
+    def flush():
+        results = book_events([row.booking() for _, row in pending])
+        for (position, row), result in zip(pending, results):
+            if result.get('success'):
+                report[position] = _import_entry(row, "booked", event_id=result['event_id'], html_link=result['html_link'])
+            else:
+                timeline.remove(row.start_time, row.end_time)
+                report[position] = _import_entry(row, "failed", error=result.get('error'))
+        pending.clear()
+    
+    for row in read_rows():
+        if row.error is not None:
+            report.append(_import_entry(row, "invalid", error=row.error))
+            continue
+        if row.start_time < now:
+            report.append(_import_entry(row, "invalid", error="Cannot book meetings in the past"))
+            continue
+        conflict = timeline.conflict(row.start_time, row.end_time)
+        if conflict is not None:
+            report.append(_import_entry(row, "conflict", busy=_busy_slot(conflict)))
+            continue
+        timeline.add(row.start_time, row.end_time)
+        report.append(_import_entry(row, "ok" if dry_run else "pending"))
+        if not dry_run:
+            pending.append((len(report) - 1, row))
+            if len(pending) >= IMPORT_WRITE_BATCH_SIZE:
+                flush()
+    if pending:
+        flush()
+    
+    counts: Dict[str, int] = {}
+    for entry in report:
+        counts[entry['status']] = counts.get(entry['status'], 0) + 1
+    logger.info(f"✅ Import finished: {counts}")
+    return {"success": True, "dry_run": dry_run, "rows": len(report), "counts": counts, "results": report}
+
+# Bookings from chat and /book_meeting go through a durable outbox, opened on
+# first use: the caller gets a job id at once and workers write to the calendar
+booking_outbox: Optional[BookingOutbox] = None
+booking_workers: Optional[OutboxWorkers] = None
+_outbox_lock = threading.Lock()
+
+def get_booking_outbox() -> BookingOutbox:
+    """
+    Get the booking outbox, opening it and starting its workers on first use
+    Jobs left over from a previous run are picked up once their lease runs out.
+    """
+    global booking_outbox, booking_workers
+    with _outbox_lock:
+        if booking_outbox is None:
+            booking_outbox = BookingOutbox(BOOKING_OUTBOX_PATH, retry_max=BOOKING_OUTBOX_RETRY_MAX_SECONDS)
+            booking_workers = OutboxWorkers(
+                booking_outbox, _deliver_bookings, workers=BOOKING_OUTBOX_WORKERS,
+                batch_size=CALENDAR_BATCH_SIZE, name="booking-outbox"
+            )
+            booking_workers.start()
+        return booking_outbox
+
+def stop_booking_workers():
+    """Stop the outbox workers; bookings they hadn't finished are retried on the next start"""
+    if booking_workers is not None:
+        booking_workers.stop()
+
+def enqueue_booking(summary: str, start_time: datetime, end_time: datetime, description: str = None,
+                    attendees: List[str] = None) -> str:
+    """Queue a booking (book_event's arguments) and return its job id"""
+    outbox = get_booking_outbox()
+    job_id = outbox.enqueue({
+        "summary": summary,
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat(),
+        "description": description,
+        "attendees": list(attendees or []),
+    })
+    logger.info(f"📮 Booking queued as job {job_id}: {summary} from {start_time} to {end_time}")
+    # Cached replies must not repeat a booking that is only queued
+    bump_state_version()
+    booking_workers.notify()
+    return job_id
+
+def get_booking_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Status of a queued booking: queued, running, retrying, succeeded (with the event) or failed"""
+    return get_booking_outbox().get(job_id)
+
+def _already_booked(exception: Exception) -> bool:
+    """The insert hit an event with the job's id: an earlier attempt went through but its answer was lost"""
+    status = getattr(exception, 'status', None) or getattr(getattr(exception, 'resp', None), 'status', None)
+    return str(status) == '409'
+
+def _deliver_bookings(jobs: List[Job]):
+    """Outbox worker step: insert the claimed bookings in one batch, then settle each job"""
+    outbox = get_booking_outbox()
+    requests = [
+        dict(request, start_time=datetime.fromisoformat(request['start_time']), end_time=datetime.fromisoformat(request['end_time']))
+        for _, request, _ in jobs
+    ]
+    backend = get_calendar_backend()
     try:
-        now = datetime.utcnow().isoformat() + 'Z'
-        
-        events_result = service.events().list(
-            calendarId=CALENDAR_ID,
-            timeMin=now,
-            maxResults=max_results,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        logger.info(f"Found {len(events)} upcoming events")
+        if not backend:
+            raise RuntimeError("Calendar service not available")
+        # The job id is the event id, so a retried insert can't create a second event
+        bodies = [dict(event_body(**request), id=job_id) for (job_id, _, _), request in zip(jobs, requests)]
+        responses = backend.insert_events(CALENDAR_ID, bodies)
+    except Exception as e:
+        responses = [(None, e)] * len(jobs)
+    
+    booked = False
+    for (job_id, _, attempts), request, (created_event, exception) in zip(jobs, requests, responses):
+        if exception is None or _already_booked(exception):
+            if exception is None:
+                record_booking(created_event, request['start_time'], request['end_time'])
+                result = booking_result(created_event)
+            else:
+                busy_index.add(CALENDAR_ID, request['start_time'], request['end_time'], job_id)
+                result = {"success": True, "event_id": job_id, "summary": request['summary']}
+            outbox.complete(job_id, result)
+            booked = True
+            logger.info(f"✅ Booking job {job_id} done after {attempts} attempt(s)")
+            continue
         
-        return events
+        error_msg = f"HTTP error booking event: {exception}" if isinstance(exception, HttpError) else f"Error booking event: {exception}"
+        transient = classify_error(exception) is not None or backend is None
+        if transient and attempts < BOOKING_OUTBOX_MAX_ATTEMPTS:
+            delay = outbox.retry(job_id, attempts, error_msg)
+            logger.warning(f"⏳ Booking job {job_id} attempt {attempts} failed ({exception}); retrying in {delay:.1f}s")
+        else:
+            outbox.fail(job_id, error_msg)
+            logger.error(f"❌ Booking job {job_id} failed: {error_msg}")
+    
+    if booked:
+        bump_state_version()
+
+def sync_events(force: bool = False) -> bool:
+    """
+    Bring the local event mirror up to date
+    Uses the stored sync token when there is one; falls back to a full sync when
+    there is none or the backend has expired it (HTTP 410). Returns True if the mirror is current.
+    """
+    if not force and not event_store.is_stale(EVENT_SYNC_INTERVAL_SECONDS):
+        return True
+    
+    backend = get_calendar_backend()
+    if not backend:
+        return False
+    if force:
+        return _sync_now(backend, force=True)
+    # Callers that find the mirror stale at the same moment share one sync
+    return calendar_reads.do("sync", CALENDAR_ID, _sync_now, backend, False)
+
+def _sync_now(backend: CalendarBackend, force: bool) -> bool:
+    with sync_lock:
+        # Another caller may have synced while we waited for the lock
+        if not force and not event_store.is_stale(EVENT_SYNC_INTERVAL_SECONDS):
+            return True
         
-    except HttpError as e:
-        logger.error(f"HTTP error getting events: {e}")
+        sync_token = event_store.sync_token
+        lookback = datetime.now(timezone.utc) - timedelta(days=EVENT_SYNC_LOOKBACK_DAYS)
+        try:
+            try:
+                items, next_token = backend.list_events(CALENDAR_ID, sync_token, lookback)
+            except SyncTokenExpired:
+                logger.info("🔄 Sync token expired, running a full sync")
+                sync_token = None
+                items, next_token = backend.list_events(CALENDAR_ID, None, lookback)
+            
+            apply_sync(items, next_token, sync_token)
+            return True
+            
+        except HttpError as e:
+            logger.error(f"HTTP error syncing events: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Error syncing events: {e}")
+            return False
+
+def apply_sync(items: List[Dict[str, Any]], next_token: Optional[str], sync_token: Optional[str]):
+    """Store a listing in the event mirror: changes for an incremental sync, everything for a full one"""
+    if sync_token:
+        event_store.apply_changes(items)
+    else:
+        event_store.replace_all(items)
+    event_store.mark_synced(next_token)
+    if items or not sync_token:
+        bump_state_version()
+    logger.info(f"🔄 Synced {len(items)} event change(s) ({'incremental' if sync_token else 'full'})")
+
+def calendar_state_version(refresh: bool = True) -> int:
+    """
+    Get the current calendar state version
+    With refresh, the event mirror is synced first (if stale) so outside changes are counted
+    """
+    if refresh:
+        sync_events()
+    return _state_version
+
+def get_upcoming_events(max_results: int = 10) -> List[Dict[str, Any]]:
+    """
+    Get upcoming events from the local event mirror
+    """
+    if not sync_events():
         return []
-    except Exception as e:
-        logger.error(f"Error getting events: {e}")
+    
+    events = event_store.upcoming(datetime.now(timezone.utc), max_results)
+    logger.info(f"Found {len(events)} upcoming events")
+    return events
+
+def get_events_for_day(day: date) -> List[Dict[str, Any]]:
+    """
+    Get the events on one day (Asia/Kolkata) from the local event mirror
+    """
+    if not sync_events():
+        return []
+    
+    local_tz = pytz.timezone("Asia/Kolkata")
+    day_start = local_tz.localize(datetime.combine(day, datetime.min.time()))
+    return event_store.between(day_start, day_start + timedelta(days=1))
+
+def search_events(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    """
+    Search event titles and descriptions in the local event mirror
+    """
+    if not sync_events():
         return []
+    
+    return event_store.search(query, max_results)
+
+# Top-level event fields callers may ask iter_events for
+EVENT_FIELDS = ("id", "summary", "description", "location", "start", "end", "attendees", "organizer",
+                "status", "htmlLink", "created", "updated", "recurringEventId")
+DEFAULT_EVENT_FIELDS = ("id", "summary", "start", "end")
+
+def iter_events(time_min: datetime, time_max: datetime, fields: Sequence[str] = DEFAULT_EVENT_FIELDS,
+                limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Events overlapping [time_min, time_max) straight from the calendar, soonest first
+    Unlike the mirror-backed readers this covers any range: pages of EVENT_PAGE_SIZE are
+    requested with a field mask as the caller iterates, and stop once limit events are read.
+    Raises ValueError for unknown fields and RuntimeError when the calendar isn't available.
+    """
+    unknown = [name for name in fields if name not in EVENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown event field(s): {', '.join(unknown)}")
+    backend = get_calendar_backend()
+    if not backend:
+        raise RuntimeError("Calendar service not available")
+    
+    page_size = min(EVENT_PAGE_SIZE, limit) if limit else EVENT_PAGE_SIZE
+    events = backend.iter_events(CALENDAR_ID, time_min, time_max, list(fields), page_size)
+    return itertools.islice(events, limit) if limit else events
+
+def format_booking_response(summary: str, start_time: datetime, end_time: datetime, html_link: Optional[str],
+                            attendees: List[str] = None, description: str = None) -> str:
+    """
+    Format the confirmation for a booked meeting, with times in local time
+    """
+    local_tz = pytz.timezone("Asia/Kolkata")
+    local_start = start_time.astimezone(local_tz).strftime('%A, %B %d at %I:%M %p')
+    local_end = end_time.astimezone(local_tz).strftime('%I:%M %p')
+    
+    response = f"✅ Meeting booked successfully!\n\n📅 **Date & Time**: {local_start} - {local_end}\n📋 **Title**: {summary}"
+    
+    if attendees:
+        response += f"\n👥 **Attendees**: {', '.join(attendees)}"
+    
+    if description:
+        response += f"\n📝 **Description**: {description}"
+    
+    if html_link:
+        response += f"\n🔗 **View Event**: [Click here]({html_link})"
+    
+    return response
 
 def book_event_from_text(user_input: str) -> str:
     """
@@ -191,187 +958,180 @@ def book_event_from_text(user_input: str) -> str:
         attendees = parsed_info.get('attendees', [])
         description = parsed_info.get('description')
         
-        # Check availability before booking
-        busy_slots = check_availability(start_time, end_time)
-        if busy_slots:
-            return "⛔ That time slot is already busy. Please try a different time."
+        # Check our calendar and every attendee's (one freebusy query) before booking
+        availability = check_attendee_availability(start_time, end_time, attendees)
+        if busy_unreadable(availability.get('errors', {}), availability['calendars']):
+            return "❌ Couldn't check the calendar right now, so nothing was booked. Please try again in a moment."
+        skipped = _skipped_note(availability.get('errors', {}))
+        if availability['busy']:
+            busy_calendars = availability['busy_calendars']
+            who = "" if busy_calendars == [CALENDAR_ID] else f" ({_busy_names(busy_calendars)})"
+            alternatives = _alternatives_for(start_time, end_time, availability['calendars'])
+            return f"⛔ That time slot is already busy{who}." + (alternatives or " Please try a different time.") + skipped
         
-        # Book the event
-        result = book_event(summary, start_time, end_time, description, attendees)
+        # Queue the booking and give the outbox a moment to land it, so the usual reply still has the link
+        job_id = enqueue_booking(summary, start_time, end_time, description, attendees)
+        job = get_booking_outbox().wait(job_id, BOOKING_CONFIRM_WAIT_SECONDS)
         
-        if result.get('success'):
-            # Format response with local time
-            local_tz = pytz.timezone("Asia/Kolkata")
-            local_start = start_time.astimezone(local_tz).strftime('%A, %B %d at %I:%M %p')
-            local_end = end_time.astimezone(local_tz).strftime('%I:%M %p')
-            
-            response = f"✅ Meeting booked successfully!\n\n📅 **Date & Time**: {local_start} - {local_end}\n📋 **Title**: {summary}"
-            
-            if attendees:
-                response += f"\n👥 **Attendees**: {', '.join(attendees)}"
-            
-            if description:
-                response += f"\n📝 **Description**: {description}"
-            
-            response += f"\n🔗 **View Event**: [Click here]({result['html_link']})"
-            
-            return response
-        else:
-            return f"❌ Failed to book meeting: {result.get('error', 'Unknown error')}"
+        if job['status'] == SUCCEEDED:
+            return format_booking_response(summary, start_time, end_time, job['result'].get('html_link'), attendees, description) + skipped
+        if job['status'] == FAILED:
+            return f"❌ Failed to book meeting: {job.get('error') or 'Unknown error'}"
+        return (
+            f"📨 Your meeting \"{summary}\" is saved and will be added to the calendar as soon as "
+            f"Google Calendar responds (booking id `{job_id}`). Invitations go out once it's added." + skipped
+        )
             
     except Exception as e:
         logger.error(f"Error in book_event_from_text: {e}")
         return f"❌ An error occurred while booking the meeting: {str(e)}"
 
-def parse_meeting_details(user_input: str) -> Optional[Dict[str, Any]]:
+def check_availability_from_text(user_input: str) -> str:
     """
-    Parse meeting details from user input with enhanced parsing
+    Parse a date/time (and optional duration) from user input and report whether it is free
     """
+    logger.info(f"🔧 [Tool Called] check_availability_from_text() with input: {user_input}")
+    
     try:
-        now = datetime.now()
-        user_lower = user_input.lower()
-        
-        # Extract summary/title
-        summary_patterns = [
-            r'meeting\s+(?:about|regarding|titled?)\s+[\'"](.*?)[\'"]',
-            r'meeting\s+(?:about|regarding)\s+(.*?)(?=\s+(?:with|for|on|at)|$)',
-            r'book\s+(?:a\s+)?(?:meeting|call|appointment)\s+(?:about|regarding)\s+(.*?)(?=\s+(?:with|for|on|at)|$)'
-        ]
-        
-        summary = "Meeting"  # Default
-        for pattern in summary_patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
-            if match:
-                summary = match.group(1).strip()
-                break
+        parsed_info = parse_meeting_details(user_input)
+        if not parsed_info:
+            return "❌ Couldn't parse the time to check. Please provide a date and time."
         
-        # Extract date
-        date_patterns = [
-            r'\b(\d{4}-\d{2}-\d{2})\b',  # YYYY-MM-DD
-            r'\b(tomorrow)\b',
-            r'\b(next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday))\b',
-            r'\b(in\s+(\d+)\s+days?)\b'
-        ]
+        start_time = parsed_info['start_time']
+        end_time = parsed_info['end_time']
+        attendees = parsed_info.get('attendees', [])
+        local_tz = pytz.timezone("Asia/Kolkata")
+        local_start = start_time.astimezone(local_tz).strftime('%A, %B %d at %I:%M %p')
+        local_end = end_time.astimezone(local_tz).strftime('%I:%M %p')
         
-        event_date = now
-        for pattern in date_patterns:
-            match = re.search(pattern, user_lower)
-            if match:
-                if match.group(1) == 'tomorrow':
-                    event_date = now + timedelta(days=1)
-                elif match.group(1).startswith('next '):
-                    day_name = match.group(1).split()[1]
-                    days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-                    target_day = days.index(day_name)
-                    current_day = now.weekday()
-                    days_ahead = (target_day - current_day + 7) % 7
-                    if days_ahead == 0:
-                        days_ahead = 7
-                    event_date = now + timedelta(days=days_ahead)
-                elif match.group(1).startswith('in '):
-                    days = int(match.group(2))
-                    event_date = now + timedelta(days=days)
-                else:
-                    # YYYY-MM-DD format
-                    event_date = datetime.strptime(match.group(1), '%Y-%m-%d')
-                break
+        availability = check_attendee_availability(start_time, end_time, attendees)
+        if busy_unreadable(availability.get('errors', {}), availability['calendars']):
+            return "❌ Couldn't check the calendar right now. Please try again in a moment."
+        skipped = _skipped_note(availability.get('errors', {}))
+        if availability['busy']:
+            alternatives = _alternatives_for(start_time, end_time, availability['calendars'])
+            if not attendees:
+                return f"⛔ You're busy on {local_start} - {local_end}." + alternatives + skipped
+            busy_names = _busy_names(availability['busy_calendars'])
+            return f"⛔ Not everyone is free on {local_start} - {local_end} (busy: {busy_names})." + alternatives + skipped
+        if not attendees:
+            return f"✅ You're free on {local_start} - {local_end}."
+        return f"✅ Everyone is free on {local_start} - {local_end}." + skipped
         
-        # Extract time
-        time_patterns = [
-            r'\b(\d{1,2}:\d{2})\b',  # HH:MM
-            r'\b(\d{1,2})\s*(am|pm)\b',  # 3 PM
-            r'\b(\d{1,2}:\d{2})\s*(am|pm)\b'  # 3:30 PM
-        ]
+    except Exception as e:
+        logger.error(f"Error in check_availability_from_text: {e}")
+        return f"❌ An error occurred while checking availability: {str(e)}"
+
+def find_free_slots_from_text(user_input: str) -> str:
+    """
+    Parse a day, preferred time and duration from user input and list the nearest free slots
+    """
+    logger.info(f"🔧 [Tool Called] find_free_slots_from_text() with input: {user_input}")
+    
+    try:
+        parsed = parse_meeting(user_input)
+        local_tz = pytz.timezone("Asia/Kolkata")
+        now = datetime.now(timezone.utc)
+        day = parsed.date or now.astimezone(local_tz).date()
+        local_day = local_tz.localize(datetime.combine(day, time.min))
+        preferred = local_tz.localize(datetime.combine(day, parsed.time)) if parsed.time else None
         
-        event_time = None
-        for pattern in time_patterns:
-            match = re.search(pattern, user_lower)
-            if match:
-                time_str = match.group(1)
-                if len(match.groups()) > 1 and match.group(2):
-                    # Handle AM/PM
-                    hour = int(time_str.split(':')[0])
-                    minute = int(time_str.split(':')[1]) if ':' in time_str else 0
-                    if match.group(2).lower() == 'pm' and hour < 12:
-                        hour += 12
-                    elif match.group(2).lower() == 'am' and hour == 12:
-                        hour = 0
-                    event_time = f"{hour:02d}:{minute:02d}"
-                else:
-                    event_time = time_str
-                break
+        calendars = meeting_calendars(parsed.attendees)
+        slots, errors = _find_free_intervals(
+            max(local_day, now), local_day + timedelta(days=FREE_SLOT_SEARCH_DAYS), parsed.duration,
+            preferred=preferred, calendars=calendars
+        )
+        if busy_unreadable(errors, calendars):
+            return f"❌ Couldn't read the calendar: {next(iter(errors.values()))}"
+        if not slots:
+            return f"📭 No free {parsed.duration_minutes}-minute slots found from {day.strftime('%A, %B %d')} over the next {FREE_SLOT_SEARCH_DAYS} day(s)." + _skipped_note(errors)
+        return f"🕐 **Free {parsed.duration_minutes}-minute slots:**\n{format_free_slots(slots)}" + _skipped_note(errors)
         
-        if not event_time:
+    except Exception as e:
+        logger.error(f"Error in find_free_slots_from_text: {e}")
+        return f"❌ An error occurred while looking for free slots: {str(e)}"
+
+def format_event_list(events: List[Dict[str, Any]], heading: str) -> str:
+    """
+    Format events as a short markdown list in local time
+    """
+    if not events:
+        return f"📭 No meetings found {heading}."
+    
+    local_tz = pytz.timezone("Asia/Kolkata")
+    lines = [f"📅 **Your meetings {heading}:**"]
+    for event in events:
+        start = event.get('start', {})
+        if 'dateTime' in start:
+            when = date_parser.isoparse(start['dateTime']).astimezone(local_tz).strftime('%a, %b %d at %I:%M %p')
+        else:
+            when = f"{start.get('date', 'Unknown date')} (all day)"
+        lines.append(f"• **{event.get('summary', 'Untitled')}** — {when}")
+    return "\n".join(lines)
+
+def parse_meeting_details(user_input: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse meeting details from user input using the shared meeting parser
+    """
+    try:
+        parsed = parse_meeting(user_input)
+        if not parsed.time:
             return None
         
-        # Extract duration
-        duration_patterns = [
-            r'\b(\d+)\s*(minute|min|hour|hr)s?\b',
-            r'\bfor\s+(\d+)\s*(minute|min|hour|hr)s?\b',
-            r'\b(\d+)\s*(minute|min|hour|hr)\s+meeting\b'
-        ]
-        
-        duration = timedelta(minutes=30)  # Default 30 minutes
-        for pattern in duration_patterns:
-            match = re.search(pattern, user_lower)
-            if match:
-                value = int(match.group(1))
-                unit = match.group(2)
-                if 'hour' in unit or 'hr' in unit:
-                    duration = timedelta(hours=value)
-                else:
-                    duration = timedelta(minutes=value)
-                break
-        
-        # Extract attendees (email addresses)
-        attendees = re.findall(r'[\w\.-]+@[\w\.-]+\.\w+', user_input)
-        
-        # Extract description/agenda
-        description_patterns = [
-            r'agenda[:\-]?\s*(.*?)(?=\s+(?:with|for|on|at)|$)',
-            r'about\s+(.*?)(?=\s+(?:with|for|on|at)|$)',
-            r'description[:\-]?\s*(.*?)(?=\s+(?:with|for|on|at)|$)'
-        ]
-        
-        description = None
-        for pattern in description_patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
-            if match:
-                description = match.group(1).strip()
-                break
+        # Default to today when no date is mentioned
+        event_date = parsed.date or datetime.now().date()
         
         # Create datetime objects
         local_tz = pytz.timezone("Asia/Kolkata")
-        start_time = local_tz.localize(datetime.combine(event_date.date(), datetime.strptime(event_time, '%H:%M').time()))
-        end_time = start_time + duration
+        start_time = local_tz.localize(datetime.combine(event_date, parsed.time))
+        end_time = start_time + parsed.duration
         
         return {
-            'summary': summary,
+            'summary': parsed.title or 'Meeting',
             'start_time': start_time,
             'end_time': end_time,
-            'attendees': attendees,
-            'description': description
+            'attendees': parsed.attendees,
+            'description': parsed.agenda
         }
         
     except Exception as e:
         logger.error(f"Error parsing meeting details: {e}")
         return None
 
+def calendar_info(calendar: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": calendar.get('id'),
+        "summary": calendar.get('summary'),
+        "description": calendar.get('description'),
+        "timeZone": calendar.get('timeZone')
+    }
+
 def get_calendar_info() -> Dict[str, Any]:
     """
     Get basic calendar information
     """
-    if not service:
+    backend = get_calendar_backend()
+    if not backend:
         return {"error": "Calendar service not available"}
     
     try:
-        calendar = service.calendars().get(calendarId=CALENDAR_ID).execute()
-        return {
-            "id": calendar.get('id'),
-            "summary": calendar.get('summary'),
-            "description": calendar.get('description'),
-            "timeZone": calendar.get('timeZone')
-        }
+        return calendar_info(calendar_reads.do("get_calendar", CALENDAR_ID, backend.get_calendar, CALENDAR_ID))
     except Exception as e:
         logger.error(f"Error getting calendar info: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+def get_calendar_backend_stats() -> Dict[str, Any]:
+    """
+    Get call counts (and pool metrics for Google) of the calendar backend
+    """
+    if not calendar_backend:
+        return {"error": "Calendar service not available"}
+    return calendar_backend.stats()
+
+def get_calendar_pool_stats() -> Dict[str, Any]:
+    """
+    Get size and wait-time metrics for the Calendar client pool
+    """
+    if not calendar_pool:
+        return {"error": "Calendar service not available"}
+    return calendar_pool.stats()
@@ -0,0 +1,89 @@
+# Pool of authorized Google Calendar clients
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+
+class CalendarClientPool:
+    """
+    Hands out Calendar service objects for the duration of one call.
+    Each client owns its own keep-alive HTTP transport, since httplib2 is not
+    thread-safe; clients are created on demand up to `size`, after which
+    callers wait up to `checkout_timeout` seconds for one to be returned.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 10, checkout_timeout: float = 30.0):
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self._factory = factory
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()  # LIFO keeps recently used connections warm
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @contextmanager
+    def client(self) -> Iterator[Any]:
+        """Check out a client for the duration of the with-block"""
+        started = time.perf_counter()
+        service, waited = self._acquire()
+        wait_seconds = time.perf_counter() - started
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            self._waits += waited
+            self._total_wait += wait_seconds
+            self._max_wait = max(self._max_wait, wait_seconds)
+        try:
+            yield service
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(service)
+
+    def _acquire(self):
+        """Return (client, had_to_wait)"""
+        try:
+            return self._idle.get_nowait(), False
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if create:
+            try:
+                return self._factory(), False
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.checkout_timeout), True
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise TimeoutError(f"No Calendar client available within {self.checkout_timeout}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size and checkout wait metrics"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "total_wait_seconds": self._total_wait,
+                "avg_wait_seconds": self._total_wait / self._checkouts if self._checkouts else 0.0,
+                "max_wait_seconds": self._max_wait,
+            }
@@ -0,0 +1,115 @@
+# Bounded conversation memory: recent turns verbatim plus a rolling summary of older ones
+import os
+import re
+from collections import deque
+from typing import Any, Deque, Dict, List, Sequence, Tuple
+
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "1500"))
+MEMORY_WINDOW_MESSAGES = int(os.getenv("MEMORY_WINDOW_MESSAGES", "8"))
+MEMORY_SUMMARY_SHARE = 0.25  # Part of the budget the summary of older turns may use
+GIST_MAX_CHARS = 120
+
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s|\n")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def _gist(content: str) -> str:
+    """First sentence of a message, whitespace-collapsed and capped"""
+    first = _SENTENCE_END.split(content.strip(), maxsplit=1)[0]
+    first = _WHITESPACE.sub(" ", first)
+    return first if len(first) <= GIST_MAX_CHARS else first[:GIST_MAX_CHARS - 1] + "…"
+
+
+class ConversationMemory:
+    """
+    Keeps the last `window_messages` messages verbatim. Older messages are folded
+    into a rolling summary of one short line each. messages() returns both,
+    trimmed to `token_budget`, so the prompt size stays flat as the session grows.
+    """
+
+    def __init__(self, token_budget: int = MEMORY_TOKEN_BUDGET, window_messages: int = MEMORY_WINDOW_MESSAGES):
+        self.token_budget = token_budget
+        self.window_messages = window_messages
+        self.recent: Deque[Tuple[str, str]] = deque()
+        self.summary_lines: Deque[str] = deque()
+        self._summary_tokens = 0
+
+    def add(self, role: str, content: str):
+        if role == "system":
+            # A summary produced by messages(); keep its lines as summary
+            for line in content.splitlines():
+                if line and line != SUMMARY_HEADER:
+                    self._add_summary_line(line)
+            return
+        self.recent.append((role, content))
+        while len(self.recent) > self.window_messages:
+            self._fold(*self.recent.popleft())
+
+    def extend(self, chat_history: Sequence[Tuple[str, str]]):
+        for role, content in chat_history:
+            self.add(role, content)
+
+    def _fold(self, role: str, content: str):
+        """Move one message out of the window into the summary, dropping the oldest lines over budget"""
+        speaker = "User" if role in ("user", "human") else "Assistant"
+        self._add_summary_line(f"{speaker}: {_gist(content)}")
+
+    def _add_summary_line(self, line: str):
+        self.summary_lines.append(line)
+        self._summary_tokens += estimate_tokens(line)
+        summary_budget = int(self.token_budget * MEMORY_SUMMARY_SHARE)
+        while self._summary_tokens > summary_budget and self.summary_lines:
+            self._summary_tokens -= estimate_tokens(self.summary_lines.popleft())
+
+    def messages(self) -> List[Tuple[str, str]]:
+        """Summary (as a system message) followed by the recent window, within the token budget"""
+        remaining = self.token_budget
+        summary = None
+        if self.summary_lines:
+            summary = SUMMARY_HEADER + "\n" + "\n".join(self.summary_lines)
+            remaining -= estimate_tokens(summary)
+
+        window: List[Tuple[str, str]] = []
+        for role, content in reversed(self.recent):
+            tokens = estimate_tokens(content)
+            if tokens > remaining:
+                if remaining > 0 and not window:
+                    # Always keep (the start of) the latest message
+                    window.append((role, content[:remaining * 4]))
+                break
+            window.append((role, content))
+            remaining -= tokens
+        window.reverse()
+
+        return ([("system", summary)] if summary else []) + window
+
+    def size_bytes(self) -> int:
+        """Approximate memory held by the stored text"""
+        return sum(len(content) for _, content in self.recent) + sum(len(line) for line in self.summary_lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"recent": [list(message) for message in self.recent], "summary_lines": list(self.summary_lines)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationMemory":
+        memory = cls()
+        for line in data.get("summary_lines", []):
+            memory._add_summary_line(line)
+        memory.extend([tuple(message) for message in data.get("recent", [])])
+        return memory
+
+
+def compact_history(chat_history: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Apply the memory policy to a full transcript"""
+    if not chat_history:
+        return []
+    memory = ConversationMemory()
+    memory.extend(chat_history)
+    return memory.messages()
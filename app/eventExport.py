@@ -0,0 +1,88 @@
+# Event export: event resources streamed as NDJSON or iCalendar text, one event at a time
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from dateutil import parser as date_parser
+
+# Event fields an ICS export asks the calendar for
+ICS_FIELDS = ("id", "summary", "description", "location", "start", "end", "attendees", "status", "updated", "htmlLink")
+ICS_LINE_OCTETS = 75  # RFC 5545 folds longer content lines
+
+
+def ndjson_lines(events: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """One JSON document per line"""
+    for event in events:
+        yield json.dumps(event) + "\n"
+
+
+def _escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """A content line folded at 75 octets, CRLF-terminated"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= ICS_LINE_OCTETS:
+        return line + "\r\n"
+    parts: List[str] = []
+    current, size, limit = [], 0, ICS_LINE_OCTETS
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > limit:
+            parts.append("".join(current))
+            # Continuation lines start with a space, which counts toward their 75
+            current, size, limit = [], 0, ICS_LINE_OCTETS - 1
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_time(when: Dict[str, str]) -> Optional[str]:
+    """DTSTART/DTEND value and parameters for an event 'start'/'end'"""
+    if 'dateTime' in when:
+        value = date_parser.isoparse(when['dateTime'])
+        if value.tzinfo is None:
+            return f";TZID={when.get('timeZone', 'UTC')}:{value.strftime('%Y%m%dT%H%M%S')}"
+        return f":{value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+    if 'date' in when:
+        return f";VALUE=DATE:{when['date'].replace('-', '')}"
+    return None
+
+
+def ics_event(event: Dict[str, Any], calendar_id: str, stamp: str) -> str:
+    """One VEVENT for an event resource"""
+    lines = ["BEGIN:VEVENT", f"UID:{event.get('id')}@{calendar_id}", f"DTSTAMP:{stamp}"]
+    for name, key in (("DTSTART", 'start'), ("DTEND", 'end')):
+        value = _ics_time(event.get(key) or {})
+        if value:
+            lines.append(name + value)
+    for name, key in (("SUMMARY", 'summary'), ("DESCRIPTION", 'description'), ("LOCATION", 'location')):
+        if event.get(key):
+            lines.append(f"{name}:{_escape(event[key])}")
+    for attendee in event.get('attendees', []):
+        if attendee.get('email'):
+            lines.append(f"ATTENDEE:mailto:{attendee['email']}")
+    if event.get('status') in ('confirmed', 'tentative', 'cancelled'):
+        lines.append(f"STATUS:{event['status'].upper()}")
+    if event.get('updated'):
+        updated = date_parser.isoparse(event['updated']).astimezone(timezone.utc)
+        lines.append(f"LAST-MODIFIED:{updated.strftime('%Y%m%dT%H%M%SZ')}")
+    if event.get('htmlLink'):
+        lines.append(f"URL:{event['htmlLink']}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def ics_calendar(events: Iterable[Dict[str, Any]], calendar_id: str, name: Optional[str] = None) -> Iterator[str]:
+    """A VCALENDAR, yielded one VEVENT at a time"""
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    header = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//TailorTalk//Calendar Export//EN", "CALSCALE:GREGORIAN"]
+    if name:
+        header.append(f"X-WR-CALNAME:{_escape(name)}")
+    yield "".join(_fold(line) for line in header)
+    for event in events:
+        yield ics_event(event, calendar_id, stamp)
+    yield "END:VCALENDAR\r\n"
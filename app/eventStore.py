@@ -0,0 +1,130 @@
+# Local mirror of calendar events, kept current with Google incremental sync
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _sort_key(when: Dict[str, str]) -> str:
+    """UTC RFC 3339 key for an event 'start'/'end' so rows sort and compare as text"""
+    if 'dateTime' in when:
+        value = datetime.fromisoformat(when['dateTime'].replace('Z', '+00:00'))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+    else:
+        # All-day events only carry a date
+        value = datetime.fromisoformat(when['date']).replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class EventStore:
+    """
+    SQLite-backed event mirror. Use ':memory:' for a per-process store or a
+    file path to share it between restarts (the file is opened in WAL mode).
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                id TEXT PRIMARY KEY,
+                start_key TEXT NOT NULL,
+                end_key TEXT NOT NULL,
+                summary TEXT,
+                description TEXT,
+                body TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS events_start ON events (start_key);
+            CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._conn.commit()
+        self._synced_at: Optional[float] = None
+
+    @property
+    def sync_token(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = 'sync_token'").fetchone()
+        return row[0] if row else None
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        """True until the first sync in this process, then once max_age_seconds have passed"""
+        return self._synced_at is None or time.monotonic() - self._synced_at >= max_age_seconds
+
+    def mark_synced(self, sync_token: Optional[str]):
+        with self._lock:
+            if sync_token:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('sync_token', ?)", (sync_token,)
+                )
+            self._conn.commit()
+        self._synced_at = time.monotonic()
+
+    def replace_all(self, events: Iterable[Dict[str, Any]]):
+        """Replace the mirror with the result of a full sync"""
+        with self._lock:
+            self._conn.execute("DELETE FROM events")
+            self._conn.execute("DELETE FROM sync_state")
+            self._apply(events)
+            self._conn.commit()
+
+    def apply_changes(self, events: Iterable[Dict[str, Any]]):
+        """Apply an incremental sync page; cancelled events are removed"""
+        with self._lock:
+            self._apply(events)
+            self._conn.commit()
+
+    def upsert(self, event: Dict[str, Any]):
+        """Record an event we just created or changed ourselves"""
+        self.apply_changes([event])
+
+    def delete(self, event_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+            self._conn.commit()
+
+    def _apply(self, events: Iterable[Dict[str, Any]]):
+        for event in events:
+            if event.get('status') == 'cancelled' or 'start' not in event:
+                self._conn.execute("DELETE FROM events WHERE id = ?", (event['id'],))
+                continue
+            self._conn.execute(
+                "INSERT OR REPLACE INTO events (id, start_key, end_key, summary, description, body) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    event['id'],
+                    _sort_key(event['start']),
+                    _sort_key(event.get('end', event['start'])),
+                    event.get('summary'),
+                    event.get('description'),
+                    json.dumps(event),
+                ),
+            )
+
+    def _select(self, where: str, params: tuple, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT body FROM events WHERE {where} ORDER BY start_key LIMIT ?", params + (limit,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def upcoming(self, now: datetime, limit: int = 10) -> List[Dict[str, Any]]:
+        """Events that have not ended yet, soonest first"""
+        return self._select("end_key > ?", (_sort_key({'dateTime': now.isoformat()}),), limit)
+
+    def between(self, start: datetime, end: datetime, limit: int = 250) -> List[Dict[str, Any]]:
+        """Events overlapping [start, end), e.g. a day view"""
+        return self._select(
+            "start_key < ? AND end_key > ?",
+            (_sort_key({'dateTime': end.isoformat()}), _sort_key({'dateTime': start.isoformat()})),
+            limit,
+        )
+
+    def search(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Events whose title or description contains text (case-insensitive)"""
+        pattern = f"%{text}%"
+        return self._select("summary LIKE ? OR description LIKE ?", (pattern, pattern), limit)
@@ -0,0 +1,115 @@
+# Free-slot search: k-way merge of busy intervals, then the nearest free slots
+import heapq
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.busyIndex import Interval
+
+WORKDAYS = (0, 1, 2, 3, 4)  # Monday to Friday
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def merge_busy(busy_lists: Iterable[Iterable[Interval]]) -> List[Interval]:
+    """
+    Union of busy intervals from any number of calendars. Each list must be
+    sorted by start (freebusy and the busy index return them that way); they
+    are k-way merged through a heap, so n intervals from k calendars cost
+    O(n log k). Touching intervals are joined.
+    """
+    merged: List[Interval] = []
+    for start, end in heapq.merge(*busy_lists):
+        if end <= start:
+            continue
+        # Back-to-back meetings leave no gap
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_windows(busy: List[Interval], window_start: datetime, window_end: datetime) -> List[Interval]:
+    """Gaps between merged busy intervals inside [window_start, window_end)"""
+    windows: List[Interval] = []
+    cursor = window_start
+    for start, end in busy:
+        if end <= cursor:
+            continue
+        if start >= window_end:
+            break
+        if start > cursor:
+            windows.append((cursor, start))
+        cursor = end
+    if cursor < window_end:
+        windows.append((cursor, window_end))
+    return windows
+
+
+def _localize(tz: tzinfo, naive: datetime) -> datetime:
+    # pytz zones need localize() to pick the right offset
+    localize = getattr(tz, 'localize', None)
+    return localize(naive) if localize else naive.replace(tzinfo=tz)
+
+
+def working_windows(window_start: datetime, window_end: datetime, working_hours: Tuple[time, time],
+                    tz: tzinfo, days: Sequence[int] = WORKDAYS) -> List[Interval]:
+    """Working-hour stretches of each allowed local weekday inside [window_start, window_end)"""
+    windows: List[Interval] = []
+    day: date = window_start.astimezone(tz).date()
+    while True:
+        opens = _localize(tz, datetime.combine(day, working_hours[0]))
+        if opens >= window_end:
+            return windows
+        closes = _localize(tz, datetime.combine(day, working_hours[1]))
+        start, end = max(opens, window_start), min(closes, window_end)
+        if day.weekday() in days and end > start:
+            windows.append((start, end))
+        day += timedelta(days=1)
+
+
+def _ceil(moment: datetime, step: timedelta) -> datetime:
+    """Round up to a multiple of step (counted from the epoch, so local quarter hours line up)"""
+    return moment + (-(moment - _EPOCH) % step)
+
+
+def free_slots(busy: List[Interval], windows: List[Interval], duration: timedelta, step: timedelta) -> List[Interval]:
+    """
+    Every step-aligned slot of `duration` inside the windows that doesn't touch
+    a busy interval. busy must be merged and sorted (see merge_busy).
+    """
+    slots: List[Interval] = []
+    i = 0
+    for window_start, window_end in windows:
+        while i < len(busy) and busy[i][1] <= window_start:
+            i += 1
+        cursor, j = window_start, i
+        while cursor < window_end:
+            gap_end = min(busy[j][0], window_end) if j < len(busy) else window_end
+            start = _ceil(cursor, step)
+            while start + duration <= gap_end:
+                slots.append((start, start + duration))
+                start += step
+            if j >= len(busy) or busy[j][0] >= window_end:
+                break
+            cursor = busy[j][1]
+            j += 1
+    return slots
+
+
+def nearest_slots(slots: List[Interval], limit: int, preferred: Optional[datetime] = None) -> List[Interval]:
+    """
+    Up to `limit` non-overlapping slots, closest to `preferred` (or earliest
+    first without one), returned in time order
+    """
+    if preferred is not None:
+        candidates = sorted(slots, key=lambda slot: (abs(slot[0] - preferred), slot[0]))
+    else:
+        candidates = slots
+    chosen: List[Interval] = []
+    for start, end in candidates:
+        if all(end <= other_start or start >= other_end for other_start, other_end in chosen):
+            chosen.append((start, end))
+            if len(chosen) == limit:
+                break
+    return sorted(chosen)
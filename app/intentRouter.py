@@ -0,0 +1,165 @@
+# Deterministic intent router: answers fully specified requests without the LLM
+from dataclasses import dataclass, field
+import os
+import re
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.meetingParser import ParsedMeeting, parse_meeting
+
+logger = logging.getLogger(__name__)
+
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.8"))
+
+GREETING_RESPONSE = "👋 Hello! I'm TailorTalk, your AI calendar assistant. I can help you book meetings, check your schedule, and manage your calendar. What would you like to do today?"
+
+HELP_RESPONSE = """🤖 **I can help you with:**
+
+📅 **Meeting Management**
+• Book new meetings with natural language
+• Check calendar availability
+• View upcoming events
+• Cancel existing meetings
+
+💬 **Natural Conversation**
+• Just tell me what you need in plain English
+• I'll ask for any missing details
+• I'll confirm everything before booking
+
+**Examples:**
+• "Book a meeting tomorrow at 3 PM about project review"
+• "Show me my upcoming meetings"
+• "I need to cancel my meeting with John"
+
+What would you like to do?"""
+
+_BOOK_VERB = re.compile(r"\b(?:book|schedule|arrange|set\s+up|create|plan)\b", re.IGNORECASE)
+_MEETING_NOUN = re.compile(r"\b(?:meeting|appointment|call|session|sync)s?\b", re.IGNORECASE)
+_LIST = re.compile(
+    r"\b(?:upcoming|what'?s\s+on|show\s+(?:me\s+)?my|list\s+(?:my|all)|my\s+(?:meetings|events|schedule|calendar|agenda))\b",
+    re.IGNORECASE,
+)
+_AVAILABILITY = re.compile(r"\b(?:available|availability|free|busy)\b", re.IGNORECASE)
+_CANCEL = re.compile(r"\b(?:cancel|delete|remove|reschedule|move)\b", re.IGNORECASE)
+_HELP = re.compile(r"\b(?:help|what\s+can\s+you\s+do|capabilities)\b", re.IGNORECASE)
+_GREETING = re.compile(r"^\s*(?:hello|hi|hey|good\s+(?:morning|afternoon|evening))\b", re.IGNORECASE)
+# Hedges and alternatives mean the user hasn't settled on one request
+_HEDGE = re.compile(r"\b(?:or|maybe|perhaps|either|if)\b", re.IGNORECASE)
+
+
+@dataclass
+class RouteDecision:
+    """Which intent a message has, how sure we are, and what it is still missing"""
+    intent: str
+    confidence: float
+    meeting: ParsedMeeting
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def use_llm(self) -> bool:
+        # Anything missing needs a follow-up question, which only the LLM asks
+        return self.intent in ('unknown', 'cancel') or bool(self.missing) or self.confidence < ROUTER_CONFIDENCE_THRESHOLD
+
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {"routed": 0, "llm_calls_avoided": 0, "sent_to_llm": 0}
+
+
+def _count(*keys: str):
+    with _stats_lock:
+        for key in keys:
+            _stats[key] = _stats.get(key, 0) + 1
+
+
+def route(user_input: str, now: Optional[datetime] = None) -> RouteDecision:
+    """Classify a message and score how completely it specifies that intent (0.0-1.0)"""
+    meeting = parse_meeting(user_input, now=now)
+    intents = []
+    if _BOOK_VERB.search(user_input) and _MEETING_NOUN.search(user_input):
+        intents.append('book')
+    if _LIST.search(user_input):
+        intents.append('list')
+    if _AVAILABILITY.search(user_input):
+        intents.append('availability')
+    if _CANCEL.search(user_input):
+        intents.append('cancel')
+
+    if not intents:
+        if _HELP.search(user_input):
+            return RouteDecision('help', 0.95, meeting)
+        if _GREETING.search(user_input):
+            return RouteDecision('greeting', 0.95, meeting)
+        return RouteDecision('unknown', 0.0, meeting)
+
+    if len(intents) > 1:
+        # e.g. "book a meeting if I'm free at 3" - let the LLM sort out the order of actions
+        return RouteDecision(intents[0], 0.4, meeting)
+
+    intent = intents[0]
+    if intent == 'cancel':
+        # Cancelling needs an event to be identified, which only the conversation can do
+        return RouteDecision(intent, 0.3, meeting, ['event'])
+
+    if intent == 'list':
+        confidence, missing = 0.9, []
+    else:
+        required = [('date', meeting.date), ('time', meeting.time)]
+        if intent == 'book':
+            # A booking is only unambiguous once we know what it's about and who to invite
+            required += [('title', meeting.title or meeting.agenda), ('attendees', meeting.attendees)]
+        missing = [name for name, value in required if not value]
+        confidence = 1.0 - 0.25 * len(missing)
+    if _HEDGE.search(user_input):
+        confidence -= 0.3
+    return RouteDecision(intent, round(confidence, 2), meeting, missing)
+
+
+def answer_directly(decision: RouteDecision, user_input: str) -> str:
+    """Handle a decision that doesn't need the LLM by calling the calendar functions"""
+    if decision.intent == 'greeting':
+        return GREETING_RESPONSE
+    if decision.intent == 'help':
+        return HELP_RESPONSE
+
+    from app.calendarUtils import (
+        book_event_from_text,
+        check_availability_from_text,
+        format_event_list,
+        get_events_for_day,
+        get_upcoming_events
+    )
+
+    if decision.intent == 'book':
+        start = datetime.combine(decision.meeting.date, decision.meeting.time)
+        if start < datetime.now():
+            return "❌ I can't book meetings in the past. Please choose a future date and time."
+        return book_event_from_text(user_input)
+    if decision.intent == 'availability':
+        return check_availability_from_text(user_input)
+    if decision.meeting.date:
+        return format_event_list(get_events_for_day(decision.meeting.date), f"on {decision.meeting.date.strftime('%A, %B %d')}")
+    return format_event_list(get_upcoming_events(5), "coming up")
+
+
+def try_fast_path(user_input: str) -> Optional[str]:
+    """
+    Route a message and answer it directly when the router is confident enough
+    Returns None when the message should go to the LLM
+    """
+    decision = route(user_input)
+    logger.info(f"🧭 Routed as {decision.intent} (confidence {decision.confidence:.2f}, missing {decision.missing or 'nothing'})")
+    if decision.use_llm:
+        _count("routed", "sent_to_llm")
+        return None
+    _count("routed", "llm_calls_avoided", f"fast_path_{decision.intent}")
+    return answer_directly(decision, user_input)
+
+
+def get_router_stats() -> Dict[str, int]:
+    """
+    Get counts of routed messages and LLM calls avoided
+    """
+    with _stats_lock:
+        return dict(_stats)
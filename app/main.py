@@ -1,10 +1,25 @@
 # FastAPI backend for meeting booking bot
-from typing import List, Tuple, Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, status
+from typing import List, Tuple, Optional, Dict, Any, Iterable, Iterator
+from fastapi import FastAPI, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr, validator
-import re
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
 from datetime import datetime, timedelta
 import logging
+import pytz
+from app.meetingParser import parse_meeting
+from app.intentRouter import get_router_stats, try_fast_path
+from app.metrics import HTTP_REQUEST_SECONDS, REGISTRY, Sample
+from app import profiling
+from app.profiling import profiled
+from app.sessionStore import Session, SessionStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,6 +31,189 @@ app = FastAPI(
     version="1.0.0"
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe latency per route template (for streams, the time until the response starts)"""
+    started = time.perf_counter()
+    response_status = 500
+    try:
+        response = await call_next(request)
+        response_status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            path=getattr(route, "path", "unmatched"),
+            status=str(response_status)
+        )
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Profile single requests on demand: every request when PROFILE_MODE is set,
+    or one that sends X-Profile: cpu|memory with a matching X-Profile-Token.
+    The profile is written when the response body is done (so streams are
+    covered) and its file name is returned in X-Profile-File.
+    """
+    mode = profiling.requested_mode(request.headers)
+    if mode is None:
+        return await call_next(request)
+    
+    profile = profiling.begin(mode, f"{request.method} {request.url.path}")
+    try:
+        response = await call_next(request)
+    except Exception:
+        await asyncio.get_running_loop().run_in_executor(None, profile.finish)
+        raise
+    
+    body = response.body_iterator
+    async def body_then_finish():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            await asyncio.get_running_loop().run_in_executor(None, profile.finish)
+    
+    response.body_iterator = body_then_finish()
+    response.headers["X-Profile-File"] = profile.filename
+    return response
+
+# Agent execution pool: the LangChain agent is synchronous, so it runs on a
+# dedicated thread pool instead of the event loop. The semaphore caps how many
+# agent runs may be in flight at once; excess requests wait for a free slot.
+AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", "8"))
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", str(AGENT_WORKERS)))
+AGENT_TIMEOUT_SECONDS = float(os.getenv("AGENT_TIMEOUT_SECONDS", "60"))
+
+agent_pool = ThreadPoolExecutor(max_workers=AGENT_WORKERS, thread_name_prefix="agent")
+_agent_slots: Optional[asyncio.Semaphore] = None
+
+def _get_agent_slots() -> asyncio.Semaphore:
+    """Create the concurrency semaphore lazily so it binds to the running loop"""
+    global _agent_slots
+    if _agent_slots is None:
+        _agent_slots = asyncio.Semaphore(AGENT_MAX_CONCURRENCY)
+    return _agent_slots
+
+def _invoke_agent(user_input: str, chat_history: List[Tuple[str, str]]) -> str:
+    """Run the agent synchronously (through its response cache); executed on the agent pool"""
+    from app.agent import invoke_agent
+    return invoke_agent(user_input, chat_history)
+
+async def _start_agent_run(fn, *args) -> asyncio.Future:
+    """
+    Wait for a free agent slot, then start fn on the agent pool
+    The slot is given back when the run itself finishes, not when the caller
+    stops waiting for it: a timed-out or abandoned run keeps its pool thread
+    busy, so it keeps counting against AGENT_MAX_CONCURRENCY until it ends
+    """
+    loop = asyncio.get_running_loop()
+    slots = _get_agent_slots()
+    await slots.acquire()
+    try:
+        future = loop.run_in_executor(agent_pool, profiled(fn), *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+async def run_agent(user_input: str, chat_history: List[Tuple[str, str]]) -> Any:
+    """Run the agent off the event loop, bounded by AGENT_MAX_CONCURRENCY"""
+    future = await _start_agent_run(_invoke_agent, user_input, chat_history)
+    # The timeout only bounds the response; shield keeps it from cancelling the run's future
+    return await asyncio.wait_for(asyncio.shield(future), timeout=AGENT_TIMEOUT_SECONDS)
+
+# Chat sessions: the conversation lives server-side, so clients send a session
+# id and the new message instead of the whole transcript. SESSION_STORE_PATH
+# makes the store a SQLite file that several API workers can share.
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH") or None
+
+session_store = SessionStore(
+    max_sessions=SESSION_MAX_COUNT,
+    max_bytes=SESSION_MAX_BYTES,
+    idle_seconds=SESSION_IDLE_SECONDS,
+    path=SESSION_STORE_PATH
+)
+
+# Startup: heavy components (Calendar clients, Groq LLM, LangChain agent) are
+# not built at import time. With WARMUP_ON_STARTUP they are warmed concurrently
+# in the background after boot and /ready reports when they are all usable.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+def _warm_calendar() -> bool:
+    from app.calendarUtils import get_calendar_backend
+    from app.asyncCalendarUtils import get_async_calendar_backend
+    return get_calendar_backend() is not None and get_async_calendar_backend() is not None
+
+def _warm_llm() -> bool:
+    from app.agent import get_llm
+    return get_llm() is not None
+
+def _warm_agent() -> bool:
+    from app.agent import get_agent_executor
+    return get_agent_executor() is not None
+
+WARMUP_STEPS = {
+    "calendar": _warm_calendar,
+    "llm": _warm_llm,
+    "agent": _warm_agent,
+}
+readiness: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in WARMUP_STEPS}
+
+async def warm_up():
+    """Warm every component concurrently and record its readiness"""
+    loop = asyncio.get_running_loop()
+    
+    async def warm(name, step):
+        started = time.perf_counter()
+        try:
+            ok = await loop.run_in_executor(None, step)
+        except Exception as e:
+            logger.error(f"Warm-up of {name} failed: {e}")
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        readiness[name] = {"status": "ready" if ok else "failed", "warmup_ms": round(elapsed_ms, 1)}
+        logger.info(f"🔥 Warm-up of {name}: {readiness[name]['status']} in {elapsed_ms:.0f} ms")
+    
+    await asyncio.gather(*(warm(name, step) for name, step in WARMUP_STEPS.items()))
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Kick off the background warm-up without delaying boot"""
+    if WARMUP_ON_STARTUP:
+        app.state.warmup_task = asyncio.create_task(warm_up())
+
+@app.on_event("shutdown")
+def shutdown_agent_pool():
+    """Stop accepting agent work and release the pool threads"""
+    agent_pool.shutdown(wait=False, cancel_futures=True)
+
+@app.on_event("startup")
+async def start_booking_workers():
+    """Open the booking outbox so bookings queued before a restart are delivered"""
+    from app.calendarUtils import get_booking_outbox
+    await asyncio.get_running_loop().run_in_executor(None, get_booking_outbox)
+
+@app.on_event("shutdown")
+def stop_booking_workers():
+    """Let the outbox workers finish their current batch"""
+    calendar = sys.modules.get("app.calendarUtils")
+    if calendar is not None:
+        calendar.stop_booking_workers()
+
+@app.on_event("shutdown")
+async def close_calendar_client():
+    """Close the async Calendar client's pooled connections"""
+    async_calendar = sys.modules.get("app.asyncCalendarUtils")
+    if async_calendar is not None:
+        await async_calendar.close_async_calendar_backend()
+
 class MeetingDetails(BaseModel):
     date: str
     time: str
@@ -41,131 +239,113 @@ class MeetingDetails(BaseModel):
 
 class ChatInput(BaseModel):
     user_input: str
+    session_id: Optional[str] = None
+    # Only used without a session_id, for clients that still send the transcript
     chat_history: List[Tuple[str, str]] = []
 
+class TimeRange(BaseModel):
+    start: datetime
+    end: datetime
+    
+    @validator('end')
+    def validate_end(cls, v, values):
+        if 'start' in values and v <= values['start']:
+            raise ValueError('end must be after start')
+        return v
+
+class AvailabilityRequest(BaseModel):
+    ranges: List[TimeRange]
+    calendars: Optional[List[str]] = None
+
+class AttendeeAvailabilityRequest(TimeRange):
+    attendees: List[EmailStr] = []
+    min_free_minutes: int = 0
+
+    @validator('min_free_minutes')
+    def validate_min_free_minutes(cls, v):
+        if v < 0:
+            raise ValueError('min_free_minutes cannot be negative')
+        return v
+
+class FreeSlotsRequest(BaseModel):
+    start: datetime
+    end: datetime
+    duration_minutes: int = 30
+    working_hours: str = "09:00-18:00"  # Local time (Asia/Kolkata)
+    preferred_start: Optional[datetime] = None
+    limit: int = 3
+    include_weekends: bool = False
+    calendars: Optional[List[str]] = None
+    
+    @validator('end')
+    def validate_end(cls, v, values):
+        start = values.get('start')
+        if start and v <= start:
+            raise ValueError('end must be after start')
+        if start and v - start > timedelta(days=31):
+            raise ValueError('The search window can be at most 31 days')
+        return v
+    
+    @validator('duration_minutes')
+    def validate_duration(cls, v):
+        if not 5 <= v <= 480:
+            raise ValueError('duration_minutes must be between 5 and 480')
+        return v
+    
+    @validator('working_hours')
+    def validate_working_hours(cls, v):
+        from app.calendarUtils import parse_working_hours
+        try:
+            parse_working_hours(v)
+        except ValueError:
+            raise ValueError("working_hours must look like '09:00-18:00'")
+        return v
+    
+    @validator('limit')
+    def validate_limit(cls, v):
+        if not 1 <= v <= 20:
+            raise ValueError('limit must be between 1 and 20')
+        return v
+
+class BulkBookingRequest(BaseModel):
+    meetings: List[MeetingDetails]
+
+class BulkCancelRequest(BaseModel):
+    event_ids: List[str]
+
 class MeetingResponse(BaseModel):
     message: str
     details: Optional[MeetingDetails] = None
     success: bool = True
     error_code: Optional[str] = None
+    job_id: Optional[str] = None  # Poll /jobs/{job_id} for the booking's progress
 
 def extract_meeting_details(user_input: str) -> Optional[MeetingDetails]:
-    """Enhanced meeting details extraction with better parsing"""
+    """Extract meeting details for the API using the shared meeting parser"""
     try:
-        # Date patterns: YYYY-MM-DD, tomorrow, next week, etc.
-        date_patterns = [
-            r'\b(\d{4}-\d{2}-\d{2})\b',  # YYYY-MM-DD
-            r'\b(tomorrow)\b',
-            r'\b(next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday))\b',
-            r'\b(in\s+\d+\s+days?)\b'
-        ]
-        
-        # Time patterns: HH:MM, 3 PM, 15:30, etc.
-        time_patterns = [
-            r'\b(\d{1,2}:\d{2})\b',  # HH:MM
-            r'\b(\d{1,2}\s*(am|pm))\b',  # 3 PM, 3pm
-            r'\b(\d{1,2}:\d{2}\s*(am|pm))\b'  # 3:30 PM
-        ]
-        
-        # Duration patterns
-        duration_patterns = [
-            r'\b(\d+)\s*(minute|min|hour|hr)s?\b',
-            r'\bfor\s+(\d+)\s*(minute|min|hour|hr)s?\b'
-        ]
-        
-        # Extract date
-        date_match = None
-        for pattern in date_patterns:
-            date_match = re.search(pattern, user_input.lower())
-            if date_match:
-                break
-        
-        # Extract time
-        time_match = None
-        for pattern in time_patterns:
-            time_match = re.search(pattern, user_input.lower())
-            if time_match:
-                break
-        
-        # Extract participants (email addresses)
-        participants_match = re.findall(r'[\w\.-]+@[\w\.-]+\.\w+', user_input)
-        
-        # Extract agenda
-        agenda_patterns = [
-            r'agenda[:\-]?\s*(.*?)(?=\s+(?:with|for|on|at)|$)',
-            r'about\s+(.*?)(?=\s+(?:with|for|on|at)|$)',
-            r'titled\s+[\'"](.*?)[\'"]',
-            r'meeting\s+(?:about|regarding)\s+(.*?)(?=\s+(?:with|for|on|at)|$)'
-        ]
-        
-        agenda_match = None
-        for pattern in agenda_patterns:
-            agenda_match = re.search(pattern, user_input, re.IGNORECASE)
-            if agenda_match:
-                break
-        
-        # Extract duration
-        duration_match = None
-        for pattern in duration_patterns:
-            duration_match = re.search(pattern, user_input.lower())
-            if duration_match:
-                break
-        
-        # Process extracted data
-        if date_match and time_match and participants_match:
-            # Convert relative dates to absolute dates
-            date_str = date_match.group(1)
-            if date_str == 'tomorrow':
-                date_str = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
-            elif date_str.startswith('next '):
-                # Handle "next monday" etc.
-                day_name = date_str.split()[1]
-                days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-                target_day = days.index(day_name)
-                current_day = datetime.now().weekday()
-                days_ahead = (target_day - current_day + 7) % 7
-                if days_ahead == 0:
-                    days_ahead = 7
-                date_str = (datetime.now() + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-            
-            # Process time
-            time_str = time_match.group(1)
-            if 'pm' in time_str.lower() and not time_str.startswith('12'):
-                # Convert 12-hour to 24-hour format
-                time_parts = re.findall(r'(\d{1,2}):?(\d{2})?', time_str)
-                if time_parts:
-                    hour = int(time_parts[0][0])
-                    minute = int(time_parts[0][1]) if time_parts[0][1] else 0
-                    hour = hour + 12 if hour < 12 else hour
-                    time_str = f"{hour:02d}:{minute:02d}"
-            
-            # Process duration
-            duration = 30  # default
-            if duration_match:
-                value = int(duration_match.group(1))
-                unit = duration_match.group(2)
-                if 'hour' in unit or 'hr' in unit:
-                    duration = value * 60
-                else:
-                    duration = value
-            
-            return MeetingDetails(
-                date=date_str,
-                time=time_str,
-                participants=participants_match,
-                agenda=agenda_match.group(1).strip() if agenda_match else None,
-                duration=duration
-            )
+        parsed = parse_meeting(user_input)
+        if not parsed.is_complete:
+            return None
         
-        return None
+        return MeetingDetails(
+            date=parsed.date.strftime('%Y-%m-%d'),
+            time=parsed.time.strftime('%H:%M'),
+            participants=parsed.attendees,
+            agenda=parsed.agenda,
+            duration=parsed.duration_minutes
+        )
         
     except Exception as e:
         logger.error(f"Error extracting meeting details: {e}")
         return None
 
 @app.post("/book_meeting", response_model=MeetingResponse)
-async def book_meeting_endpoint(payload: ChatInput):
-    """Enhanced meeting booking endpoint with better validation"""
+async def book_meeting_endpoint(payload: ChatInput, response: Response):
+    """
+    Validate a meeting request, check the slot is free and queue it in the booking outbox
+    Answers 202 with a job id right away; the calendar write happens in the background.
+    A busy slot is answered with error_code CONFLICT and nothing is queued.
+    """
     try:
         details = extract_meeting_details(payload.user_input)
         if not details:
@@ -184,13 +364,42 @@ async def book_meeting_endpoint(payload: ChatInput):
                 error_code="PAST_DATE"
             )
         
-        # Here you would integrate with a real calendar API
-        message = f"✅ Meeting booked successfully!\n\n📅 Date: {details.date}\n🕐 Time: {details.time}\n👥 Participants: {', '.join(details.participants)}\n⏱️ Duration: {details.duration} minutes"
+        from app.asyncCalendarUtils import check_attendee_availability
+        from app.calendarUtils import enqueue_booking
+        start_time = pytz.timezone("Asia/Kolkata").localize(meeting_datetime)
+        end_time = start_time + timedelta(minutes=details.duration or 30)
+        
+        # Check our calendar and the participants' before queueing, as chat bookings do
+        availability = await check_attendee_availability(start_time, end_time, details.participants)
+        if availability["busy"]:
+            return MeetingResponse(
+                message=f"⛔ That time slot is already busy ({', '.join(availability['busy_calendars'])}). Please try a different time.",
+                details=details,
+                success=False,
+                error_code="CONFLICT"
+            )
+        if not availability["free"]:
+            return MeetingResponse(
+                message="❌ Couldn't check the calendar right now, so nothing was booked. Please try again in a moment.",
+                details=details,
+                success=False,
+                error_code="AVAILABILITY_UNKNOWN"
+            )
+        
+        loop = asyncio.get_running_loop()
+        job_id = await loop.run_in_executor(
+            None, enqueue_booking, details.agenda or "Meeting", start_time, end_time,
+            details.agenda, details.participants
+        )
+        
+        message = f"📨 Meeting request accepted!\n\n📅 Date: {details.date}\n🕐 Time: {details.time}\n👥 Participants: {', '.join(details.participants)}\n⏱️ Duration: {details.duration} minutes"
         
         if details.agenda:
             message += f"\n📋 Agenda: {details.agenda}"
+        message += f"\n\n🔎 Track it at /jobs/{job_id}"
         
-        return MeetingResponse(message=message, details=details)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return MeetingResponse(message=message, details=details, job_id=job_id)
         
     except Exception as e:
         logger.error(f"Error in book_meeting_endpoint: {e}")
@@ -200,53 +409,53 @@ async def book_meeting_endpoint(payload: ChatInput):
             error_code="INTERNAL_ERROR"
         )
 
+def _reply_text(reply: Any) -> str:
+    """Pull the user-facing text out of an agent result"""
+    if isinstance(reply, dict):
+        return reply.get("output") or reply.get("response") or str(reply)
+    return reply
+
+def _open_session(payload: ChatInput) -> Tuple[Optional[Session], List[Tuple[str, str]]]:
+    """Load (or start) the payload's session; a bare chat_history keeps the stateless behaviour"""
+    if payload.session_id is None and payload.chat_history:
+        return None, payload.chat_history
+    session = session_store.get_or_create(payload.session_id)
+    return session, session.history()
+
+def _record_turn(session: Optional[Session], user_input: str, reply: str):
+    if session is not None:
+        session.record(user_input, reply)
+        session_store.save(session)
+
+def _chat_response(session: Optional[Session], reply: str) -> Dict[str, Any]:
+    if session is None:
+        return {"response": reply}
+    return {"response": reply, "session_id": session.session_id}
+
 @app.post("/chat")
 async def chat(payload: ChatInput):
     """Enhanced chat endpoint with better error handling"""
     try:
-        user_input = payload.user_input.lower().strip()
-        
-        # Check for meeting booking intent
-        booking_keywords = ['book', 'schedule', 'arrange', 'set up', 'create']
-        meeting_keywords = ['meeting', 'appointment', 'call', 'session']
+        loop = asyncio.get_running_loop()
+        session, chat_history = await loop.run_in_executor(None, profiled(_open_session), payload)
         
-        is_booking_request = any(keyword in user_input for keyword in booking_keywords) and \
-                           any(keyword in user_input for keyword in meeting_keywords)
-        
-        if is_booking_request:
-            details = extract_meeting_details(payload.user_input)
-            if not details:
-                return {
-                    "response": "I'd be happy to help you book a meeting! Please provide:\n\n• **Date**: When would you like to meet? (e.g., tomorrow, 2025-01-15, next monday)\n• **Time**: What time works for you? (e.g., 3 PM, 15:30)\n• **Participants**: Who should be invited? (email addresses)\n• **Optional**: Meeting agenda and duration"
-                }
-            
-            # Validate the meeting details
-            meeting_datetime = datetime.strptime(f"{details.date} {details.time}", "%Y-%m-%d %H:%M")
-            if meeting_datetime < datetime.now():
-                return {"response": "❌ I can't book meetings in the past. Please choose a future date and time."}
-            
-            message = f"✅ Meeting booked successfully!\n\n📅 **Date**: {details.date}\n🕐 **Time**: {details.time}\n👥 **Participants**: {', '.join(details.participants)}\n⏱️ **Duration**: {details.duration} minutes"
-            
-            if details.agenda:
-                message += f"\n📋 **Agenda**: {details.agenda}"
-            
-            return {"response": message}
+        # Fully specified requests are answered by the router without the LLM
+        fast_reply = await loop.run_in_executor(None, profiled(try_fast_path), payload.user_input)
+        if fast_reply is not None:
+            await loop.run_in_executor(None, profiled(_record_turn), session, payload.user_input, fast_reply)
+            return _chat_response(session, fast_reply)
         
         # Handle other conversation with the agent
         try:
-            from app.agent import agent_executor
-            reply = agent_executor.invoke({
-                "input": payload.user_input,
-                "chat_history": payload.chat_history
-            })
-            
-            if isinstance(reply, dict):
-                reply = reply.get("output") or reply.get("response") or str(reply)
-            
-            return {"response": reply}
+            reply = _reply_text(await run_agent(payload.user_input, chat_history))
+            await loop.run_in_executor(None, profiled(_record_turn), session, payload.user_input, reply)
+            return _chat_response(session, reply)
             
         except ImportError:
             return {"response": "I'm here to help you book meetings! Just let me know when you'd like to schedule something."}
+        except asyncio.TimeoutError:
+            logger.error(f"Agent execution timed out after {AGENT_TIMEOUT_SECONDS}s")
+            return {"response": "That took longer than expected. Please try again in a moment."}
         except Exception as e:
             logger.error(f"Agent execution error: {e}")
             return {"response": f"I encountered an issue processing your request. Please try again or rephrase your message."}
@@ -255,11 +464,415 @@ async def chat(payload: ChatInput):
         logger.error(f"Error in chat endpoint: {e}")
         return {"response": "I'm having trouble processing your request right now. Please try again in a moment."}
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _chat_events(payload: ChatInput):
+    """Yield SSE frames for one chat turn: token/tool events while the agent runs, then done or error"""
+    loop = asyncio.get_running_loop()
+    try:
+        session, chat_history = await loop.run_in_executor(None, profiled(_open_session), payload)
+        fast_reply = await loop.run_in_executor(None, profiled(try_fast_path), payload.user_input)
+        if fast_reply is not None:
+            await loop.run_in_executor(None, profiled(_record_turn), session, payload.user_input, fast_reply)
+            yield _sse("done", _chat_response(session, fast_reply))
+            return
+    except Exception as e:
+        logger.error(f"Error in chat stream: {e}")
+        yield _sse("error", {"response": "I'm having trouble processing your request right now. Please try again in a moment."})
+        return
+    
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def emit(kind: str, data: Dict[str, Any]):
+        # Called from the agent thread
+        loop.call_soon_threadsafe(events.put_nowait, (kind, data))
+    
+    def stream_agent():
+        try:
+            from app.agent import run_agent_streaming
+            reply = _reply_text(run_agent_streaming(payload.user_input, chat_history, emit))
+            _record_turn(session, payload.user_input, reply)
+            emit("done", _chat_response(session, reply))
+        except Exception as e:
+            logger.error(f"Agent execution error: {e}")
+            emit("error", {"response": "I encountered an issue processing your request. Please try again or rephrase your message."})
+    
+    # The run holds its slot until stream_agent returns, even if the client goes away first
+    await _start_agent_run(stream_agent)
+    deadline = loop.time() + AGENT_TIMEOUT_SECONDS
+    while True:
+        try:
+            kind, data = await asyncio.wait_for(events.get(), timeout=max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            logger.error(f"Agent execution timed out after {AGENT_TIMEOUT_SECONDS}s")
+            yield _sse("error", {"response": "That took longer than expected. Please try again in a moment."})
+            return
+        yield _sse(kind, data)
+        if kind in ("done", "error"):
+            return
+
+@app.post("/chat/stream")
+async def chat_stream(payload: ChatInput):
+    """Streaming chat: Server-Sent Events with LLM tokens and tool progress, ending with 'done' or 'error'"""
+    return StreamingResponse(
+        _chat_events(payload),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """Forget a chat session (e.g. when the user clears the conversation)"""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, profiled(session_store.delete), session_id)
+    return {"deleted": session_id}
+
+@app.post("/availability")
+async def availability_endpoint(payload: AvailabilityRequest):
+    """Check many candidate slots on one or more calendars in as few freebusy queries as possible"""
+    try:
+        from app.asyncCalendarUtils import check_availability_many
+        from app.calendarUtils import as_local
+        # Naive times are local, as on every other endpoint
+        ranges = [(as_local(time_range.start), as_local(time_range.end)) for time_range in payload.ranges]
+        results = await check_availability_many(ranges, payload.calendars)
+        return {"results": results, "free_count": sum(1 for result in results if result["free"])}
+    except Exception as e:
+        logger.error(f"Error in availability endpoint: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Availability check failed")
+
+@app.post("/availability/attendees")
+async def attendee_availability_endpoint(payload: AttendeeAvailabilityRequest):
+    """Check every attendee's calendar in one freebusy query and return the windows everyone has free"""
+    try:
+        from app.asyncCalendarUtils import check_attendee_availability
+        from app.calendarUtils import as_local
+        return await check_attendee_availability(as_local(payload.start), as_local(payload.end),
+                                                 payload.attendees, payload.min_free_minutes)
+    except Exception as e:
+        logger.error(f"Error in attendee_availability_endpoint: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Availability check failed")
+
+@app.post("/free_slots")
+async def free_slots_endpoint(payload: FreeSlotsRequest):
+    """Nearest free slots of a given length within working hours, across one or more calendars"""
+    try:
+        from app.asyncCalendarUtils import find_free_slots
+        from app.calendarUtils import as_local, parse_working_hours
+        
+        result = await find_free_slots(
+            as_local(payload.start),
+            as_local(payload.end),
+            duration_minutes=payload.duration_minutes,
+            working_hours=parse_working_hours(payload.working_hours),
+            limit=payload.limit,
+            preferred=as_local(payload.preferred_start) if payload.preferred_start else None,
+            calendars=payload.calendars,
+            include_weekends=payload.include_weekends
+        )
+        return result
+    except Exception as e:
+        logger.error(f"Error in free_slots_endpoint: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Free slot search failed")
+
+def _bulk_summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Wrap per-item bulk results with success/failure counts"""
+    succeeded = sum(1 for result in results if result.get("success"))
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+@app.post("/book_meetings/bulk")
+async def bulk_book_endpoint(payload: BulkBookingRequest):
+    """Book many meetings through Calendar batch requests, reporting each one"""
+    try:
+        from app.calendarUtils import book_events
+        local_tz = pytz.timezone("Asia/Kolkata")
+        results: List[Optional[Dict[str, Any]]] = [None] * len(payload.meetings)
+        events, positions = [], []
+        
+        for index, details in enumerate(payload.meetings):
+            meeting_datetime = datetime.strptime(f"{details.date} {details.time}", "%Y-%m-%d %H:%M")
+            if meeting_datetime < datetime.now():
+                results[index] = {"success": False, "error": "Cannot book meetings in the past", "error_code": "PAST_DATE"}
+                continue
+            start_time = local_tz.localize(meeting_datetime)
+            events.append({
+                "summary": details.agenda or "Meeting",
+                "start_time": start_time,
+                "end_time": start_time + timedelta(minutes=details.duration or 30),
+                "description": details.agenda,
+                "attendees": details.participants
+            })
+            positions.append(index)
+        
+        loop = asyncio.get_running_loop()
+        booked = await loop.run_in_executor(None, profiled(book_events), events)
+        for index, result in zip(positions, booked):
+            results[index] = result
+        
+        return _bulk_summary(results)
+    except Exception as e:
+        logger.error(f"Error in bulk_book_endpoint: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Bulk booking failed")
+
+@app.post("/cancel/bulk")
+async def bulk_cancel_endpoint(payload: BulkCancelRequest):
+    """Cancel many events through Calendar batch requests, reporting each one"""
+    try:
+        from app.calendarUtils import cancel_events
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, profiled(cancel_events), payload.event_ids)
+        return _bulk_summary(results)
+    except Exception as e:
+        logger.error(f"Error in bulk_cancel_endpoint: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Bulk cancellation failed")
+
+# Import bodies are streamed into a spool file (on disk past IMPORT_SPOOL_MEMORY_BYTES)
+# and read back a row at a time, so a large file never sits in memory whole
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+IMPORT_SPOOL_MEMORY_BYTES = int(os.getenv("IMPORT_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+
+def _import_file(spool: Any, fmt: Optional[str], tz: str, dry_run: bool) -> Dict[str, Any]:
+    from app.calendarUtils import import_meetings
+    from app.meetingImport import read_import_file
+    return import_meetings(lambda: read_import_file(spool, fmt, tz), dry_run=dry_run)
+
+@app.post("/import")
+async def import_meetings_endpoint(request: Request, format: Optional[str] = None, timezone: str = "Asia/Kolkata",
+                                   dry_run: bool = False):
+    """
+    Import meetings from a CSV or ICS request body (format from ?format=, the
+    Content-Type, or the first line), with a result per row
+    """
+    from app.meetingImport import format_for_content_type
+    if format not in (None, "csv", "ics"):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="format must be 'csv' or 'ics'")
+    if timezone not in pytz.all_timezones_set:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown timezone '{timezone}'")
+    
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MEMORY_BYTES) as spool:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                    detail=f"Import files can be at most {IMPORT_MAX_BYTES} bytes")
+            spool.write(chunk)
+        
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                None, profiled(_import_file), spool, format or format_for_content_type(request.headers.get("content-type")),
+                timezone, dry_run
+            )
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import files must be UTF-8 text")
+        except Exception as e:
+            logger.error(f"Error in import_meetings_endpoint: {e}")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Import failed")
+    
+    if not result.get("success"):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=result.get("error", "Import failed"))
+    return result
+
+# Event listing and export read the calendar page by page while the response is
+# being sent, so a year of events streams in constant memory
+EVENT_EXPORT_MAX_DAYS = int(os.getenv("EVENT_EXPORT_MAX_DAYS", "366"))
+
+def _event_range(start: Optional[datetime], end: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """The requested window (local time when no offset is given); 30 days from now by default"""
+    from app.calendarUtils import as_local
+    start = as_local(start or datetime.now(pytz.timezone("Asia/Kolkata")))
+    end = as_local(end or start + timedelta(days=30))
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="end must be after start")
+    if end - start > timedelta(days=EVENT_EXPORT_MAX_DAYS):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"The window can be at most {EVENT_EXPORT_MAX_DAYS} days")
+    return start, end
+
+async def _open_events(start: datetime, end: datetime, fields: Iterable[str], limit: Optional[int]) -> Iterator[Dict[str, Any]]:
+    """
+    Start iter_events and read its first page here, so an unavailable calendar
+    is a 503 rather than a stream that breaks off
+    """
+    from app.calendarUtils import iter_events
+    try:
+        events = iter_events(start, end, list(fields), limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    
+    try:
+        loop = asyncio.get_running_loop()
+        first = await loop.run_in_executor(None, next, events, None)
+    except Exception as e:
+        logger.error(f"Error listing events: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Event listing failed")
+    return itertools.chain([first], events) if first is not None else iter(())
+
+def _logged(chunks: Iterator[str], what: str) -> Iterator[str]:
+    """Pass chunks through, logging a failure that cuts the stream short"""
+    try:
+        yield from chunks
+    except Exception as e:
+        logger.error(f"{what} stopped early: {e}")
+        raise
+
+@app.get("/events")
+async def list_events_endpoint(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                               fields: str = "id,summary,start,end", limit: Optional[int] = None):
+    """
+    Events overlapping [start, end) as newline-delimited JSON, soonest first
+    Only the comma-separated fields are requested from the calendar.
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="limit must be at least 1")
+    from app.eventExport import ndjson_lines
+    start, end = _event_range(start, end)
+    events = await _open_events(start, end, [name.strip() for name in fields.split(",") if name.strip()], limit)
+    # Starlette runs a plain generator in the thread pool, so the page requests don't block the loop
+    return StreamingResponse(_logged(ndjson_lines(events), "Event listing"), media_type="application/x-ndjson")
+
+@app.get("/events.ics")
+async def export_events_ics(start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Events overlapping [start, end) as an iCalendar file"""
+    from app.calendarUtils import CALENDAR_ID
+    from app.eventExport import ICS_FIELDS, ics_calendar
+    start, end = _event_range(start, end)
+    events = await _open_events(start, end, ICS_FIELDS, None)
+    return StreamingResponse(
+        _logged(ics_calendar(events, CALENDAR_ID, "TailorTalk"), "ICS export"),
+        media_type="text/calendar; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="events.ics"'}
+    )
+
+@app.get("/jobs/{job_id}")
+async def booking_job_status(job_id: str):
+    """Progress of a queued booking: queued, running, retrying, succeeded or failed"""
+    from app.calendarUtils import get_booking_job
+    loop = asyncio.get_running_loop()
+    job = await loop.run_in_executor(None, get_booking_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No such booking job")
+    return job
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the agent, LLM and Calendar clients are warm, 503 before"""
+    if not WARMUP_ON_STARTUP:
+        return {"ready": True, "mode": "lazy", "components": readiness}
+    
+    ready = all(component["status"] == "ready" for component in readiness.values())
+    body = {"ready": ready, "components": readiness, "timestamp": datetime.now().isoformat()}
+    if not ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=body)
+    return body
+
+def _component_metrics() -> Iterable[Sample]:
+    """Stats kept by the router, caches, session store and Calendar client pool"""
+    router = get_router_stats()
+    # Outcomes are disjoint (sent_to_llm or fast_path_<intent>), so they sum to the routed messages
+    yield ("tailortalk_router_messages_total", "counter", "Routed chat messages by outcome", ("outcome",),
+           {(outcome,): count for outcome, count in router.items() if outcome not in ("routed", "llm_calls_avoided")})
+    yield ("tailortalk_router_llm_calls_avoided_total", "counter", "Chat messages answered without the LLM", (),
+           {(): router["llm_calls_avoided"]})
+    
+    sessions = session_store.stats()
+    yield ("tailortalk_sessions", "gauge", "Chat sessions held in memory", (), {(): sessions["sessions"]})
+    yield ("tailortalk_session_bytes", "gauge", "Approximate size of the chat sessions in memory", (), {(): sessions["bytes"]})
+    yield ("tailortalk_session_evictions_total", "counter", "Chat sessions dropped by reason", ("reason",),
+           {("capacity",): sessions["evictions"], ("idle",): sessions["expirations"]})
+    
+    # Only report components that have been loaded; scraping shouldn't initialize them
+    agent = sys.modules.get("app.agent")
+    if agent is not None:
+        cache = agent.response_cache.stats()
+        yield ("tailortalk_response_cache_lookups_total", "counter", "Agent response cache lookups by result", ("result",),
+               {("hit",): cache["hits"], ("miss",): cache["misses"]})
+        yield ("tailortalk_response_cache_hit_ratio", "gauge", "Agent response cache hit ratio", (), {(): cache["hit_ratio"]})
+        yield ("tailortalk_response_cache_entries", "gauge", "Agent replies in the response cache", (), {(): cache["size"]})
+    
+    calendar = sys.modules.get("app.calendarUtils")
+    if calendar is not None:
+        index = calendar.busy_index
+        lookups = index.hits + index.misses
+        yield ("tailortalk_busy_index_lookups_total", "counter", "Busy-interval index lookups by result", ("result",),
+               {("hit",): index.hits, ("miss",): index.misses})
+        yield ("tailortalk_busy_index_hit_ratio", "gauge", "Busy-interval index hit ratio", (),
+               {(): index.hits / lookups if lookups else 0.0})
+        reads = calendar.calendar_reads.stats()
+        yield ("tailortalk_single_flight_saved_ratio", "gauge", "Share of Calendar reads served by an identical call already in flight", (),
+               {(): reads["saved_ratio"]})
+        yield ("tailortalk_single_flight_in_flight", "gauge", "Coalesced Calendar reads currently in flight", (), {(): reads["in_flight"]})
+        if calendar.booking_outbox is not None:
+            outbox = calendar.booking_outbox.stats()
+            yield ("tailortalk_booking_outbox_jobs", "gauge", "Booking outbox jobs by status", ("status",),
+                   {(job_status,): count for job_status, count in outbox["jobs"].items()})
+            yield ("tailortalk_booking_outbox_oldest_pending_seconds", "gauge", "Age of the oldest booking not yet delivered", (),
+                   {(): outbox["oldest_pending_seconds"]})
+        if calendar.calendar_pool is not None:
+            pool = calendar.calendar_pool.stats()
+            yield ("tailortalk_calendar_pool_clients", "gauge", "Calendar clients by state", ("state",),
+                   {("in_use",): pool["in_use"], ("created",): pool["created"], ("max",): pool["size"]})
+            yield ("tailortalk_calendar_pool_checkouts_total", "counter", "Calendar client checkouts", (), {(): pool["checkouts"]})
+            yield ("tailortalk_calendar_pool_waits_total", "counter", "Checkouts that had to wait for a client", (), {(): pool["waits"]})
+            yield ("tailortalk_calendar_pool_timeouts_total", "counter", "Checkouts that gave up waiting", (), {(): pool["timeouts"]})
+            yield ("tailortalk_calendar_pool_wait_seconds_total", "counter", "Time spent waiting for a client", (),
+                   {(): pool["total_wait_seconds"]})
+    
+    scheduler = sys.modules.get("app.outboundScheduler")
+    if scheduler is not None:
+        buckets = scheduler.scheduler.stats()
+        yield ("tailortalk_outbound_rate", "gauge", "Current (adaptive) request rate per second of each outbound bucket", ("bucket",),
+               {(key,): bucket["rate"] for key, bucket in buckets.items()})
+        yield ("tailortalk_outbound_tokens", "gauge", "Tokens available in each outbound bucket", ("bucket",),
+               {(key,): bucket["tokens"] for key, bucket in buckets.items()})
+        yield ("tailortalk_outbound_throttled_total", "counter", "Outbound calls that had to wait for a token", ("bucket",),
+               {(key,): bucket["throttled"] for key, bucket in buckets.items()})
+        yield ("tailortalk_outbound_rate_cuts_total", "counter", "Rate halvings after rate-limit answers", ("bucket",),
+               {(key,): bucket["penalties"] for key, bucket in buckets.items()})
+    
+    async_calendar = sys.modules.get("app.asyncCalendarUtils")
+    if async_calendar is not None and async_calendar.async_backend is not None:
+        stats = async_calendar.async_backend.stats()
+        if "in_flight" in stats:
+            yield ("tailortalk_calendar_async_requests_in_flight", "gauge", "Async Calendar API requests awaiting a response", (),
+                   {(): stats["in_flight"]})
+
+REGISTRY.add_collector(_component_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of latency histograms, error counts and cache stats"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+def _require_profile_token(request: Request):
+    if not profiling.is_authorized(request.headers):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling is not enabled for this client")
+
+@app.get("/profiles")
+async def list_profiles(request: Request):
+    """Stored request profiles, newest first (needs X-Profile-Token)"""
+    _require_profile_token(request)
+    return {"profiles": profiling.list_profiles()}
+
+@app.get("/profiles/{name}")
+async def download_profile(name: str, request: Request):
+    """Download one profile: .pstats for pstats/snakeviz, .tracemalloc for tracemalloc.Snapshot.load"""
+    _require_profile_token(request)
+    path = profiling.PROFILE_DIR / name
+    if not profiling.PROFILE_FILE_PATTERN.match(name) or not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No such profile")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -268,8 +881,22 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/chat": "Chat with the AI assistant",
-            "/book_meeting": "Book a meeting directly",
+            "/chat/stream": "Chat with streamed tokens (Server-Sent Events)",
+            "/sessions/{session_id}": "Delete a chat session",
+            "/book_meeting": "Queue a meeting booking (202 with a job id)",
+            "/jobs/{job_id}": "Status of a queued booking",
+            "/import": "Import meetings from a CSV or ICS file",
+            "/events": "Stream events in a date range (NDJSON, field-masked)",
+            "/events.ics": "Export events in a date range as iCalendar",
+            "/availability": "Check many time slots at once",
+            "/availability/attendees": "Common free windows of all attendees",
+            "/free_slots": "Find the nearest free slots within working hours",
+            "/book_meetings/bulk": "Book many meetings in batched requests",
+            "/cancel/bulk": "Cancel many events in batched requests",
             "/health": "Health check",
+            "/ready": "Readiness probe (components warmed up)",
+            "/metrics": "Prometheus metrics",
+            "/profiles": "Stored request profiles (needs X-Profile-Token)",
             "/docs": "API documentation"
         }
     }
\ No newline at end of file
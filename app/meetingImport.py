@@ -0,0 +1,273 @@
+# Meeting import: incremental CSV / ICS parsing and conflict checks against one busy timeline
+import bisect
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pytz
+from dateutil import parser as date_parser
+
+from app.busyIndex import Interval, to_utc
+
+DEFAULT_TIMEZONE = "Asia/Kolkata"
+DEFAULT_DURATION_MINUTES = 30
+
+# Accepted CSV headers (case-insensitive) and the field each one fills
+CSV_COLUMNS = {
+    "summary": "summary", "title": "summary", "subject": "summary",
+    "start": "start", "start_time": "start", "starts": "start",
+    "end": "end", "end_time": "end", "ends": "end",
+    "duration": "duration", "duration_minutes": "duration",
+    "description": "description", "agenda": "description", "notes": "description",
+    "attendees": "attendees", "participants": "attendees", "emails": "attendees",
+}
+_EMAIL_SPLIT = re.compile(r"[;,\s]+")
+_ICS_ESCAPE = re.compile(r"\\(.)")
+_ICS_UNESCAPED = {"n": "\n", "N": "\n"}
+_ICS_DURATION = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+@dataclass
+class ImportRow:
+    """One meeting read from an import file, or why it couldn't be read"""
+    row: int  # 1-based position of the meeting in the file
+    line: int  # Line the meeting starts on
+    summary: str = "Meeting"
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    description: Optional[str] = None
+    attendees: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def booking(self) -> Dict[str, Any]:
+        """book_event's keyword arguments"""
+        return {
+            "summary": self.summary,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "description": self.description,
+            "attendees": self.attendees,
+        }
+
+
+def _localize(value: datetime, tz: str) -> datetime:
+    if value.tzinfo is not None:
+        return value
+    return pytz.timezone(tz).localize(value)
+
+
+def _finish(row: ImportRow, duration: Optional[timedelta] = None) -> ImportRow:
+    """Fill the end from the duration and check the times"""
+    if row.error is None:
+        if row.start_time is None:
+            row.error = "Missing start time"
+        elif row.end_time is None:
+            row.end_time = row.start_time + (duration or timedelta(minutes=DEFAULT_DURATION_MINUTES))
+        if row.error is None and row.end_time <= row.start_time:
+            row.error = "The meeting must end after it starts"
+    return row
+
+
+def _emails(value: str) -> List[str]:
+    emails = []
+    for part in _EMAIL_SPLIT.split(value or ""):
+        part = part.strip().removeprefix("mailto:").removeprefix("MAILTO:")
+        if part:
+            emails.append(part)
+    return emails
+
+
+def parse_csv(lines: Iterable[str], tz: str = DEFAULT_TIMEZONE) -> Iterator[ImportRow]:
+    """
+    Meetings from CSV lines, one at a time. Needs a header row with a start
+    column and optionally summary, end or duration (minutes), description and
+    attendees (separated by ';', ',' or spaces). Times without an offset are
+    local to tz.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [CSV_COLUMNS.get(name.strip().lower().replace(" ", "_")) for name in header]
+    if "start" not in columns:
+        yield ImportRow(row=0, line=1, error="The header needs a 'start' column")
+        return
+
+    for number, values in enumerate(reader, start=1):
+        if not any(value.strip() for value in values):
+            continue
+        fields = {column: value.strip() for column, value in zip(columns, values) if column}
+        row = ImportRow(row=number, line=reader.line_num, summary=fields.get("summary") or "Meeting",
+                        description=fields.get("description") or None, attendees=_emails(fields.get("attendees", "")))
+        duration = None
+        try:
+            row.start_time = _localize(date_parser.parse(fields["start"]), tz) if fields.get("start") else None
+            if fields.get("end"):
+                row.end_time = _localize(date_parser.parse(fields["end"]), tz)
+            elif fields.get("duration"):
+                duration = timedelta(minutes=float(fields["duration"]))
+        except (ValueError, OverflowError) as e:
+            row.error = f"Unreadable time or duration: {e}"
+        yield _finish(row, duration)
+
+
+def _unfold(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """Logical ICS content lines (folded continuations joined) with their first line number"""
+    current, start = None, 0
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current is not None:
+        yield start, current
+
+
+def _ics_text(value: str) -> str:
+    # One pass, so an escaped backslash followed by 'n' stays a backslash and an 'n'
+    return _ICS_ESCAPE.sub(lambda match: _ICS_UNESCAPED.get(match.group(1), match.group(1)), value)
+
+
+def _ics_time(value: str, params: Dict[str, str], tz: str) -> datetime:
+    if params.get("VALUE") == "DATE" or "T" not in value:
+        raise ValueError("All-day events can't be imported")
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=pytz.utc)
+    naive = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    zone = params.get("TZID", tz).strip('"')
+    try:
+        return pytz.timezone(zone).localize(naive)
+    except pytz.UnknownTimeZoneError:
+        return pytz.timezone(tz).localize(naive)
+
+
+def _ics_duration(value: str) -> timedelta:
+    match = _ICS_DURATION.match(value)
+    if not match:
+        raise ValueError(f"Bad DURATION '{value}'")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                         minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -duration if sign == "-" else duration
+
+
+def parse_ics(lines: Iterable[str], tz: str = DEFAULT_TIMEZONE) -> Iterator[ImportRow]:
+    """
+    Meetings from the VEVENTs of iCalendar lines, one at a time. Only one
+    event is held in memory. All-day and recurring events are reported as
+    errors rather than guessed at; cancelled events are skipped.
+    """
+    row: Optional[ImportRow] = None
+    duration: Optional[timedelta] = None
+    cancelled = False
+    number = 0
+    for line_number, content in _unfold(lines):
+        name_and_params, _, value = content.partition(":")
+        name, *param_list = name_and_params.split(";")
+        name = name.upper()
+        params = dict(param.partition("=")[::2] for param in param_list)
+
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            number += 1
+            row, duration, cancelled = ImportRow(row=number, line=line_number), None, False
+            continue
+        if row is None:
+            continue
+        if name == "END" and value.upper() == "VEVENT":
+            if not cancelled:
+                yield _finish(row, duration)
+            row = None
+            continue
+
+        try:
+            if name == "SUMMARY":
+                row.summary = _ics_text(value) or "Meeting"
+            elif name == "DESCRIPTION":
+                row.description = _ics_text(value) or None
+            elif name == "ATTENDEE":
+                row.attendees.extend(_emails(value))
+            elif name == "DTSTART":
+                row.start_time = _ics_time(value, params, tz)
+            elif name == "DTEND":
+                row.end_time = _ics_time(value, params, tz)
+            elif name == "DURATION":
+                duration = _ics_duration(value)
+            elif name == "STATUS":
+                cancelled = value.upper() == "CANCELLED"
+            elif name in ("RRULE", "RDATE") and row.error is None:
+                row.error = "Recurring events can't be imported"
+        except ValueError as e:
+            if row.error is None:
+                row.error = str(e)
+
+
+def sniff_format(first_line: str) -> str:
+    """'ics' for an iCalendar file, 'csv' otherwise"""
+    return "ics" if first_line.lstrip("\ufeff").strip().upper().startswith("BEGIN:VCALENDAR") else "csv"
+
+
+def format_for_content_type(content_type: Optional[str]) -> Optional[str]:
+    """'ics' or 'csv' from a Content-Type header, None when it doesn't say"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return {"text/calendar": "ics", "text/csv": "csv", "application/csv": "csv"}.get(media_type)
+
+
+def read_import_file(file: BinaryIO, fmt: Optional[str] = None, tz: str = DEFAULT_TIMEZONE) -> Iterator[ImportRow]:
+    """
+    Meetings from a seekable binary UTF-8 file (e.g. the spooled request body),
+    read from the start a line at a time. The format is sniffed when not given.
+    """
+    file.seek(0)
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if fmt is None:
+            fmt = sniff_format(text.readline())
+            text.seek(0)
+        parse = parse_ics if fmt == "ics" else parse_csv
+        yield from parse(text, tz)
+    finally:
+        # Leave the file open for the next pass
+        text.detach()
+
+
+class BusyTimeline:
+    """
+    Sorted, non-overlapping busy intervals. Starts from the calendar's merged
+    busy time for the import window; each accepted meeting is added, so later
+    rows of the same file are also checked against earlier ones.
+    """
+
+    def __init__(self, busy: List[Interval]):
+        self._starts = [start for start, _ in busy]
+        self._ends = [end for _, end in busy]
+
+    def conflict(self, start: datetime, end: datetime) -> Optional[Interval]:
+        """The busy interval [start, end) overlaps, or None"""
+        start, end = to_utc(start), to_utc(end)
+        i = bisect.bisect_right(self._starts, start)
+        if i > 0 and self._ends[i - 1] > start:
+            return self._starts[i - 1], self._ends[i - 1]
+        if i < len(self._starts) and self._starts[i] < end:
+            return self._starts[i], self._ends[i]
+        return None
+
+    def add(self, start: datetime, end: datetime):
+        """Add a free interval (check conflict() first)"""
+        start, end = to_utc(start), to_utc(end)
+        i = bisect.bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+
+    def remove(self, start: datetime, end: datetime):
+        """Take back an interval added with add() (its write failed)"""
+        start, end = to_utc(start), to_utc(end)
+        i = bisect.bisect_left(self._starts, start)
+        if i < len(self._starts) and self._starts[i] == start and self._ends[i] == end:
+            del self._starts[i]
+            del self._ends[i]
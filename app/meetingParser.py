@@ -0,0 +1,145 @@
+# Shared meeting parser used by the API and the agent tools
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+import re
+from time import perf_counter
+from typing import List, Optional
+
+from app.metrics import PARSER_SECONDS
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+DEFAULT_DURATION_MINUTES = 30
+
+# Words that end a free-text agenda/topic capture
+_TOPIC_END = r"(?:\s+(?:with|for|on|at|tomorrow|next\s+\w+day|in\s+\d+\s+days?)\b|\s*$)"
+
+# One combined pattern for every field. The input is scanned once with
+# finditer(); free-text captures (agenda/topic) sit inside lookaheads so they
+# don't consume the date, time or attendees that follow them.
+_TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<email>[\w.-]+@[\w.-]+\.\w+)
+    | \b(?P<iso_date>\d{4}-\d{2}-\d{2})\b
+    | \b(?P<tomorrow>tomorrow)\b
+    | \bnext\s+(?P<weekday>monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b
+    | \bin\s+(?P<in_days>\d+)\s+days?\b
+    | \b(?P<duration>\d+)[\s-]*(?P<duration_unit>minute|min|hour|hr)s?\b
+    | \b(?P<hour12>\d{1,2})(?::(?P<minute12>\d{2}))?\s*(?P<meridiem>am|pm)\b
+    | \b(?P<hour24>\d{1,2}):(?P<minute24>\d{2})\b
+    | \b(?:meeting|call|appointment)\s+(?:about|regarding|titled?)\s+['"](?P<quoted_title>[^'"]*)['"]
+    | \btitled?\s+['"](?P<title>[^'"]*)['"]
+    | \b(?:agenda|description)\b\s*[:\-]?\s*(?=(?P<agenda>.*?)""" + _TOPIC_END + r""")
+    | \b(?:about|regarding)\s+(?=(?P<topic>.*?)""" + _TOPIC_END + r""")
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+@dataclass
+class ParsedMeeting:
+    """Typed result of parsing a meeting request; fields are None when not mentioned"""
+    date: Optional[date] = None
+    time: Optional[time] = None
+    duration_minutes: int = DEFAULT_DURATION_MINUTES
+    attendees: List[str] = field(default_factory=list)
+    title: Optional[str] = None
+    agenda: Optional[str] = None
+
+    @property
+    def is_complete(self) -> bool:
+        """True when the request names a date, a time and at least one attendee"""
+        return self.date is not None and self.time is not None and bool(self.attendees)
+
+    @property
+    def duration(self) -> timedelta:
+        return timedelta(minutes=self.duration_minutes)
+
+
+def _resolve_date(match: re.Match, now: datetime) -> Optional[date]:
+    """Turn a date token into an absolute date relative to now"""
+    if match.group('iso_date'):
+        try:
+            return datetime.strptime(match.group('iso_date'), '%Y-%m-%d').date()
+        except ValueError:
+            return None
+    if match.group('tomorrow'):
+        return (now + timedelta(days=1)).date()
+    if match.group('weekday'):
+        target_day = WEEKDAYS.index(match.group('weekday').lower())
+        days_ahead = (target_day - now.weekday() + 7) % 7
+        if days_ahead == 0:
+            days_ahead = 7
+        return (now + timedelta(days=days_ahead)).date()
+    return (now + timedelta(days=int(match.group('in_days')))).date()
+
+
+def _resolve_time(match: re.Match) -> Optional[time]:
+    """Turn a time token into a 24-hour time, or None if it is out of range"""
+    if match.group('hour12'):
+        hour = int(match.group('hour12'))
+        minute = int(match.group('minute12') or 0)
+        if not 1 <= hour <= 12:
+            return None
+        if match.group('meridiem').lower() == 'pm' and hour < 12:
+            hour += 12
+        elif match.group('meridiem').lower() == 'am' and hour == 12:
+            hour = 0
+    else:
+        hour = int(match.group('hour24'))
+        minute = int(match.group('minute24'))
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+def _clean(text: Optional[str]) -> Optional[str]:
+    text = (text or '').strip()
+    return text or None
+
+
+def parse_meeting(user_input: str, now: Optional[datetime] = None) -> ParsedMeeting:
+    """
+    Parse date, time, duration, attendees, title and agenda in a single pass.
+    When a field is mentioned more than once, the first occurrence wins.
+    """
+    started = perf_counter()
+    try:
+        return _parse_meeting(user_input, now)
+    finally:
+        PARSER_SECONDS.observe(perf_counter() - started)
+
+
+def _parse_meeting(user_input: str, now: Optional[datetime]) -> ParsedMeeting:
+    now = now or datetime.now()
+    result = ParsedMeeting()
+    duration_found = False
+    quoted_title = title = agenda = topic = None
+
+    for match in _TOKEN_PATTERN.finditer(user_input):
+        kind = match.lastgroup
+        if kind == 'email':
+            result.attendees.append(match.group('email'))
+        elif kind in ('iso_date', 'tomorrow', 'weekday', 'in_days'):
+            if result.date is None:
+                result.date = _resolve_date(match, now)
+        elif kind in ('meridiem', 'minute24'):
+            if result.time is None:
+                result.time = _resolve_time(match)
+        elif kind == 'duration_unit':
+            if not duration_found:
+                value = int(match.group('duration'))
+                unit = match.group('duration_unit').lower()
+                result.duration_minutes = value * 60 if unit in ('hour', 'hr') else value
+                duration_found = True
+        elif kind == 'quoted_title':
+            quoted_title = quoted_title or _clean(match.group('quoted_title'))
+        elif kind == 'title':
+            title = title or _clean(match.group('title'))
+        elif kind == 'agenda':
+            agenda = agenda or _clean(match.group('agenda'))
+        elif kind == 'topic':
+            topic = topic or _clean(match.group('topic'))
+
+    result.title = quoted_title or title or topic
+    result.agenda = agenda or topic or quoted_title or title
+    return result
@@ -0,0 +1,188 @@
+# Prometheus-format metrics: counters and latency histograms for each stage of a request
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Seconds; spans parser microseconds up to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count, optionally split by labels"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values (seconds for latencies)"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observe the wall time of the with-block, also when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# (name, kind, help, label names, {label values: value}) read from a component at scrape time
+Sample = Tuple[str, str, str, Tuple[str, ...], Dict[LabelValues, float]]
+
+
+class MetricsRegistry:
+    """Holds the metrics defined below plus collectors that report component stats when scraped"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            for name, kind, documentation, labelnames, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in samples.items():
+                    lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "tailortalk_http_request_duration_seconds", "API request latency by route", ("method", "path", "status")
+))
+PARSER_SECONDS = REGISTRY.register(Histogram(
+    "tailortalk_parser_duration_seconds", "Time to parse one message for meeting details",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+))
+CALENDAR_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "tailortalk_calendar_request_duration_seconds", "Google Calendar API call latency by operation", ("operation",)
+))
+CALENDAR_ERRORS = REGISTRY.register(Counter(
+    "tailortalk_calendar_errors_total", "Failed Google Calendar API calls by operation", ("operation",)
+))
+LLM_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "tailortalk_llm_request_duration_seconds", "Latency of one LLM call (Groq)"
+))
+LLM_ERRORS = REGISTRY.register(Counter(
+    "tailortalk_llm_errors_total", "Failed LLM calls"
+))
+AGENT_RUN_SECONDS = REGISTRY.register(Histogram(
+    "tailortalk_agent_run_duration_seconds", "Time for one full agent run, tools included"
+))
+AGENT_ITERATIONS = REGISTRY.register(Histogram(
+    "tailortalk_agent_iterations", "Tool-using iterations per agent run", buckets=(0, 1, 2, 3, 4, 5, 10)
+))
+OUTBOUND_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "tailortalk_outbound_wait_seconds", "Time an upstream call waited for rate-limit tokens", ("upstream", "lane"),
+    buckets=(0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+))
+OUTBOUND_RETRIES = REGISTRY.register(Counter(
+    "tailortalk_outbound_retries_total", "Upstream calls retried after a transient failure", ("upstream", "reason")
+))
+SINGLE_FLIGHT_CALLS = REGISTRY.register(Counter(
+    "tailortalk_single_flight_calls_total",
+    "Coalesced reads: 'executed' went upstream, 'shared' reused an identical in-flight call",
+    ("component", "operation", "result")
+))
+
+
+def observe_calendar(operation: str, request):
+    """Execute a Google API request, recording its latency and any failure under operation"""
+    with CALENDAR_REQUEST_SECONDS.time(operation=operation):
+        try:
+            return request.execute()
+        except Exception:
+            CALENDAR_ERRORS.inc(operation=operation)
+            raise
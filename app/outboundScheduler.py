@@ -0,0 +1,314 @@
+# Outbound request scheduling: token buckets per upstream and operation, priority lanes, jittered backoff
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.metrics import OUTBOUND_RETRIES, OUTBOUND_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+# "<upstream>[.<operation>]=<requests per second>:<burst>", comma separated. An
+# operation entry adds its own bucket on top of the upstream's shared one.
+OUTBOUND_RATE_LIMITS = os.getenv(
+    "OUTBOUND_RATE_LIMITS",
+    "calendar=10:20,calendar.insert=5:10,calendar.delete=5:10,groq=0.5:4"
+)
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "4"))
+OUTBOUND_BACKOFF_BASE_SECONDS = float(os.getenv("OUTBOUND_BACKOFF_BASE_SECONDS", "0.5"))
+OUTBOUND_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOUND_BACKOFF_MAX_SECONDS", "30"))
+OUTBOUND_INTERACTIVE_RESERVE = float(os.getenv("OUTBOUND_INTERACTIVE_RESERVE", "0.25"))  # Share of each burst bulk work leaves alone
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")  # Google answers these with 403
+NETWORK_ERRORS = ("TransportError", "APIConnectionError", "APITimeoutError", "ServerNotFoundError")
+
+_lane: contextvars.ContextVar[str] = contextvars.ContextVar("outbound_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def outbound_lane(lane: str) -> Iterator[None]:
+    """Send the upstream calls made inside the with-block in this lane"""
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse OUTBOUND_RATE_LIMITS into {key: (rate per second, burst)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[key.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+def classify_error(error: BaseException) -> Optional[Tuple[str, Optional[float]]]:
+    """
+    (reason, retry-after seconds or None) when an upstream error is worth retrying,
+    None otherwise. Works on googleapiclient, httpx-based Calendar and Groq errors
+    without importing them.
+    """
+    response = getattr(error, "response", None)
+    status = (
+        getattr(error, "status_code", None)
+        or getattr(error, "status", None)
+        or getattr(getattr(error, "resp", None), "status", None)
+        or getattr(response, "status_code", None)
+    )
+    headers = getattr(error, "resp", None) or getattr(response, "headers", None) or {}
+    try:
+        retry_after = float(headers.get("retry-after")) if headers.get("retry-after") else None
+    except (TypeError, ValueError, AttributeError):
+        retry_after = None
+    retry_after = getattr(error, "retry_after", None) or retry_after
+
+    try:
+        status = int(status) if status is not None else None
+    except (TypeError, ValueError):
+        status = None
+    if status == 429 or (status == 403 and any(reason in str(error) for reason in RATE_LIMIT_REASONS)):
+        return "rate_limited", retry_after
+    if status in RETRYABLE_STATUSES:
+        return "server_error", retry_after
+    if isinstance(error, ConnectionError) or {cls.__name__ for cls in type(error).__mro__} & set(NETWORK_ERRORS):
+        return "network", None
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` per second up to `burst`, shared by all threads
+    and the event loop. Interactive callers go first: bulk callers wait while an
+    interactive caller is waiting and never dip into the last `reserve` tokens.
+    The rate adapts: it halves on a rate-limit answer and climbs back by 5% of
+    the configured rate per success.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, reserve_fraction: float = 0.25, min_rate_fraction: float = 0.1):
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = rate * min_rate_fraction
+        self.burst = burst
+        self.reserve = burst * reserve_fraction
+        self.tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._waiting = {lane: 0 for lane in LANES}
+        self.throttled = 0
+        self.penalties = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def max_piece(self, lane: str = INTERACTIVE) -> float:
+        """Largest cost one try_take in this lane can be granted without borrowing"""
+        usable = self.burst - (0.0 if lane == INTERACTIVE else self.reserve)
+        return usable if usable >= 1 else self.burst
+
+    def _pieces(self, lane: str, cost: float) -> List[float]:
+        """Split a cost (a big batch) into takes that each fit the bucket"""
+        piece = self.max_piece(lane)
+        pieces = [piece] * int(cost // piece)
+        if cost % piece:
+            pieces.append(cost % piece)
+        return pieces or [cost]
+
+    def try_take(self, lane: str = INTERACTIVE, cost: float = 1) -> float:
+        """Take cost tokens and return 0, or return the seconds to wait before trying again"""
+        with self._lock:
+            self._refill(time.monotonic())
+            floor = 0.0 if lane == INTERACTIVE else self.reserve
+            if lane != INTERACTIVE and self._waiting[INTERACTIVE]:
+                return max(1.0 / self.rate, 0.01)
+            # Tokens never exceed the burst, so neither may the level waited for;
+            # a cost above what's usable borrows against future tokens
+            needed = min(floor + cost, self.burst)
+            if self.tokens >= needed:
+                self.tokens -= cost
+                return 0.0
+            return (needed - self.tokens) / self.rate
+
+    def _enter(self, lane: str):
+        with self._lock:
+            self._waiting[lane] += 1
+            self.throttled += 1
+
+    def _leave(self, lane: str):
+        with self._lock:
+            self._waiting[lane] -= 1
+
+    def acquire(self, lane: str = INTERACTIVE, cost: float = 1) -> float:
+        """Block until the tokens are taken, in bucket-sized pieces; returns the seconds waited"""
+        started = time.monotonic()
+        for piece in self._pieces(lane, cost):
+            wait = self.try_take(lane, piece)
+            if not wait:
+                continue
+            self._enter(lane)
+            try:
+                while wait:
+                    time.sleep(wait)
+                    wait = self.try_take(lane, piece)
+            finally:
+                self._leave(lane)
+        return time.monotonic() - started
+
+    async def acquire_async(self, lane: str = INTERACTIVE, cost: float = 1) -> float:
+        """acquire() for the event loop"""
+        started = time.monotonic()
+        for piece in self._pieces(lane, cost):
+            wait = self.try_take(lane, piece)
+            if not wait:
+                continue
+            self._enter(lane)
+            try:
+                while wait:
+                    await asyncio.sleep(wait)
+                    wait = self.try_take(lane, piece)
+            finally:
+                self._leave(lane)
+        return time.monotonic() - started
+
+    def penalize(self):
+        """The upstream said slow down: halve the rate and drop the saved-up tokens"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            self.penalties += 1
+
+    def reward(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rate": self.rate,
+                "max_rate": self.max_rate,
+                "burst": self.burst,
+                "tokens": self.tokens,
+                "waiting": dict(self._waiting),
+                "throttled": self.throttled,
+                "penalties": self.penalties,
+            }
+
+
+class OutboundScheduler:
+    """
+    Single gate for calls to rate-limited upstreams (Google Calendar, Groq).
+    call()/acall() take a token from the upstream's bucket and from the
+    operation's bucket when one is configured, in the caller's lane (see
+    outbound_lane), then run the call. Rate-limit, 5xx and network errors are
+    retried up to max_retries times with full-jitter exponential backoff,
+    honouring Retry-After; anything else is raised at once.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], max_retries: int = 4, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, reserve_fraction: float = 0.25):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.buckets = {
+            key: TokenBucket(key, rate, burst, reserve_fraction)
+            for key, (rate, burst) in limits.items()
+        }
+
+    def _buckets_for(self, upstream: str, operation: str) -> List[TokenBucket]:
+        return [bucket for bucket in (self.buckets.get(f"{upstream}.{operation}"), self.buckets.get(upstream)) if bucket]
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff for a 0-based retry attempt, at least retry_after"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def _retry_delay(self, upstream: str, operation: str, buckets: List[TokenBucket], attempt: int,
+                     error: BaseException) -> Optional[float]:
+        """Seconds to wait before retrying after error, or None to give up"""
+        verdict = classify_error(error)
+        if verdict is None or attempt >= self.max_retries:
+            return None
+        reason, retry_after = verdict
+        if reason == "rate_limited":
+            for bucket in buckets:
+                bucket.penalize()
+        OUTBOUND_RETRIES.inc(upstream=upstream, reason=reason)
+        delay = self.backoff_delay(attempt, retry_after)
+        logger.warning(f"⏳ {upstream}.{operation} {reason} ({error}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+    def call(self, upstream: str, operation: str, fn: Callable[..., Any], *args, cost: float = 1, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) under the upstream's rate limits, retrying transient failures"""
+        buckets = self._buckets_for(upstream, operation)
+        lane = current_lane()
+        attempt = 0
+        while True:
+            waited = sum(bucket.acquire(lane, cost) for bucket in buckets)
+            OUTBOUND_WAIT_SECONDS.observe(waited, upstream=upstream, lane=lane)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(upstream, operation, buckets, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            for bucket in buckets:
+                bucket.reward()
+            return result
+
+    async def acall(self, upstream: str, operation: str, fn: Callable[..., Awaitable[Any]], *args, cost: float = 1, **kwargs) -> Any:
+        """call() for coroutine functions; waits without blocking the event loop"""
+        buckets = self._buckets_for(upstream, operation)
+        lane = current_lane()
+        attempt = 0
+        while True:
+            waited = 0.0
+            for bucket in buckets:
+                waited += await bucket.acquire_async(lane, cost)
+            OUTBOUND_WAIT_SECONDS.observe(waited, upstream=upstream, lane=lane)
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(upstream, operation, buckets, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            for bucket in buckets:
+                bucket.reward()
+            return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: bucket.stats() for key, bucket in self.buckets.items()}
+
+
+scheduler = OutboundScheduler(
+    parse_rate_limits(OUTBOUND_RATE_LIMITS),
+    max_retries=OUTBOUND_MAX_RETRIES,
+    backoff_base=OUTBOUND_BACKOFF_BASE_SECONDS,
+    backoff_max=OUTBOUND_BACKOFF_MAX_SECONDS,
+    reserve_fraction=OUTBOUND_INTERACTIVE_RESERVE
+)
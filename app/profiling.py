@@ -0,0 +1,171 @@
+# Opt-in per-request profiling: cProfile (pstats) or tracemalloc snapshots of single requests
+import contextvars
+import cProfile
+import functools
+import hmac
+import logging
+import os
+import pstats
+import re
+import threading
+import tracemalloc
+import uuid
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "memory")
+PROFILE_MODE = os.getenv("PROFILE_MODE", "").lower()  # Profile every request in this mode; leave unset in production
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")  # Lets a request ask for a profile with X-Profile/X-Profile-Token
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "10"))
+
+PROFILE_FILE_PATTERN = re.compile(r"^[0-9a-f]{12}\.(?:pstats|tracemalloc)$")
+
+_current: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("request_profile", default=None)
+
+# tracemalloc is process-wide; it runs while at least one memory profile is open
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def requested_mode(headers: Mapping[str, str]) -> Optional[str]:
+    """Profile mode for a request: from X-Profile when X-Profile-Token matches, else PROFILE_MODE"""
+    mode = headers.get("x-profile", "").lower()
+    if mode in PROFILE_MODES and is_authorized(headers):
+        return mode
+    return PROFILE_MODE if PROFILE_MODE in PROFILE_MODES else None
+
+
+def is_authorized(headers: Mapping[str, str]) -> bool:
+    """True when PROFILE_TOKEN is configured and the request carries it"""
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(headers.get("x-profile-token", ""), PROFILE_TOKEN)
+
+
+class RequestProfile:
+    """
+    Profile of one request. In 'cpu' mode the work the request hands to worker
+    threads (see profiled()) is traced with cProfile and merged into one pstats
+    file; code on the event loop thread is not traced because other requests
+    share it. In 'memory' mode a tracemalloc snapshot is written when the
+    request ends; it covers the whole process, so profile a quiet instance.
+    """
+
+    def __init__(self, mode: str, label: str):
+        self.mode = mode
+        self.label = label
+        self.id = uuid.uuid4().hex[:12]
+        self.filename = f"{self.id}.{'pstats' if mode == 'cpu' else 'tracemalloc'}"
+        self._started = perf_counter()
+        self._lock = threading.Lock()
+        self._stats: Optional[pstats.Stats] = None
+        self._finished = False
+        if mode == "memory":
+            _start_tracemalloc()
+
+    def add(self, profiler: cProfile.Profile):
+        """Merge the profile of one worker-thread call"""
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+
+    def finish(self) -> Optional[Path]:
+        """Write the profile to PROFILE_DIR and return its path (once; later calls return None)"""
+        with self._lock:
+            if self._finished:
+                return None
+            self._finished = True
+        elapsed = perf_counter() - self._started
+        path = PROFILE_DIR / self.filename
+        try:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            if self.mode == "cpu":
+                if self._stats is None:
+                    logger.info(f"🔬 No worker-thread work to profile for {self.label}")
+                    return None
+                self._stats.dump_stats(path)
+            else:
+                snapshot = tracemalloc.take_snapshot().filter_traces([
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+                ])
+                snapshot.dump(str(path))
+            logger.info(f"🔬 Profiled {self.label} ({self.mode}, {elapsed * 1000:.0f} ms) -> {path}")
+            _prune()
+            return path
+        finally:
+            if self.mode == "memory":
+                _stop_tracemalloc()
+
+
+def begin(mode: str, label: str) -> RequestProfile:
+    """Start profiling the current request; worker calls wrapped with profiled() join it"""
+    profile = RequestProfile(mode, label)
+    _current.set(profile)
+    return profile
+
+
+def profiled(fn: Callable) -> Callable:
+    """
+    Wrap a function before handing it to run_in_executor so that, when the
+    calling request is being CPU-profiled, the call is traced on its worker
+    thread. Returns fn unchanged otherwise.
+    """
+    profile = _current.get()
+    if profile is None or profile.mode != "cpu":
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) owns this thread
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profile.add(profiler)
+    return run
+
+
+def list_profiles() -> List[str]:
+    if not PROFILE_DIR.is_dir():
+        return []
+    files = [path for path in PROFILE_DIR.iterdir() if PROFILE_FILE_PATTERN.match(path.name)]
+    return [path.name for path in sorted(files, key=lambda path: path.stat().st_mtime, reverse=True)]
+
+
+def _prune():
+    for name in list_profiles()[PROFILE_KEEP:]:
+        try:
+            (PROFILE_DIR / name).unlink()
+        except OSError:
+            pass
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            # Leave tracing alone if it was started outside (e.g. PYTHONTRACEMALLOC)
+            tracemalloc.stop()
+            _tracemalloc_owned = False
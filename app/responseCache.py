@@ -0,0 +1,82 @@
+# LRU + TTL cache of agent replies
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?]+$")
+
+
+def normalize_input(user_input: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation"""
+    return _TRAILING_PUNCTUATION.sub("", _WHITESPACE.sub(" ", user_input.strip().lower()))
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache with a per-entry TTL. Keys combine the normalized input,
+    a hash of the recent history and the calendar state version, so a change to
+    the calendar makes every earlier entry unreachable.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 300.0, history_messages: int = 4):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.history_messages = history_messages
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def make_key(self, user_input: str, chat_history: List[Tuple[str, str]], state_version: Any) -> str:
+        recent = [list(turn) for turn in (chat_history or [])[-self.history_messages:]] if self.history_messages else []
+        history_hash = hashlib.sha256(json.dumps(recent, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+        return f"{state_version}:{history_hash}:{normalize_input(user_input)}"
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            stored_at, value = entry
+            if now - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
@@ -0,0 +1,157 @@
+# Server-side chat sessions, so clients only send a session id and the new message
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.conversationMemory import ConversationMemory
+
+
+class Session:
+    """One conversation: its bounded memory plus bookkeeping for eviction"""
+
+    __slots__ = ("session_id", "memory", "updated_at", "last_access", "size")
+
+    def __init__(self, session_id: str, memory: Optional[ConversationMemory] = None, updated_at: float = 0.0):
+        self.session_id = session_id
+        self.memory = memory or ConversationMemory()
+        self.updated_at = updated_at
+        self.last_access = time.time()
+        self.size = self.memory.size_bytes()
+
+    def history(self) -> List[Tuple[str, str]]:
+        return self.memory.messages()
+
+    def record(self, user_input: str, reply: str):
+        self.memory.add("user", user_input)
+        self.memory.add("assistant", reply)
+
+
+class SessionStore:
+    """
+    In-memory LRU of sessions, evicted after `idle_seconds` without use or when
+    `max_sessions` / `max_bytes` is exceeded. With a `path`, sessions are also
+    written to SQLite (WAL) so several API workers share them and they survive
+    restarts; the in-memory copy is then only used while it is the newest one.
+    """
+
+    def __init__(self, max_sessions: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 idle_seconds: float = 1800.0, path: Optional[str] = None):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._bytes = 0
+        self._created = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, updated_at REAL NOT NULL, memory TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        self._db_lock = threading.Lock()
+
+    def get_or_create(self, session_id: Optional[str] = None) -> Session:
+        """Return the session for session_id, starting a new one if it is unknown or expired"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id) if session_id else None
+
+        if self._conn is not None and session_id:
+            stored = self._load(session_id, now)
+            if stored is not None and (session is None or stored.updated_at > session.updated_at):
+                session = stored
+
+        if session is None:
+            # Never adopt the caller's id: only ids this store issued are honoured, so a
+            # guessed id can't be used to plant or read someone else's session
+            session = Session(uuid.uuid4().hex)
+            with self._lock:
+                self._created += 1
+
+        session.last_access = now
+        self._remember(session)
+        return session
+
+    def save(self, session: Session):
+        """Store a session after its memory changed"""
+        session.updated_at = time.time()
+        session.last_access = session.updated_at
+        self._remember(session, session.memory.size_bytes())
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (id, updated_at, memory) VALUES (?, ?, ?)",
+                    (session.session_id, session.updated_at, json.dumps(session.memory.to_dict())),
+                )
+                self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (session.updated_at - self.idle_seconds,))
+                self._conn.commit()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._bytes -= session.size
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                self._conn.commit()
+
+    def _load(self, session_id: str, now: float) -> Optional[Session]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT updated_at, memory FROM sessions WHERE id = ? AND updated_at >= ?",
+                (session_id, now - self.idle_seconds),
+            ).fetchone()
+        if row is None:
+            return None
+        return Session(session_id, ConversationMemory.from_dict(json.loads(row[1])), updated_at=row[0])
+
+    def _remember(self, session: Session, size: Optional[int] = None):
+        """Make session the most recently used; size is its new size when its memory changed"""
+        with self._lock:
+            previous = self._sessions.pop(session.session_id, None)
+            if previous is not None:
+                # Often the same object: take off what was counted before updating its size
+                self._bytes -= previous.size
+            if size is not None:
+                session.size = size
+            self._sessions[session.session_id] = session
+            self._bytes += session.size
+            while self._sessions and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+                _, evicted = self._sessions.popitem(last=False)
+                self._bytes -= evicted.size
+                self._evictions += 1
+
+    def _expire(self, now: float):
+        """Drop idle sessions; the LRU order means they are all at the front"""
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_access < self.idle_seconds:
+                break
+            self._sessions.popitem(last=False)
+            self._bytes -= oldest.size
+            self._expirations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "created": self._created,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "persistent": self._conn is not None,
+            }
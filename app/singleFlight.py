@@ -0,0 +1,91 @@
+# Single-flight coalescing: concurrent identical reads share one in-flight upstream call
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.metrics import SINGLE_FLIGHT_CALLS
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers arriving while a call
+    with the same key is in flight wait for it and get its result (or its
+    exception) instead of starting their own. Nothing is cached: the next
+    caller after it finishes starts a fresh call. Threads and event-loop
+    callers have separate flights, since one can't wait on the other.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._tasks: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._executed: Dict[str, int] = {}
+        self._shared: Dict[str, int] = {}
+
+    def _count(self, operation: str, shared: bool):
+        counts = self._shared if shared else self._executed
+        with self._lock:
+            counts[operation] = counts.get(operation, 0) + 1
+        SINGLE_FLIGHT_CALLS.inc(component=self.name, operation=operation, result="shared" if shared else "executed")
+
+    def do(self, operation: str, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """fn(*args, **kwargs), or the result of the identical call already in flight"""
+        flight_key = (operation, key)
+        with self._lock:
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = _Flight()
+
+        if not leader:
+            self._count(operation, shared=True)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        self._count(operation, shared=False)
+        try:
+            flight.result = fn(*args, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[flight_key]
+            flight.done.set()
+
+    async def do_async(self, operation: str, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """do() for coroutine functions; a waiter being cancelled doesn't cancel the shared call"""
+        flight_key = (operation, key)
+        task = self._tasks.get(flight_key)
+        if task is None or task.done():
+            self._count(operation, shared=False)
+            task = self._tasks[flight_key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda done: self._tasks.pop(flight_key) if self._tasks.get(flight_key) is done else None)
+        else:
+            self._count(operation, shared=True)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            executed, shared = dict(self._executed), dict(self._shared)
+        calls = sum(executed.values()) + sum(shared.values())
+        return {
+            "executed": executed,
+            "shared": shared,
+            "saved_calls": sum(shared.values()),
+            "saved_ratio": sum(shared.values()) / calls if calls else 0.0,
+            "in_flight": len(self._flights) + len(self._tasks),
+        }
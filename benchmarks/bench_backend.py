@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Offline booking throughput against the in-memory calendar backend
+Books meetings through calendarUtils (availability check, insert, busy index and
+event mirror) from a pool of worker threads, with MEMORY_CALENDAR_LATENCY_MS of
+simulated network latency per calendar call. Reports bookings/sec and latency
+percentiles, for capacity planning without Google.
+
+    python benchmarks/bench_backend.py [bookings] [workers]
+"""
+
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ["CALENDAR_BACKEND"] = "memory"
+os.environ.setdefault("MEMORY_CALENDAR_LATENCY_MS", "50")
+os.environ.setdefault("MEMORY_CALENDAR_JITTER_MS", "20")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import calendarUtils
+
+
+def book_one(index: int, base: datetime) -> float:
+    """Check the slot, then book it; returns the wall time in seconds"""
+    start = base + timedelta(minutes=30 * index)
+    end = start + timedelta(minutes=30)
+    started = time.perf_counter()
+    if not calendarUtils.check_availability(start, end):
+        result = calendarUtils.book_event(f"Load test {index}", start, end)
+        if not result.get("success"):
+            raise RuntimeError(result.get("error"))
+    return time.perf_counter() - started
+
+
+def main():
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    logging.disable(logging.INFO)  # One log line per booking would dominate the run
+    calendarUtils.get_calendar_backend()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = sorted(pool.map(lambda index: book_one(index, base), range(bookings)))
+    elapsed = time.perf_counter() - started
+
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    print(f"backend: memory, {os.environ['MEMORY_CALENDAR_LATENCY_MS']} ms latency "
+          f"(+{os.environ['MEMORY_CALENDAR_JITTER_MS']} ms jitter), {workers} workers")
+    print(f"{bookings} bookings in {elapsed:.2f} s: {bookings / elapsed:,.0f} bookings/sec")
+    print(f"latency p50 {percentile(0.50):.1f} ms, p99 {percentile(0.99):.1f} ms, "
+          f"mean {statistics.mean(latencies) * 1000:.1f} ms")
+    print(f"backend calls: {calendarUtils.get_calendar_backend_stats()['calls']}")
+
+
+if __name__ == "__main__":
+    main()
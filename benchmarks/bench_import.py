@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check
+Imports the API modules in a fresh interpreter with -X importtime and fails
+when the total exceeds IMPORT_BUDGET_MS, listing the slowest imports
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+MODULES = ["app.main", "app.agent", "app.calendarUtils"]
+
+
+def measure(module: str):
+    """Return (total_ms, [(cumulative_ms, name), ...]) for importing one module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative_us) / 1000, name[1:].rstrip()))
+    # Top-level imports are the unindented entries; their cumulative times add up to the total
+    total_ms = sum(ms for ms, name in entries if not name.startswith(" "))
+    return total_ms, sorted(entries, reverse=True)
+
+
+def main():
+    over_budget = False
+    for module in MODULES:
+        total_ms, entries = measure(module)
+        verdict = "ok" if total_ms <= IMPORT_BUDGET_MS else "OVER BUDGET"
+        over_budget |= total_ms > IMPORT_BUDGET_MS
+        print(f"import {module}: {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms) {verdict}")
+        for ms, name in entries[:5]:
+            print(f"    {ms:8.1f} ms  {name.strip()}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
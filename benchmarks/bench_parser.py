@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Meeting parser micro-benchmark
+Reports parses per second for parse_meeting() over a corpus of realistic utterances
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.meetingParser import parse_meeting
+
+CORPUS = [
+    "Book a meeting tomorrow at 3 PM with john@example.com",
+    "Schedule a 1-hour call next Monday at 10 AM with sarah@company.com about project review",
+    "Set up a 30-minute meeting on 2025-01-15 at 14:30 with team@company.com",
+    "Can you book a meeting about quarterly planning in 3 days at 11:00 for 90 minutes with cfo@corp.io and ceo@corp.io",
+    "I need to book a meeting tomorrow at 3 PM",
+    "Schedule a call next friday at 4:30 pm with alex.smith@example.org agenda: hiring pipeline",
+    "book a meeting titled 'Design sync' on 2025-03-02 at 09:15 with design@studio.dev for 45 min",
+    "Show me my upcoming meetings",
+    "What's on my calendar for tomorrow?",
+    "Arrange an appointment regarding contract renewal next wednesday at 2pm with legal@firm.com for 2 hours",
+    "hey, can we set up a session in 10 days at 16:00 with a@b.co, c@d.co, e@f.co",
+    "Cancel my meeting with John tomorrow",
+    "Check availability for 2025-01-15 14:00 to 15:00",
+    "Please create a 15 min meeting about standup tomorrow at 9:30 am with dev-team@company.com",
+    "help me book a meeting",
+]
+
+
+def run(iterations: int = 2000) -> float:
+    """Parse the corpus repeatedly and return parses per second"""
+    now = datetime(2025, 1, 10, 9, 0)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for utterance in CORPUS:
+            parse_meeting(utterance, now=now)
+    elapsed = time.perf_counter() - start
+    return iterations * len(CORPUS) / elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    run(iterations // 10)  # warm-up
+    rate = run(iterations)
+    print(f"parse_meeting: {rate:,.0f} parses/sec over {len(CORPUS)} utterances x {iterations} iterations")
+
+
+if __name__ == "__main__":
+    main()
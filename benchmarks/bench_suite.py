@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Hot-path benchmark suite with stored baselines
+Times parsing, validation, reply formatting and conflict checks (no Google or
+Groq credentials needed) and compares each case with benchmarks/baseline.json.
+A case more than BENCH_REGRESSION_THRESHOLD slower than its baseline is flagged
+and the run exits 1.
+
+    python benchmarks/bench_suite.py                  # run and compare
+    python benchmarks/bench_suite.py --save-baseline  # run and store as the new baseline
+    python benchmarks/bench_suite.py parse            # only cases whose name contains 'parse'
+
+The committed baseline was generated on a 1-vCPU Intel Xeon (x86_64) Linux VM
+with CPython 3.11.7 and the pinned requirements.txt versions. Timings from other
+machines aren't comparable: save a baseline on yours before comparing.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_parser import CORPUS
+
+BASELINE_PATH = Path(os.getenv("BENCH_BASELINE", str(ROOT / "benchmarks" / "baseline.json")))
+REGRESSION_THRESHOLD = float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.15"))
+REPEATS = int(os.getenv("BENCH_REPEATS", "5"))
+BUSY_LIST_SIZES = (10, 100, 1000, 10000)
+
+Case = Tuple[str, Callable[[], Callable[[], object]]]
+
+
+def _parser_cases() -> List[Case]:
+    def parse_meeting_case():
+        from app.meetingParser import parse_meeting
+        now = datetime(2025, 1, 10, 9, 0)
+        return lambda: [parse_meeting(utterance, now=now) for utterance in CORPUS]
+
+    def parse_meeting_details_case():
+        from app.calendarUtils import parse_meeting_details
+        return lambda: [parse_meeting_details(utterance) for utterance in CORPUS]
+
+    def extract_meeting_details_case():
+        from app.main import extract_meeting_details
+        return lambda: [extract_meeting_details(utterance) for utterance in CORPUS]
+
+    return [
+        ("parse_meeting[corpus]", parse_meeting_case),
+        ("parse_meeting_details[corpus]", parse_meeting_details_case),
+        ("extract_meeting_details[corpus]", extract_meeting_details_case),
+    ]
+
+
+def _validation_cases() -> List[Case]:
+    def meeting_details_case():
+        from app.main import MeetingDetails
+        payload = {
+            "date": "2025-01-15",
+            "time": "14:30",
+            "participants": ["john@example.com", "sarah@company.com", "team@company.com"],
+            "agenda": "Quarterly planning",
+            "duration": 60,
+        }
+        return lambda: MeetingDetails(**payload)
+
+    return [("MeetingDetails[validate]", meeting_details_case)]
+
+
+def _formatting_cases() -> List[Case]:
+    def format_booking_case():
+        from app.calendarUtils import format_booking_response
+        start = datetime(2025, 1, 15, 9, 0, tzinfo=timezone.utc)
+        end = start + timedelta(hours=1)
+        attendees = ["john@example.com", "sarah@company.com"]
+        return lambda: format_booking_response(
+            "Project review", start, end, "https://calendar.google.com/event?eid=abc", attendees, "Q1 roadmap"
+        )
+
+    return [("format_booking_response", format_booking_case)]
+
+
+def _busy_list(size: int, day: datetime) -> List[Tuple[datetime, datetime]]:
+    """size non-overlapping busy slots spread over one UTC day"""
+    step = timedelta(days=1) / size
+    return [(day + step * i, day + step * i + step / 2) for i in range(size)]
+
+
+def _conflict_cases() -> List[Case]:
+    cases: List[Case] = []
+    day = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    query = (day + timedelta(hours=14), day + timedelta(hours=15))
+
+    for size in BUSY_LIST_SIZES:
+        def index_case(size=size):
+            from app.busyIndex import BusyIntervalIndex
+            index = BusyIntervalIndex(ttl_seconds=3600)
+            index.fill("bench", day, day + timedelta(days=1), _busy_list(size, day))
+            return lambda: index.lookup("bench", *query)
+
+        def clip_case(size=size):
+            from app.calendarUtils import _clip
+            busy = _busy_list(size, day)
+            return lambda: _clip(busy, *query)
+
+        cases.append((f"conflict_index_lookup[{size}]", index_case))
+        cases.append((f"conflict_clip_scan[{size}]", clip_case))
+    return cases
+
+
+def _merge_cases() -> List[Case]:
+    cases: List[Case] = []
+    day = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    for attendees in (2, 10, 50):
+        def merge_case(attendees=attendees):
+            from app.freeSlots import merge_busy
+            # Same load per calendar, shifted so the lists interleave
+            busy_lists = [
+                [(start + timedelta(minutes=attendee), end + timedelta(minutes=attendee)) for start, end in _busy_list(100, day)]
+                for attendee in range(attendees)
+            ]
+            return lambda: merge_busy(busy_lists)
+
+        cases.append((f"merge_busy[{attendees}x100]", merge_case))
+    return cases
+
+
+def all_cases() -> List[Case]:
+    return _parser_cases() + _validation_cases() + _formatting_cases() + _conflict_cases() + _merge_cases()
+
+
+def measure(fn: Callable[[], object]) -> float:
+    """Best-of-REPEATS time per call, in microseconds"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEATS, number=number)) / number * 1e6
+
+
+def load_baseline() -> Dict[str, float]:
+    if not BASELINE_PATH.is_file():
+        return {}
+    return json.loads(BASELINE_PATH.read_text()).get("results", {})
+
+
+def save_baseline(results: Dict[str, float]):
+    BASELINE_PATH.write_text(json.dumps({
+        "machine": f"{platform.machine()}, {os.cpu_count()} CPU(s) / {platform.python_implementation()} {platform.python_version()}",
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+    }, indent=2) + "\n")
+
+
+def compare(name: str, current: float, baseline: Optional[float]) -> Tuple[str, bool]:
+    """Verdict text and whether it is a regression"""
+    if baseline is None:
+        return "new", False
+    change = current / baseline - 1
+    if change > REGRESSION_THRESHOLD:
+        return f"{change:+.0%} REGRESSION", True
+    if change < -REGRESSION_THRESHOLD:
+        return f"{change:+.0%} faster", False
+    return f"{change:+.0%}", False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("filter", nargs="?", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    baseline = load_baseline()
+    results: Dict[str, float] = {}
+    regressions = []
+    for name, build in all_cases():
+        if args.filter not in name:
+            continue
+        try:
+            fn = build()
+        except ImportError as e:
+            # e.g. the API models need fastapi/pydantic from requirements.txt
+            print(f"{name:40s} skipped ({e})")
+            continue
+        results[name] = measure(fn)
+        verdict, regressed = compare(name, results[name], baseline.get(name))
+        if regressed:
+            regressions.append(name)
+        reference = f"{baseline[name]:10.2f} us" if name in baseline else " " * 13
+        print(f"{name:40s} {results[name]:10.2f} us   baseline {reference}   {verdict}")
+
+    if args.save_baseline:
+        save_baseline({**baseline, **results})
+        print(f"Baseline saved to {BASELINE_PATH}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) over {REGRESSION_THRESHOLD:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
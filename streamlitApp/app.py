@@ -65,7 +65,9 @@ st.markdown("""
 # Backend URL
 BACKEND_URL = "http://127.0.0.1:8000"
 CHAT_ENDPOINT = f"{BACKEND_URL}/chat"
+CHAT_STREAM_ENDPOINT = f"{BACKEND_URL}/chat/stream"
 HEALTH_ENDPOINT = f"{BACKEND_URL}/health"
+SESSIONS_ENDPOINT = f"{BACKEND_URL}/sessions"
 
 # Initialize session state
 if "messages" not in st.session_state:
@@ -74,6 +76,8 @@ if "meeting_history" not in st.session_state:
     st.session_state.meeting_history = []
 if "backend_status" not in st.session_state:
     st.session_state.backend_status = "unknown"
+if "session_id" not in st.session_state:
+    st.session_state.session_id = None  # Assigned by the backend on the first reply
 
 def check_backend_status():
     """Check if backend is reachable"""
@@ -86,19 +90,20 @@ def check_backend_status():
     except:
         return "offline", None
 
-def send_message(user_input, chat_history):
+def send_message(user_input):
     """Send message to backend with better error handling"""
     try:
         response = requests.post(
             CHAT_ENDPOINT,
             json={
                 "user_input": user_input,
-                "chat_history": chat_history
+                "session_id": st.session_state.session_id
             },
             timeout=30
         )
         if response.status_code == 200:
             response_json = response.json()
+            st.session_state.session_id = response_json.get("session_id", st.session_state.session_id)
             # If meeting booked, add emoji and success message
             if response_json.get("response", "").lower().startswith("meeting booked"):
                 return f"✅ Meeting booked successfully!\n\n{response_json['response']}", True
@@ -112,6 +117,76 @@ def send_message(user_input, chat_history):
     except Exception as e:
         return f"❌ Error: {str(e)}", False
 
+def stream_message(user_input, placeholder):
+    """Stream a reply from the backend, rendering tokens and tool progress as they arrive"""
+    try:
+        with requests.post(
+            CHAT_STREAM_ENDPOINT,
+            json={
+                "user_input": user_input,
+                "session_id": st.session_state.session_id
+            },
+            stream=True,
+            timeout=(5, 60)  # connect, and max gap between streamed chunks
+        ) as response:
+            if response.status_code != 200:
+                return f"⚠️ Backend error: {response.status_code}", False
+            
+            partial = ""
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):])
+                    if event == "token":
+                        partial += data.get("text", "")
+                        placeholder.markdown(f"{partial}▌")
+                    elif event == "tool_start":
+                        placeholder.markdown(f"{partial}\n\n🔧 Using **{data.get('tool')}**...")
+                    elif event in ("done", "error"):
+                        st.session_state.session_id = data.get("session_id", st.session_state.session_id)
+                        return data.get("response", "⚠️ No response received."), event == "done"
+            
+            return partial or "⚠️ No response received.", bool(partial)
+    except requests.exceptions.Timeout:
+        return "⏰ Request timed out. Please try again.", False
+    except requests.exceptions.ConnectionError:
+        return "🔌 Cannot connect to backend. Please check if the server is running.", False
+    except Exception as e:
+        return f"❌ Error: {str(e)}", False
+
+def render_message(msg):
+    """Render one chat message with role-based styling"""
+    with st.chat_message(msg["role"]):
+        # Determine message styling
+        if msg["role"] == "user":
+            st.markdown(f"""
+            <div class="chat-message user-message">
+                <strong>You:</strong><br>
+                {msg["content"]}
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            # Check if it's an error message
+            if "❌" in msg["content"] or "⚠️" in msg["content"]:
+                css_class = "error-message"
+            elif "✅" in msg["content"]:
+                css_class = "success-message"
+            else:
+                css_class = "assistant-message"
+            
+            st.markdown(f"""
+            <div class="chat-message {css_class}">
+                <strong>Assistant:</strong><br>
+                {msg["content"]}
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # Show timestamp if available
+        if "timestamp" in msg:
+            st.caption(f"Sent at {msg['timestamp'].strftime('%H:%M:%S')}")
+
 # Header
 st.markdown("""
 <div class="main-header">
@@ -134,6 +209,11 @@ with st.sidebar:
     if health_data:
         st.markdown(f"**Last Check**: {datetime.now().strftime('%H:%M:%S')}")
     
+    st.session_state.stream_responses = st.toggle(
+        "⚡ Stream responses",
+        value=st.session_state.get("stream_responses", True)
+    )
+    
     st.markdown("---")
     
     # Quick actions
@@ -142,7 +222,13 @@ with st.sidebar:
     col1, col2 = st.columns(2)
     with col1:
         if st.button("🧹 Reset Chat", use_container_width=True):
+            if st.session_state.session_id:
+                try:
+                    requests.delete(f"{SESSIONS_ENDPOINT}/{st.session_state.session_id}", timeout=3)
+                except requests.exceptions.RequestException:
+                    pass  # The backend drops idle sessions on its own
             st.session_state.messages = []
+            st.session_state.session_id = None
             st.rerun()
     
     with col2:
@@ -186,73 +272,55 @@ else:
         key="chat_input"
     )
 
+# Display chat history with better styling
+for msg in st.session_state.messages:
+    render_message(msg)
+
 # Handle user message
 if user_input:
     # Add user message to chat
-    st.session_state.messages.append({"role": "user", "content": user_input, "timestamp": datetime.now()})
+    user_message = {"role": "user", "content": user_input, "timestamp": datetime.now()}
+    st.session_state.messages.append(user_message)
+    render_message(user_message)
     
-    # Prepare chat history for backend
-    chat_history = [(msg["role"], msg["content"]) for msg in st.session_state.messages[:-1]]
+    # The backend keeps the conversation; only the new message and session id are sent
+    if st.session_state.get("stream_responses", True):
+        # Show tokens as they arrive, then replace them with the final styled reply
+        with st.chat_message("assistant"):
+            placeholder = st.empty()
+            placeholder.markdown("💬 Thinking...")
+            response_text, success = stream_message(user_input, placeholder)
+            placeholder.empty()
+    else:
+        # Show typing indicator
+        with st.spinner("💬 Processing your request..."):
+            response_text, success = send_message(user_input)
     
-    # Show typing indicator
-    with st.spinner("💬 Processing your request..."):
-        # Send message to backend
-        response_text, success = send_message(user_input, chat_history)
-        
-        # Add assistant response to chat
-        st.session_state.messages.append({
-            "role": "assistant", 
-            "content": response_text, 
-            "timestamp": datetime.now(),
-            "success": success
-        })
-        
-        # Extract meeting details if booking was successful
-        if success and "✅ Meeting booked successfully" in response_text:
-            # Try to extract meeting details for history
-            try:
-                # Simple extraction for demo - in real app, parse the response more carefully
-                if "📅" in response_text and "🕐" in response_text:
-                    meeting_info = {
-                        "date": datetime.now().strftime("%Y-%m-%d"),  # Simplified
-                        "time": "Unknown",
-                        "participants": [],
-                        "agenda": None
-                    }
-                    st.session_state.meeting_history.append(meeting_info)
-            except:
-                pass
-
-# Display chat messages with better styling
-for i, msg in enumerate(st.session_state.messages):
-    with st.chat_message(msg["role"]):
-        # Determine message styling
-        if msg["role"] == "user":
-            st.markdown(f"""
-            <div class="chat-message user-message">
-                <strong>You:</strong><br>
-                {msg["content"]}
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            # Check if it's an error message
-            if "❌" in msg["content"] or "⚠️" in msg["content"]:
-                css_class = "error-message"
-            elif "✅" in msg["content"]:
-                css_class = "success-message"
-            else:
-                css_class = "assistant-message"
-            
-            st.markdown(f"""
-            <div class="chat-message {css_class}">
-                <strong>Assistant:</strong><br>
-                {msg["content"]}
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Show timestamp if available
-        if "timestamp" in msg:
-            st.caption(f"Sent at {msg['timestamp'].strftime('%H:%M:%S')}")
+    # Add assistant response to chat
+    assistant_message = {
+        "role": "assistant", 
+        "content": response_text, 
+        "timestamp": datetime.now(),
+        "success": success
+    }
+    st.session_state.messages.append(assistant_message)
+    render_message(assistant_message)
+    
+    # Extract meeting details if booking was successful
+    if success and "✅ Meeting booked successfully" in response_text:
+        # Try to extract meeting details for history
+        try:
+            # Simple extraction for demo - in real app, parse the response more carefully
+            if "📅" in response_text and "🕐" in response_text:
+                meeting_info = {
+                    "date": datetime.now().strftime("%Y-%m-%d"),  # Simplified
+                    "time": "Unknown",
+                    "participants": [],
+                    "agenda": None
+                }
+                st.session_state.meeting_history.append(meeting_info)
+        except:
+            pass
 
 # Footer
 st.markdown("---")
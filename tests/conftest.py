@@ -0,0 +1,28 @@
+# Make the app package importable when pytest is run from anywhere in the repo
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """A clock that only moves when a test sets or advances `now`"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(request, monkeypatch):
+    """
+    Replace the time function named by the test module's CLOCK
+    (e.g. "app.busyIndex.time.monotonic") with a FakeClock
+    """
+    fake = FakeClock()
+    monkeypatch.setattr(request.module.CLOCK, fake)
+    return fake
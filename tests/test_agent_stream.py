@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from app.agent import FinalAnswerFilter
+
+
+def stream(filter_, text, size):
+    return "".join(filter_.feed(text[i:i + size]) for i in range(0, len(text), size))
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_only_the_final_answer_text_is_forwarded(size):
+    answer = 'Booked "Sync" for 3 PM\n\\ see you ✅'
+    blob = '```json\n' + json.dumps({"action": "Final Answer", "action_input": answer}) + '\n```'
+    assert stream(FinalAnswerFilter(), blob, size) == answer
+
+
+@pytest.mark.parametrize("size", [1, 5, 1000])
+def test_tool_calls_are_not_forwarded(size):
+    blob = '```json\n' + json.dumps({"action": "check_availability", "action_input": "tomorrow 3pm"}) + '\n```'
+    assert stream(FinalAnswerFilter(), blob, size) == ""
+
+
+def test_answer_before_action_is_sent_once_the_action_is_known():
+    filter_ = FinalAnswerFilter()
+    assert filter_.feed('{"action_input": "All done", ') == ""
+    assert filter_.feed('"action": "Final Answer"}') == "All done"
+
+
+def test_reset_starts_a_new_call():
+    filter_ = FinalAnswerFilter()
+    stream(filter_, json.dumps({"action": "get_upcoming_events", "action_input": "7"}), 4)
+    filter_.reset()
+    assert stream(filter_, json.dumps({"action": "Final Answer", "action_input": "Nothing booked"}), 4) == "Nothing booked"
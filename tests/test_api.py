@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+fastapi_testclient = pytest.importorskip("fastapi.testclient")
+
+from app import asyncCalendarUtils, calendarUtils
+from app.asyncCalendarBackends import AsyncInMemoryCalendarBackend
+from app.calendarBackends import InMemoryCalendarBackend
+from app.main import app
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    memory = InMemoryCalendarBackend()
+    monkeypatch.setattr(asyncCalendarUtils, "get_async_calendar_backend", lambda: AsyncInMemoryCalendarBackend(memory))
+    yield memory
+    calendarUtils.busy_index.invalidate()
+
+
+@pytest.fixture
+def client():
+    # Not used as a context manager, so the startup warm-up and outbox workers don't run
+    return fastapi_testclient.TestClient(app)
+
+
+def add_event(backend, start, end):
+    backend.insert_event(calendarUtils.CALENDAR_ID, {
+        "summary": "Busy",
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": end.isoformat()},
+    })
+
+
+# 09:00 without an offset is 09:00 Asia/Kolkata, 03:30 UTC, on every endpoint
+def test_availability_reads_naive_times_as_local(backend, client):
+    response = client.post("/availability", json={"ranges": [{"start": "2031-03-03T09:00:00", "end": "2031-03-03T09:30:00"}]})
+    assert response.status_code == 200
+    assert response.json()["results"][0]["start"] == "2031-03-03T03:30:00Z"
+
+
+def test_free_slots_reads_naive_times_as_local(backend, client):
+    response = client.post("/free_slots", json={"start": "2031-03-03T09:00:00", "end": "2031-03-03T09:30:00", "duration_minutes": 30})
+    assert response.status_code == 200
+    assert response.json()["slots"][0]["start"].startswith("2031-03-03T03:30:00")
+
+
+def test_book_meeting_refuses_a_busy_slot(backend, client, monkeypatch):
+    queued = []
+    monkeypatch.setattr(calendarUtils, "enqueue_booking", lambda *args: queued.append(args) or "job")
+    day = (datetime.now() + timedelta(days=30)).date()
+    # 3 PM Asia/Kolkata is 09:30 UTC
+    add_event(backend, datetime.fromisoformat(f"{day}T09:30:00+00:00"), datetime.fromisoformat(f"{day}T10:30:00+00:00"))
+
+    response = client.post("/book_meeting", json={"user_input": f"Book a meeting on {day} at 3 PM with alice@example.com about planning"})
+    body = response.json()
+    assert body["success"] is False
+    assert body["error_code"] == "CONFLICT"
+    assert queued == []
+
+
+def test_book_meeting_queues_a_free_slot(backend, client, monkeypatch):
+    queued = []
+    monkeypatch.setattr(calendarUtils, "enqueue_booking", lambda *args: queued.append(args) or "job")
+    day = (datetime.now() + timedelta(days=30)).date()
+    response = client.post("/book_meeting", json={"user_input": f"Book a meeting on {day} at 3 PM with alice@example.com about planning"})
+    assert response.status_code == 202
+    assert response.json()["job_id"] == "job"
+    assert len(queued) == 1
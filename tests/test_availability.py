@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import asyncCalendarUtils, calendarUtils
+from app.asyncCalendarBackends import AsyncInMemoryCalendarBackend
+from app.calendarBackends import InMemoryCalendarBackend
+from app.calendarUtils import as_local
+
+NAIVE_NINE = datetime(2031, 3, 3, 9, 0)  # 09:00 Asia/Kolkata is 03:30 UTC
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    memory = InMemoryCalendarBackend()
+    monkeypatch.setattr(asyncCalendarUtils, "get_async_calendar_backend", lambda: AsyncInMemoryCalendarBackend(memory))
+    yield memory
+    calendarUtils.busy_index.invalidate()
+
+
+def test_naive_times_are_local():
+    assert as_local(NAIVE_NINE).astimezone(timezone.utc) == datetime(2031, 3, 3, 3, 30, tzinfo=timezone.utc)
+
+
+def test_aware_times_are_kept():
+    aware = datetime(2031, 3, 3, 9, 0, tzinfo=timezone.utc)
+    assert as_local(aware) is aware
+
+
+def test_naive_availability_range_checks_the_local_instant(backend):
+    backend.insert_event(calendarUtils.CALENDAR_ID, {
+        "summary": "Standup",
+        "start": {"dateTime": "2031-03-03T03:30:00Z"},
+        "end": {"dateTime": "2031-03-03T04:00:00Z"},
+    })
+    # What /availability does with a range sent without an offset
+    ranges = [(as_local(NAIVE_NINE), as_local(NAIVE_NINE + timedelta(minutes=30)))]
+    [result] = asyncio.run(asyncCalendarUtils.check_availability_many(ranges))
+    assert result["start"] == "2031-03-03T03:30:00Z"
+    assert result["end"] == "2031-03-03T04:00:00Z"
+    assert not result["free"]
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import calendarUtils
+from app.bookingOutbox import FAILED, QUEUED, RETRYING, RUNNING, SUCCEEDED, BookingOutbox
+from app.calendarBackends import CalendarAPIError, InMemoryCalendarBackend
+
+CLOCK = "app.bookingOutbox.time.time"
+START = datetime(2030, 1, 7, 10, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    box = BookingOutbox(":memory:", lease_seconds=60, retry_base=1, retry_max=10)
+    monkeypatch.setattr(calendarUtils, "get_booking_outbox", lambda: box)
+    return box
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    memory = InMemoryCalendarBackend()
+    monkeypatch.setattr(calendarUtils, "get_calendar_backend", lambda: memory)
+    return memory
+
+
+def booking(hour=0):
+    start = START + timedelta(hours=hour)
+    return {
+        "summary": "Sync",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(minutes=30)).isoformat(),
+        "description": None,
+        "attendees": ["alice@example.com"],
+    }
+
+
+def event_ids(backend):
+    return [event["id"] for event in backend.iter_events(calendarUtils.CALENDAR_ID, START, START + timedelta(days=1), ["id"])]
+
+
+def test_claim_leases_jobs_until_the_lease_runs_out(clock, outbox):
+    job_id = outbox.enqueue(booking())
+    assert outbox.get(job_id)["status"] == QUEUED
+    assert outbox.claim(10) == [(job_id, booking(), 1)]
+    assert outbox.claim(10) == []
+    assert outbox.get(job_id)["status"] == RUNNING
+
+    # The worker died: the job is handed out again once its lease expires
+    clock.now += 60
+    assert outbox.claim(10) == [(job_id, booking(), 2)]
+
+
+def test_a_finished_job_keeps_its_outcome(clock, outbox):
+    job_id = outbox.enqueue(booking())
+    outbox.claim(10)
+    outbox.complete(job_id, {"success": True})
+    outbox.fail(job_id, "late duplicate")
+    job = outbox.get(job_id)
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == {"success": True}
+    assert job["error"] is None
+
+
+def test_retry_waits_out_its_backoff(clock, outbox):
+    job_id = outbox.enqueue(booking())
+    outbox.claim(10)
+    delay = outbox.retry(job_id, 1, "503")
+    assert 0 <= delay <= 1
+    assert outbox.get(job_id)["status"] == RETRYING
+    clock.now += 1
+    assert outbox.claim(10) == [(job_id, booking(), 2)]
+
+
+def test_a_job_is_delivered_once(outbox, backend):
+    job_id = outbox.enqueue(booking())
+    calendarUtils._deliver_bookings(outbox.claim(10))
+    job = outbox.get(job_id)
+    assert job["status"] == SUCCEEDED
+    assert job["result"]["event_id"] == job_id
+    assert event_ids(backend) == [job_id]
+    assert outbox.claim(10) == []
+
+
+def test_a_conflict_on_the_job_id_counts_as_delivered(outbox, backend):
+    job_id = outbox.enqueue(booking())
+    jobs = outbox.claim(10)
+    # An earlier attempt created the event but its answer was lost
+    backend.insert_event(calendarUtils.CALENDAR_ID, dict(
+        calendarUtils.event_body(**dict(booking(), start_time=START, end_time=START + timedelta(minutes=30))),
+        id=job_id
+    ))
+    calendarUtils._deliver_bookings(jobs)
+    job = outbox.get(job_id)
+    assert job["status"] == SUCCEEDED
+    assert job["attempts"] == 1
+    assert event_ids(backend) == [job_id]
+
+
+def test_transient_errors_are_retried_and_permanent_ones_fail(outbox, backend, monkeypatch):
+    transient_id = outbox.enqueue(booking())
+    permanent_id = outbox.enqueue(booking(hour=2))
+    errors = {
+        transient_id: CalendarAPIError(503, "backendError", "down"),
+        permanent_id: CalendarAPIError(400, "invalid", "bad request"),
+    }
+    monkeypatch.setattr(backend, "insert_events", lambda calendar_id, bodies: [(None, errors[body["id"]]) for body in bodies])
+    calendarUtils._deliver_bookings(outbox.claim(10))
+    assert outbox.get(transient_id)["status"] == RETRYING
+    assert outbox.get(permanent_id)["status"] == FAILED
+    assert event_ids(backend) == []
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+from app.busyIndex import BusyIntervalIndex
+
+CLOCK = "app.busyIndex.time.monotonic"
+CAL = "primary"
+DAY = datetime(2030, 1, 7, tzinfo=timezone.utc)
+
+
+def at(hour, day=0):
+    return DAY + timedelta(days=day, hours=hour)
+
+
+def test_fill_then_lookup_is_answered_locally(clock):
+    index = BusyIntervalIndex(ttl_seconds=60)
+    index.fill(CAL, at(0), at(0, day=1), [(at(9), at(10))])
+    assert index.lookup(CAL, at(8), at(12)) == [(at(9), at(10))]
+    clock.now += 60
+    assert index.lookup(CAL, at(8), at(12)) is None
+
+
+def test_fill_keeps_a_booking_added_while_the_fetch_was_in_flight(clock):
+    index = BusyIntervalIndex(ttl_seconds=60)
+    since = index.begin_fill()
+    index.add(CAL, at(14), at(15), "booked-meanwhile")
+    # The freebusy answer was computed before the booking landed
+    index.fill(CAL, at(0), at(0, day=1), [(at(9), at(10))], since)
+    assert index.lookup(CAL, at(0), at(0, day=1)) == [(at(9), at(10)), (at(14), at(15))]
+
+
+def test_fill_skips_days_with_a_cancellation_during_the_fetch(clock):
+    index = BusyIntervalIndex(ttl_seconds=60)
+    index.add(CAL, at(9), at(10), "cancelled")
+    since = index.begin_fill()
+    index.discard_event(CAL, "cancelled")
+    index.fill(CAL, at(0), at(0, day=2), [(at(9), at(10)), (at(9, day=1), at(10, day=1))], since)
+    assert index.lookup(CAL, at(8), at(12)) is None
+    assert index.lookup(CAL, at(8, day=1), at(12, day=1)) == [(at(9, day=1), at(10, day=1))]
+
+
+def test_fill_older_than_an_invalidation_is_ignored(clock):
+    index = BusyIntervalIndex(ttl_seconds=60)
+    since = index.begin_fill()
+    index.invalidate(CAL)
+    index.fill(CAL, at(0), at(0, day=1), [], since)
+    assert index.lookup(CAL, at(8), at(12)) is None
+
+
+def test_fill_ages_from_when_the_fetch_started(clock):
+    index = BusyIntervalIndex(ttl_seconds=60)
+    since = index.begin_fill()
+    clock.now += 45
+    index.fill(CAL, at(0), at(0, day=1), [], since)
+    assert index.lookup(CAL, at(8), at(12)) == []
+    clock.now += 15
+    assert index.lookup(CAL, at(8), at(12)) is None
+
+
+def test_events_are_forgotten_with_their_days(clock):
+    index = BusyIntervalIndex(ttl_seconds=60)
+    index.fill(CAL, at(0), at(0, day=1), [])
+    index.add(CAL, at(9), at(10), "evt")
+    clock.now += 60
+    # The next fill expires the old day, and the event with it
+    index.fill(CAL, at(0, day=5), at(0, day=6), [])
+    assert index._events[CAL] == {}
+    assert index._changes[CAL] == {}
+
+
+def test_events_are_forgotten_on_invalidate(clock):
+    index = BusyIntervalIndex(ttl_seconds=60)
+    index.fill(CAL, at(0), at(0, day=1), [])
+    index.add(CAL, at(9), at(10), "evt")
+    index.invalidate(CAL)
+    assert CAL not in index._events
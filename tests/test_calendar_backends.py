@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.calendarBackends import CalendarBackend, InMemoryCalendarBackend
+
+
+def test_backend_missing_an_operation_fails_when_created():
+    class NoListing(CalendarBackend):
+        def freebusy(self, time_min, time_max, calendar_ids):
+            return {}
+
+        def insert_event(self, calendar_id, body):
+            return body
+
+        def delete_event(self, calendar_id, event_id):
+            pass
+
+        def get_calendar(self, calendar_id):
+            return {}
+
+    with pytest.raises(TypeError, match="list_events"):
+        NoListing()
+
+
+def test_memory_backend_implements_every_operation():
+    backend = InMemoryCalendarBackend()
+    start = datetime(2030, 1, 7, 9, tzinfo=timezone.utc)
+    event = backend.insert_event("primary", {
+        "summary": "Sync",
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": (start + timedelta(hours=1)).isoformat()},
+    })
+    assert backend.freebusy(start, start + timedelta(days=1), ["primary"])["primary"]["busy"]
+    assert [e["id"] for e in backend.iter_events("primary", start, start + timedelta(days=1), ["id"])] == [event["id"]]
+    backend.delete_event("primary", event["id"])
+    assert backend.freebusy(start, start + timedelta(days=1), ["primary"])["primary"]["busy"] == []
+
+
+def test_async_backend_missing_an_operation_fails_when_created():
+    from app.asyncCalendarBackends import AsyncCalendarBackend
+
+    class FreeBusyOnly(AsyncCalendarBackend):
+        async def freebusy(self, time_min, time_max, calendar_ids):
+            return {}
+
+    with pytest.raises(TypeError, match="insert_event"):
+        FreeBusyOnly()
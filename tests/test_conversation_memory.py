@@ -0,0 +1,58 @@
+from app.conversationMemory import (
+    MEMORY_SUMMARY_SHARE, SUMMARY_HEADER, ConversationMemory, compact_history, estimate_tokens
+)
+
+
+def turns(count, text="Message {i}. With more detail after the first sentence."):
+    return [("user" if i % 2 == 0 else "assistant", text.format(i=i)) for i in range(count)]
+
+
+def test_short_conversations_are_kept_verbatim():
+    history = turns(4)
+    assert compact_history(history) == history
+
+
+def test_older_messages_fold_into_a_summary_of_first_sentences():
+    memory = ConversationMemory(token_budget=2000, window_messages=4)
+    memory.extend(turns(6))
+    messages = memory.messages()
+    assert messages[0] == ("system", f"{SUMMARY_HEADER}\nUser: Message 0.\nAssistant: Message 1.")
+    assert messages[1:] == turns(6)[2:]
+
+
+def test_the_summary_keeps_to_its_share_of_the_budget():
+    memory = ConversationMemory(token_budget=100, window_messages=2)
+    memory.extend(turns(60))
+    summary_tokens = sum(estimate_tokens(line) for line in memory.summary_lines)
+    assert summary_tokens <= int(100 * MEMORY_SUMMARY_SHARE)
+    # The oldest lines went first
+    assert memory.summary_lines[-1] == "Assistant: Message 57."
+
+
+def test_messages_stay_within_the_token_budget():
+    memory = ConversationMemory(token_budget=200, window_messages=8)
+    memory.extend(turns(40, "x" * 150 + " {i}"))
+    messages = memory.messages()
+    assert sum(estimate_tokens(content) for _, content in messages) <= 200
+    assert messages[-1][1].endswith(" 39")
+
+
+def test_the_latest_message_is_kept_even_when_over_budget():
+    memory = ConversationMemory(token_budget=50, window_messages=4)
+    memory.add("user", "y" * 1000)
+    [(role, content)] = memory.messages()
+    assert role == "user"
+    assert content == "y" * 200
+
+
+def test_a_compacted_history_can_be_compacted_again():
+    once = compact_history(turns(30))
+    assert compact_history(once) == once
+
+
+def test_round_trips_through_a_dict():
+    memory = ConversationMemory(token_budget=500, window_messages=4)
+    memory.extend(turns(12))
+    restored = ConversationMemory.from_dict(memory.to_dict())
+    assert restored.messages() == memory.messages()
+    assert restored.size_bytes() == memory.size_bytes()
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from app.eventExport import ICS_LINE_OCTETS, ics_calendar, ics_event, ndjson_lines
+from app.meetingImport import _ics_text, _unfold
+
+EVENT = {
+    "id": "abc123",
+    "summary": "Planning",
+    "start": {"dateTime": "2030-01-07T09:00:00+05:30"},
+    "end": {"dateTime": "2030-01-07T10:00:00+05:30"},
+}
+
+
+def physical_lines(text):
+    assert text.endswith("\r\n")
+    return [line + "\r\n" for line in text[:-2].split("\r\n")]
+
+
+def properties(text):
+    return {content.partition(":")[0]: content.partition(":")[2] for _, content in _unfold(physical_lines(text))}
+
+
+@pytest.mark.parametrize("description", [
+    "Short",
+    "x" * 200,
+    # Multibyte characters straddling the 75-octet fold points
+    "é" * 100,
+    "a" + "日本語のテキスト" * 12,
+    "📅" * 40,
+    "Agenda; budget, hiring\nC:\\new\\path",
+])
+def test_text_is_folded_at_75_octets_and_round_trips(description):
+    text = ics_event(dict(EVENT, description=description), "primary", "20300101T000000Z")
+    for line in physical_lines(text):
+        assert len(line[:-2].encode("utf-8")) <= ICS_LINE_OCTETS
+    assert _ics_text(properties(text)["DESCRIPTION"]) == description
+
+
+def test_continuation_lines_start_with_a_space():
+    text = ics_event(dict(EVENT, summary="s" * 100), "primary", "20300101T000000Z")
+    summary_lines = [line for line in physical_lines(text) if line.startswith(("SUMMARY", " "))]
+    assert len(summary_lines) == 2
+    assert summary_lines[1].startswith(" ")
+
+
+def test_times_and_identity():
+    props = properties(ics_event(EVENT, "primary", "20300101T000000Z"))
+    assert props["UID"] == "abc123@primary"
+    assert props["DTSTART"] == "20300107T033000Z"
+    assert props["DTEND"] == "20300107T043000Z"
+
+
+def test_calendar_wraps_each_event():
+    chunks = list(ics_calendar([EVENT, dict(EVENT, id="def456")], "primary", name="Team, main"))
+    assert chunks[0].startswith("BEGIN:VCALENDAR\r\n")
+    assert "X-WR-CALNAME:Team\\, main\r\n" in chunks[0]
+    assert [chunk.count("BEGIN:VEVENT") for chunk in chunks[1:-1]] == [1, 1]
+    assert chunks[-1] == "END:VCALENDAR\r\n"
+
+
+def test_ndjson_is_one_event_per_line():
+    lines = list(ndjson_lines([EVENT, {"id": "2"}]))
+    assert [json.loads(line)["id"] for line in lines] == ["abc123", "2"]
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
@@ -0,0 +1,80 @@
+from datetime import datetime, time, timedelta, timezone
+
+from app.freeSlots import free_slots, free_windows, merge_busy, nearest_slots, working_windows
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MONDAY = datetime(2030, 1, 7, tzinfo=IST)
+HALF_HOUR = timedelta(minutes=30)
+QUARTER = timedelta(minutes=15)
+
+
+def at(hour, minute=0, day=0):
+    return MONDAY + timedelta(days=day, hours=hour, minutes=minute)
+
+
+def test_merge_joins_overlapping_intervals_across_calendars():
+    mine = [(at(9), at(10)), (at(13), at(14))]
+    theirs = [(at(9, 30), at(11)), (at(13, 15), at(13, 45))]
+    assert merge_busy([mine, theirs]) == [(at(9), at(11)), (at(13), at(14))]
+
+
+def test_merge_joins_touching_intervals_and_drops_empty_ones():
+    assert merge_busy([[(at(9), at(10)), (at(12), at(12))], [(at(10), at(11))]]) == [(at(9), at(11))]
+    assert merge_busy([]) == []
+
+
+def test_free_windows_are_the_gaps_inside_the_window():
+    busy = [(at(8), at(9, 30)), (at(11), at(12)), (at(17), at(19))]
+    assert free_windows(busy, at(9), at(18)) == [(at(9, 30), at(11)), (at(12), at(17))]
+    assert free_windows([], at(9), at(10)) == [(at(9), at(10))]
+    assert free_windows([(at(8), at(20))], at(9), at(18)) == []
+
+
+def test_working_windows_clip_to_hours_and_skip_weekends():
+    friday_noon = at(12, day=4)
+    windows = working_windows(friday_noon, at(11, day=7), (time(9), time(18)), IST)
+    # Friday afternoon, then straight to Monday morning
+    assert windows == [(friday_noon, at(18, day=4)), (at(9, day=7), at(11, day=7))]
+
+
+def test_working_windows_start_on_the_local_day():
+    # 20:00 UTC Sunday is already Monday 01:30 in India
+    start = datetime(2030, 1, 6, 20, tzinfo=timezone.utc)
+    assert working_windows(start, at(23), (time(9), time(18)), IST) == [(at(9), at(18))]
+
+
+def test_working_windows_can_include_weekends():
+    saturday = at(0, day=5)
+    windows = working_windows(saturday, at(0, day=7), (time(10), time(12)), IST, days=range(7))
+    assert windows == [(at(10, day=5), at(12, day=5)), (at(10, day=6), at(12, day=6))]
+
+
+def test_free_slots_fit_between_meetings_on_the_step_grid():
+    busy = [(at(9, 10), at(10)), (at(10, 40), at(11, 20))]
+    slots = free_slots(busy, [(at(9), at(12))], HALF_HOUR, QUARTER)
+    assert slots == [(at(10), at(10, 30)), (at(11, 30), at(12))]
+
+
+def test_free_slots_use_busy_time_that_spans_several_windows():
+    busy = [(at(17), at(10, day=1))]
+    windows = [(at(9), at(18)), (at(9, day=1), at(18, day=1))]
+    slots = free_slots(busy, windows, timedelta(hours=1), HALF_HOUR)
+    monday = [(at(9) + i * HALF_HOUR, at(10) + i * HALF_HOUR) for i in range(15)]
+    tuesday = [(at(10, day=1) + i * HALF_HOUR, at(11, day=1) + i * HALF_HOUR) for i in range(15)]
+    assert slots == monday + tuesday
+
+
+def test_nearest_slots_prefer_the_closest_and_do_not_overlap():
+    slots = [(at(9) + i * QUARTER, at(9) + i * QUARTER + HALF_HOUR) for i in range(16)]
+    chosen = nearest_slots(slots, 3, preferred=at(11))
+    assert chosen == [(at(10, 30), at(11)), (at(11), at(11, 30)), (at(11, 30), at(12))]
+
+
+def test_nearest_slots_break_ties_towards_the_earlier_slot():
+    slots = [(at(9), at(10)), (at(11), at(12))]
+    assert nearest_slots(slots, 1, preferred=at(10)) == [(at(9), at(10))]
+
+
+def test_nearest_slots_without_preference_are_the_earliest():
+    slots = [(at(9), at(10)), (at(9, 30), at(10, 30)), (at(10), at(11)), (at(12), at(13))]
+    assert nearest_slots(slots, 2) == [(at(9), at(10)), (at(10), at(11))]
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from app.intentRouter import get_router_stats, route, try_fast_path
+
+NOW = datetime(2030, 1, 7, 9, 0)
+
+
+def test_complete_booking_is_answered_directly():
+    decision = route("Book a meeting tomorrow at 3 PM with alice@example.com about project review", now=NOW)
+    assert decision.intent == 'book'
+    assert decision.missing == []
+    assert not decision.use_llm
+
+
+@pytest.mark.parametrize("message, missing", [
+    ("I need to book a meeting tomorrow at 3 PM", ['title', 'attendees']),
+    ("Book a meeting tomorrow at 3 PM about project review", ['attendees']),
+    ("Book a meeting tomorrow at 3 PM with alice@example.com", ['title']),
+    ("Book a meeting with alice@example.com about project review", ['date', 'time']),
+])
+def test_incomplete_booking_goes_to_the_llm(message, missing):
+    decision = route(message, now=NOW)
+    assert decision.intent == 'book'
+    assert decision.missing == missing
+    assert decision.use_llm
+
+
+def test_hedged_booking_goes_to_the_llm():
+    decision = route("Maybe book a meeting tomorrow at 3 PM with alice@example.com about review", now=NOW)
+    assert decision.use_llm
+
+
+def test_availability_needs_only_date_and_time():
+    decision = route("Am I free tomorrow at 3 PM?", now=NOW)
+    assert decision.intent == 'availability'
+    assert not decision.use_llm
+
+
+def test_cancel_always_goes_to_the_llm():
+    assert route("Cancel my meeting tomorrow at 3 PM", now=NOW).use_llm
+
+
+def test_router_outcomes_are_disjoint():
+    before = get_router_stats()
+    try_fast_path("hello")
+    try_fast_path("Can you maybe find some time for us next week?")
+    after = get_router_stats()
+    delta = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+    outcomes = {key: count for key, count in delta.items() if key == "sent_to_llm" or key.startswith("fast_path_")}
+    assert delta["routed"] == 2
+    assert sum(outcomes.values()) == 2
+    assert delta["llm_calls_avoided"] == outcomes.get("fast_path_greeting", 0) == 1
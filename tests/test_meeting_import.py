@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.meetingImport import BusyTimeline, parse_csv, parse_ics, sniff_format
+
+UTC = timezone.utc
+
+
+def utc(hour, minute=0, day=7):
+    return datetime(2030, 1, day, hour, minute, tzinfo=UTC)
+
+
+def ics(*event_lines):
+    return ["BEGIN:VCALENDAR\r\n", "BEGIN:VEVENT\r\n"] + [line + "\r\n" for line in event_lines] + ["END:VEVENT\r\n", "END:VCALENDAR\r\n"]
+
+
+def test_csv_header_aliases_and_attendee_separators():
+    rows = list(parse_csv([
+        "Title,Start Time,Ends,Agenda,Participants\n",
+        "Sync,2030-01-07T09:00:00Z,2030-01-07T09:45:00Z,Weekly,a@x.com; b@x.com c@x.com\n",
+    ]))
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row.summary, row.description, row.attendees) == ("Sync", "Weekly", ["a@x.com", "b@x.com", "c@x.com"])
+    assert (row.start_time, row.end_time) == (utc(9), utc(9, 45))
+    assert (row.row, row.line, row.error) == (1, 2, None)
+
+
+def test_csv_duration_column_and_default_length():
+    rows = list(parse_csv([
+        "subject,start,duration_minutes\n",
+        "Long,2030-01-07T09:00:00Z,90\n",
+        ",2030-01-07T12:00:00Z,\n",
+    ]))
+    assert rows[0].end_time == utc(10, 30)
+    assert (rows[1].summary, rows[1].end_time) == ("Meeting", utc(12, 30))
+
+
+def test_csv_rows_with_bad_times_are_reported_not_dropped():
+    rows = list(parse_csv([
+        "summary,start,end\n",
+        "A,not a date,\n",
+        "\n",
+        "B,2030-01-07T10:00:00Z,2030-01-07T09:00:00Z\n",
+        "C,,\n",
+    ]))
+    assert [row.summary for row in rows] == ["A", "B", "C"]
+    assert rows[0].error.startswith("Unreadable time")
+    assert rows[1].error == "The meeting must end after it starts"
+    assert rows[2].error == "Missing start time"
+
+
+def test_csv_without_a_start_column_is_rejected():
+    assert [row.error for row in parse_csv(["summary,when\n", "A,today\n"])] == ["The header needs a 'start' column"]
+
+
+def test_ics_folded_lines_and_escaped_text():
+    [row] = parse_ics(ics(
+        "SUMMARY:Quarterly\\, planning",
+        "DESCRIPTION:Line one\\nLine two with a very long tail that the exporter",
+        "  folded onto the next line",
+        "DTSTART:20300107T090000Z",
+        "DTEND:20300107T100000Z",
+        "ATTENDEE;CN=Ann:mailto:ann@x.com",
+    ))
+    assert row.summary == "Quarterly, planning"
+    assert row.description == "Line one\nLine two with a very long tail that the exporter folded onto the next line"
+    assert row.attendees == ["ann@x.com"]
+    assert (row.start_time, row.end_time) == (utc(9), utc(10))
+    assert row.line == 2
+
+
+def test_ics_escaped_backslash_before_n_is_not_a_newline():
+    [row] = parse_ics(ics("DTSTART:20300107T090000Z", "DESCRIPTION:C:\\\\new\\;old\\Nend"))
+    assert row.description == "C:\\new;old\nend"
+
+
+def test_ics_tzid_times_and_duration():
+    [row] = parse_ics(ics("DTSTART;TZID=Asia/Kolkata:20300107T093000", "DURATION:PT1H15M"))
+    assert row.start_time.astimezone(UTC) == utc(4)
+    assert row.end_time - row.start_time == timedelta(hours=1, minutes=15)
+
+
+def test_ics_cancelled_events_are_skipped():
+    assert list(parse_ics(ics("DTSTART:20300107T090000Z", "STATUS:CANCELLED"))) == []
+
+
+@pytest.mark.parametrize("lines, error", [
+    (("DTSTART;VALUE=DATE:20300107",), "All-day events can't be imported"),
+    (("DTSTART:20300107T090000Z", "RRULE:FREQ=WEEKLY"), "Recurring events can't be imported"),
+    (("DTSTART:20300107T090000Z", "DURATION:soon"), "Bad DURATION 'soon'"),
+])
+def test_ics_events_that_cannot_be_imported(lines, error):
+    [row] = parse_ics(ics(*lines))
+    assert row.error == error
+
+
+def test_format_is_sniffed_from_the_first_line():
+    assert sniff_format("\ufeffBEGIN:VCALENDAR\r\n") == "ics"
+    assert sniff_format("summary,start\n") == "csv"
+
+
+def test_timeline_conflicts_at_the_edges():
+    timeline = BusyTimeline([(utc(9), utc(10)), (utc(12), utc(13))])
+    # Back-to-back is fine; any overlap is not
+    assert timeline.conflict(utc(10), utc(12)) is None
+    assert timeline.conflict(utc(8), utc(9)) is None
+    assert timeline.conflict(utc(9, 59), utc(10, 30)) == (utc(9), utc(10))
+    assert timeline.conflict(utc(11), utc(12, 1)) == (utc(12), utc(13))
+    assert timeline.conflict(utc(8), utc(14)) == (utc(9), utc(10))
+
+
+def test_timeline_add_and_remove():
+    timeline = BusyTimeline([(utc(9), utc(10))])
+    timeline.add(utc(10), utc(11))
+    assert timeline.conflict(utc(10, 30), utc(10, 45)) == (utc(10), utc(11))
+    timeline.remove(utc(10), utc(11))
+    assert timeline.conflict(utc(10, 30), utc(10, 45)) is None
+    # Removing something that was never added leaves the timeline alone
+    timeline.remove(utc(9), utc(9, 30))
+    assert timeline.conflict(utc(9), utc(9, 30)) == (utc(9), utc(10))
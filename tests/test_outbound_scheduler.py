@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.outboundScheduler import BULK, INTERACTIVE, OutboundScheduler, TokenBucket, outbound_lane
+
+CLOCK = "app.outboundScheduler.time.monotonic"
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_bucket_refills_at_its_rate_up_to_the_burst(clock):
+    bucket = TokenBucket("calendar", rate=10, burst=5)
+    for _ in range(5):
+        assert bucket.try_take() == 0
+    assert bucket.try_take() == pytest.approx(0.1)
+
+    clock.now += 0.25
+    assert bucket.try_take() == 0
+    assert bucket.try_take() == 0
+    assert bucket.try_take() > 0
+
+    clock.now += 60
+    assert bucket.stats()["tokens"] == 5
+
+
+def test_bulk_lane_leaves_the_reserve_to_interactive_calls(clock):
+    bucket = TokenBucket("calendar", rate=1, burst=4, reserve_fraction=0.25)
+    for _ in range(3):
+        assert bucket.try_take(BULK) == 0
+    assert bucket.try_take(BULK) > 0
+    assert bucket.try_take(INTERACTIVE) == 0
+
+
+def test_bulk_lane_waits_while_an_interactive_call_waits(clock):
+    bucket = TokenBucket("calendar", rate=1, burst=4)
+    bucket._enter(INTERACTIVE)
+    assert bucket.try_take(BULK) > 0
+    bucket._leave(INTERACTIVE)
+    assert bucket.try_take(BULK) == 0
+
+
+def test_full_bucket_grants_a_bulk_take_of_the_whole_burst(clock):
+    bucket = TokenBucket("calendar.insert", rate=5, burst=10)
+    assert bucket.try_take(BULK, cost=10) == 0
+
+
+def test_bulk_call_costing_more_than_the_burst_completes():
+    scheduler = OutboundScheduler({"calendar": (1000, 20), "calendar.insert": (200, 10)})
+    done = []
+
+    def call():
+        with outbound_lane(BULK):
+            done.append(scheduler.call("calendar", "insert", lambda: "ok", cost=20))
+
+    thread = threading.Thread(target=call, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert done == ["ok"]
+
+
+def test_async_bulk_call_costing_more_than_the_burst_completes():
+    scheduler = OutboundScheduler({"calendar.delete": (200, 10)})
+
+    async def op():
+        return "ok"
+
+    async def main():
+        with outbound_lane(BULK):
+            return await asyncio.wait_for(scheduler.acall("calendar", "delete", op, cost=25), timeout=5)
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_rate_limited_call_is_retried_and_halves_the_rate():
+    scheduler = OutboundScheduler({"groq": (100, 10)}, max_retries=2, backoff_base=0.001)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RateLimited("slow down")
+        return "ok"
+
+    assert scheduler.call("groq", "chat", flaky) == "ok"
+    assert len(attempts) == 2
+    assert scheduler.buckets["groq"].penalties == 1
+
+
+def test_non_transient_errors_are_not_retried():
+    scheduler = OutboundScheduler({}, max_retries=3, backoff_base=0.001)
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        scheduler.call("calendar", "insert", broken)
+    assert len(attempts) == 1
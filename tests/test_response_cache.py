@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+from app import calendarUtils
+from app.calendarBackends import InMemoryCalendarBackend
+from app.responseCache import ResponseCache, normalize_input
+
+CLOCK = "app.responseCache.time.monotonic"
+HISTORY = [("human", "hi"), ("assistant", "Hello!")]
+
+
+def test_equivalent_inputs_share_a_key():
+    cache = ResponseCache()
+    assert normalize_input("  What's on   TOMORROW?! ") == "what's on tomorrow"
+    assert cache.make_key("What's on tomorrow?", HISTORY, 1) == cache.make_key("what's on   tomorrow", HISTORY, 1)
+    assert cache.make_key("What's on tomorrow?", HISTORY, 1) != cache.make_key("What's on tomorrow?", [], 1)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ResponseCache(ttl_seconds=300)
+    cache.put("k", "reply")
+    clock.now += 299
+    assert cache.get("k") == "reply"
+    clock.now += 1
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_a_booking_makes_earlier_replies_unreachable(monkeypatch):
+    monkeypatch.setattr(calendarUtils, "get_calendar_backend", lambda: InMemoryCalendarBackend())
+    cache = ResponseCache()
+    before = cache.make_key("what's on tomorrow", HISTORY, calendarUtils.calendar_state_version())
+    cache.put(before, "Nothing booked")
+
+    start = datetime(2030, 1, 8, 9, tzinfo=timezone.utc)
+    assert calendarUtils.book_event("Sync", start, start + timedelta(minutes=30))["success"]
+    calendarUtils.busy_index.invalidate()
+
+    after = cache.make_key("what's on tomorrow", HISTORY, calendarUtils.calendar_state_version())
+    assert after != before
+    assert cache.get(after) is None
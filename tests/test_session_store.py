@@ -0,0 +1,81 @@
+from app.sessionStore import SessionStore
+
+CLOCK = "app.sessionStore.time.time"
+
+
+def open_session(store, session_id=None, reply="ok"):
+    session = store.get_or_create(session_id)
+    session.record("hello", reply)
+    store.save(session)
+    return session
+
+
+def cached(store):
+    return list(store._sessions)
+
+
+def test_least_recently_used_session_is_evicted_past_the_count(clock):
+    store = SessionStore(max_sessions=3)
+    a, b, c = (open_session(store).session_id for _ in range(3))
+    # Using a makes b the least recently used
+    store.get_or_create(a)
+    d = open_session(store).session_id
+    assert cached(store) == [c, a, d]
+    assert store.stats()["evictions"] == 1
+
+
+def test_sessions_are_evicted_to_stay_within_the_byte_budget(clock):
+    size = open_session(SessionStore(), reply="x" * 1000).size
+    store = SessionStore(max_bytes=int(size * 2.5))
+    a, b, c = (open_session(store, reply="x" * 1000).session_id for _ in range(3))
+    assert cached(store) == [b, c]
+    assert store.stats()["bytes"] <= store.max_bytes
+
+    # A session that grows past the budget pushes out the older ones
+    grown = store.get_or_create(c)
+    grown.record("more", "x" * 1000)
+    store.save(grown)
+    assert cached(store) == [c]
+    assert store.stats()["bytes"] == grown.size
+
+
+def test_idle_sessions_expire(clock):
+    store = SessionStore(idle_seconds=60)
+    first = open_session(store)
+    clock.now += 30
+    second = open_session(store)
+    clock.now += 31
+    again = store.get_or_create(first.session_id)
+    assert again is not first
+    assert again.session_id != first.session_id
+    assert again.history() == []
+    assert store.stats()["expirations"] == 1
+    assert store.get_or_create(second.session_id).history() == [("user", "hello"), ("assistant", "ok")]
+
+
+def test_unknown_session_ids_get_a_fresh_session(clock):
+    store = SessionStore()
+    existing = open_session(store)
+    guessed = store.get_or_create("guessed-id")
+    assert guessed.session_id != "guessed-id"
+    assert guessed.session_id != existing.session_id
+    assert guessed.history() == []
+    assert store.get_or_create(existing.session_id) is existing
+
+
+def test_delete_releases_its_bytes(clock):
+    store = SessionStore()
+    store.delete(open_session(store).session_id)
+    assert store.stats()["sessions"] == 0
+    assert store.stats()["bytes"] == 0
+
+
+def test_evicted_sessions_are_reloaded_from_the_shared_file(clock, tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(max_sessions=1, path=path)
+    a = open_session(store, reply="first reply").session_id
+    b = open_session(store).session_id
+    assert cached(store) == [b]
+    assert store.get_or_create(a).history() == [("user", "hello"), ("assistant", "first reply")]
+    # Another worker sharing the file sees it too
+    assert SessionStore(path=path).get_or_create(a).history()[-1] == ("assistant", "first reply")
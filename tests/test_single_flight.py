@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.singleFlight import SingleFlight
+
+
+class SlowCall:
+    """Counts calls and blocks each one until released"""
+
+    def __init__(self, result="busy"):
+        self.calls = 0
+        self.result = result
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, *args):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result, args
+
+
+def run_callers(flight, call, count, key="primary"):
+    results, errors = [], []
+
+    def caller():
+        try:
+            results.append(flight.do("freebusy", key, call, key))
+        except Exception as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    assert call.started.wait(5)
+    followers = [threading.Thread(target=caller) for _ in range(count - 1)]
+    for thread in followers:
+        thread.start()
+    # Followers are waiting once they've been counted as shared
+    while flight.stats()["saved_calls"] < count - 1:
+        time.sleep(0.001)
+    call.release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    return results, errors
+
+
+def test_concurrent_callers_share_one_call():
+    flight, call = SingleFlight("test"), SlowCall()
+    results, errors = run_callers(flight, call, 10)
+    assert call.calls == 1
+    assert errors == []
+    assert results == [("busy", ("primary",))] * 10
+    stats = flight.stats()
+    assert stats["executed"] == {"freebusy": 1}
+    assert stats["shared"] == {"freebusy": 9}
+    assert stats["saved_ratio"] == pytest.approx(0.9)
+    assert stats["in_flight"] == 0
+
+
+def test_an_error_reaches_every_waiting_caller():
+    flight, call = SingleFlight("test"), SlowCall(RuntimeError("upstream down"))
+    results, errors = run_callers(flight, call, 4)
+    assert call.calls == 1
+    assert results == []
+    assert [str(e) for e in errors] == ["upstream down"] * 4
+
+
+def test_nothing_is_cached_after_the_call_finishes():
+    flight = SingleFlight("test")
+    calls = []
+    for _ in range(3):
+        flight.do("freebusy", "primary", calls.append, 1)
+    assert len(calls) == 3
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight("test")
+    calls = []
+    flight.do("freebusy", "a", calls.append, "a")
+    flight.do("freebusy", "b", calls.append, "b")
+    flight.do("list", "a", calls.append, "a")
+    assert calls == ["a", "b", "a"]
+
+
+def test_async_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def fetch(key):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return key
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("freebusy", "primary", fetch, "primary") for _ in range(50)))
+
+    assert asyncio.run(main()) == ["primary"] * 50
+    assert calls == 1
+    assert flight.stats()["saved_calls"] == 49
+
+
+def test_cancelled_async_waiter_does_not_cancel_the_shared_call():
+    flight = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do_async("get_calendar", "primary", fetch))
+        second = asyncio.ensure_future(flight.do_async("get_calendar", "primary", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"